@@ -0,0 +1,558 @@
+from itertools import groupby
+from operator import itemgetter
+from typing import TYPE_CHECKING, List, Optional
+import numpy as np
+from .entities.tower import Tower
+from .entities.enemy import Enemy
+from .entities.projectile import Projectile
+from .config_manager import current_config
+from .telemetry import ESCAPE, KILL, SHOT, SPAWN, TOWER_LOST
+
+if TYPE_CHECKING:
+    from .game_state import GameState
+    from .profiler import TickProfiler
+    from .waves import WaveSpawner
+
+# 排序鍵 row * LANE_STRIDE + x，間距必須大於任何實體可能的 x 範圍
+LANE_STRIDE = float(1 << 20)
+
+def _compact(objs: Optional[List], keep: np.ndarray) -> Optional[List]:
+    if objs is None:
+        return None
+    return [o for o, k in zip(objs, keep.tolist()) if k]
+
+class ArrayGameLogic:
+    """Structure-of-arrays engine with the same phases as GameLogic.
+
+    Positions, health, cooldowns and rows live in NumPy arrays and every phase
+    is a handful of vectorized operations. With ``mirror_objects=True`` the
+    object lists on GameState are read before and written back after each
+    phase, so the engine can stand in for GameLogic; headless runs turn it off
+    and only towers are kept as objects (call ``sync_state()`` to materialize
+    enemies and projectiles on demand).
+
+    Results match GameLogic tick for tick. Projectiles that reach an enemy
+    already killed earlier in the tick, and enemies attacking a tower that is
+    already destroyed, are resolved in list order like GameLogic does, and
+    enemies at the same x keep their order in ``GameState.enemy_lanes``.
+    """
+
+    def __init__(self, game_state: 'GameState', mirror_objects: bool = True):
+        self.game_state = game_state
+        self.mirror_objects = mirror_objects
+        self.profiler: Optional['TickProfiler'] = None
+        self.waves: Optional['WaveSpawner'] = None
+        self.enemy_types = list(current_config().enemy_types)
+        self._tower_objs: List[Tower] = []
+        self._towers_version = -1
+        self._enemy_objs: Optional[List[Optional[Enemy]]] = [] if mirror_objects else None
+        self._projectile_objs: Optional[List[Optional[Projectile]]] = [] if mirror_objects else None
+        self._clear_towers()
+        self._clear_enemies()
+        self._clear_projectiles()
+        self._load_state()
+
+    # ------------------------------------------------------------------
+    # 與 GameLogic 相同的介面
+    # ------------------------------------------------------------------
+    def update(self) -> None:
+        if not self.game_state.game_over:
+            self._enter()
+            profiler = self.profiler
+            if profiler is None or not profiler.enabled:
+                self._step_spawn()
+                self._step_enemies()
+                self._step_projectiles()
+                self._step_towers()
+            else:
+                # 計時只包含陣列運算，不含與物件列表同步的成本
+                profiler.time('_spawn_enemy', self._step_spawn)
+                profiler.time('_update_enemies', self._step_enemies)
+                profiler.time('_update_projectiles', self._step_projectiles)
+                profiler.time('_tower_attack', self._step_towers)
+                profiler.count_entities(len(self.t_x), self.enemy_count, self.projectile_count)
+            telemetry = self.game_state.telemetry
+            if telemetry is not None:
+                telemetry.end_tick(self.game_state)
+            self.game_state.tick += 1
+            self._leave()
+
+    def _spawn_enemy(self) -> None:
+        self._enter()
+        self._step_spawn()
+        self._leave()
+
+    def _update_enemies(self) -> None:
+        self._enter()
+        self._step_enemies()
+        self._leave()
+
+    def _update_projectiles(self) -> None:
+        self._enter()
+        self._step_projectiles()
+        self._leave()
+
+    def _tower_attack(self) -> None:
+        self._enter()
+        self._step_towers()
+        self._leave()
+
+    @property
+    def enemy_count(self) -> int:
+        return len(self.e_x)
+
+    @property
+    def projectile_count(self) -> int:
+        return len(self.p_x)
+
+    # ------------------------------------------------------------------
+    # 陣列配置
+    # ------------------------------------------------------------------
+    def _clear_towers(self) -> None:
+        self.t_x = np.empty(0)
+        self.t_y = np.empty(0)
+        self.t_row = np.empty(0, dtype=np.int64)
+        self.t_col = np.empty(0, dtype=np.int64)
+        self.t_health = np.empty(0)
+        self.t_cooldown = np.empty(0, dtype=np.int64)
+        self.t_cooldown_max = np.empty(0, dtype=np.int64)
+        self.t_damage = np.empty(0)
+        self._index_towers()
+
+    def _clear_enemies(self) -> None:
+        self.e_x = np.empty(0)
+        self.e_row = np.empty(0, dtype=np.int64)
+        self.e_type = np.empty(0, dtype=np.int64)
+        self.e_health = np.empty(0)
+        self.e_speed = np.empty(0)
+        self.e_attack = np.empty(0)
+        self.e_reward = np.empty(0, dtype=np.int64)
+        self.e_cooldown = np.empty(0, dtype=np.int64)
+        self.e_target = np.empty(0, dtype=np.int64)
+        # 敵人在 GameState.enemy_lanes 中的順序（敵人索引）：x 相同時，子彈依這個順序選擇目標
+        self._lane_order = np.empty(0, dtype=np.int64)
+
+    def _clear_projectiles(self) -> None:
+        self.p_x = np.empty(0)
+        self.p_row = np.empty(0, dtype=np.int64)
+        self.p_damage = np.empty(0)
+
+    def _enter(self) -> None:
+        if self.mirror_objects:
+            self._load_state()
+        elif self.game_state.towers.version != self._towers_version:
+            # 無物件鏡像時只需要接收兩幀之間放置、移除或替換的防禦塔
+            self._store_towers()
+            self._load_towers()
+
+    def _leave(self) -> None:
+        if self.mirror_objects:
+            self.sync_state()
+
+    # ------------------------------------------------------------------
+    # 物件 <-> 陣列
+    # ------------------------------------------------------------------
+    def _load_towers(self) -> None:
+        grid = current_config().grid
+        grid_margin = grid.margin
+        grid_size = grid.size
+        old_objs = self._tower_objs
+        towers = list(self.game_state.towers)
+
+        self._tower_objs = towers
+        self._towers_version = self.game_state.towers.version
+        self.t_x = np.array([t.x for t in towers], dtype=float)
+        self.t_y = np.array([t.y for t in towers], dtype=float)
+        self.t_row = ((self.t_y - grid_margin) // grid_size).astype(np.int64)
+        self.t_col = ((self.t_x - grid_margin) // grid_size).astype(np.int64)
+        self.t_health = np.array([t.health for t in towers], dtype=float)
+        self.t_cooldown = np.array([t.attack_cooldown for t in towers], dtype=np.int64)
+        self.t_cooldown_max = np.array([t.attack_cooldown_max for t in towers], dtype=np.int64)
+        self.t_damage = np.array([t.damage for t in towers], dtype=float)
+        self._index_towers()
+
+        # 重新對應敵人的攻擊目標索引
+        if len(self.e_target) and old_objs:
+            new_index = {id(t): i for i, t in enumerate(towers)}
+            remap = np.array([new_index.get(id(t), -1) for t in old_objs], dtype=np.int64)
+            has_target = self.e_target >= 0
+            self.e_target[has_target] = remap[self.e_target[has_target]]
+
+    def _index_towers(self) -> None:
+        # 每個格子對應的防禦塔索引（-1 表示空格）
+        grid = current_config().grid
+        rows, cols = grid.rows, grid.cols
+        self._tower_grid = np.full((rows, cols), -1, dtype=np.int64)
+        inside = (self.t_row >= 0) & (self.t_row < rows) & (self.t_col >= 0) & (self.t_col < cols)
+        self._tower_grid[self.t_row[inside], self.t_col[inside]] = np.nonzero(inside)[0]
+
+    def _store_towers(self) -> None:
+        for i, tower in enumerate(self._tower_objs):
+            tower.health = self.t_health[i].item()
+            tower.attack_cooldown = int(self.t_cooldown[i])
+
+    def _load_state(self) -> None:
+        state = self.game_state
+        self._tower_objs = []
+        self._load_towers()
+        tower_index = {id(t): i for i, t in enumerate(self._tower_objs)}
+
+        grid = current_config().grid
+        state.sync_lanes()
+        enemies = list(state.enemies)
+        index = {id(e): i for i, e in enumerate(enemies)}
+        self._lane_order = np.array([index[id(e)] for row in range(grid.rows)
+                                     for e in state.enemy_lanes.in_row(row)], dtype=np.int64)
+        self.e_x = np.array([e.x for e in enemies], dtype=float)
+        self.e_row = np.array([grid.row_of(e.y) for e in enemies], dtype=np.int64)
+        self.e_type = np.array([self.enemy_types.index(e.enemy_type) for e in enemies], dtype=np.int64)
+        self.e_health = np.array([e.health for e in enemies], dtype=float)
+        self.e_speed = np.array([e.speed for e in enemies], dtype=float)
+        self.e_attack = np.array([e.attack_power for e in enemies], dtype=float)
+        self.e_reward = np.array([e.reward for e in enemies], dtype=np.int64)
+        self.e_cooldown = np.array([e.attack_cooldown for e in enemies], dtype=np.int64)
+        self.e_target = np.array([tower_index.get(id(e.current_target), -1) if e.current_target else -1
+                                  for e in enemies], dtype=np.int64)
+
+        projectiles = list(state.projectiles)
+        self.p_x = np.array([p.x for p in projectiles], dtype=float)
+        self.p_row = np.array([p.row for p in projectiles], dtype=np.int64)
+        self.p_damage = np.array([p.damage for p in projectiles], dtype=float)
+
+        if self.mirror_objects:
+            self._enemy_objs = enemies
+            self._projectile_objs = projectiles
+
+    def sync_state(self) -> None:
+        """Write the arrays back into the GameState object lists."""
+        state = self.game_state
+        lane_y = current_config().grid.lane_y
+        self._store_towers()
+        state.towers[:] = self._tower_objs
+        self._towers_version = state.towers.version
+
+        enemy_objs = self._enemy_objs or [None] * len(self.e_x)
+        for i in range(len(self.e_x)):
+            enemy = enemy_objs[i]
+            if enemy is None:
+                enemy = Enemy(int(self.e_row[i]), self.enemy_types[self.e_type[i]])
+                enemy_objs[i] = enemy
+            enemy.x = self.e_x[i].item()
+            enemy.health = self.e_health[i].item()
+            enemy.attack_cooldown = int(self.e_cooldown[i])
+            target = int(self.e_target[i])
+            enemy.current_target = self._tower_objs[target] if target >= 0 else None
+        state.enemies[:] = enemy_objs
+        lane_order = [enemy_objs[i] for i in self._lane_order.tolist()]
+
+        projectile_objs = self._projectile_objs or [None] * len(self.p_x)
+        for i in range(len(self.p_x)):
+            projectile = projectile_objs[i]
+            if projectile is None:
+                projectile = Projectile(0, lane_y[self.p_row[i]], self.p_damage[i].item())
+                projectile_objs[i] = projectile
+            projectile.x = self.p_x[i].item()
+        state.projectiles[:] = projectile_objs
+
+        if self.mirror_objects:
+            self._enemy_objs = enemy_objs
+            self._projectile_objs = projectile_objs
+        # 列表內容換過，sync_lanes 會以改寫後的 x 重建路線索引（渲染器以它找出畫面內的實體）；
+        # 再依引擎記下的順序重建敵人索引，保留 x 相同的敵人的先後
+        state.sync_lanes()
+        state.enemy_lanes.rebuild(lane_order)
+        state.rebuild_attackers()
+
+    # ------------------------------------------------------------------
+    # 向量化的遊戲階段
+    # ------------------------------------------------------------------
+    def _step_spawn(self) -> None:
+        state = self.game_state
+        if self.waves is not None:
+            # 連續的同類型敵人一次加入，保持與 GameLogic 相同的生成順序
+            for enemy_type, run in groupby(self.waves.due(state.tick), key=itemgetter(1)):
+                self._append_enemies(np.array([row for row, _ in run]), enemy_type)
+            return
+        config = current_config()
+        state.spawn_timer += 1
+        if state.spawn_timer >= config.spawn_interval:
+            state.spawn_timer = 0
+            row = state.rng.randint(0, config.grid.rows - 1)
+
+            # 根據分數決定是否生成強力殭屍
+            enemy_type = 'normal'
+            if (state.score >= config.strong_enemy_score and
+                state.rng.random() < 0.3):  # 30% 機率生成強力殭屍
+                enemy_type = 'strong'
+            self._append_enemies(np.array([row]), enemy_type)
+
+    def _append_enemies(self, rows: np.ndarray, enemy_type: str) -> None:
+        config = current_config()
+        kind = config.enemy_types[enemy_type]
+        count = len(rows)
+        spawn_x = config.width - config.grid.margin
+        self.e_x = np.concatenate((self.e_x, np.full(count, float(spawn_x))))
+        self.e_row = np.concatenate((self.e_row, rows.astype(np.int64)))
+        self.e_type = np.concatenate((self.e_type, np.full(count, self.enemy_types.index(enemy_type))))
+        self.e_health = np.concatenate((self.e_health, np.full(count, float(kind.health))))
+        self.e_speed = np.concatenate((self.e_speed, np.full(count, float(kind.speed))))
+        self.e_attack = np.concatenate((self.e_attack, np.full(count, float(kind.attack_power))))
+        self.e_reward = np.concatenate((self.e_reward, np.full(count, kind.reward, dtype=np.int64)))
+        self.e_cooldown = np.concatenate((self.e_cooldown, np.zeros(count, dtype=np.int64)))
+        self.e_target = np.concatenate((self.e_target, np.full(count, -1, dtype=np.int64)))
+        # 新敵人先排在最後，下次 _sort_lanes 的穩定排序讓它們排在 x 相同的敵人之後（與 LaneIndex.add 相同）
+        first = len(self.e_x) - count
+        self._lane_order = np.concatenate((self._lane_order, np.arange(first, first + count)))
+        if self._enemy_objs is not None:
+            self._enemy_objs.extend([None] * count)
+        telemetry = self.game_state.telemetry
+        if telemetry is not None:
+            for row in rows.tolist():
+                telemetry.emit(SPAWN, row, enemy_type)
+
+    def _step_enemies(self) -> None:
+        state = self.game_state
+        config = current_config()
+        if not len(self.e_x):
+            return
+        has_target = self.e_target >= 0
+
+        # 已經鎖定防禦塔的敵人：冷卻中則倒數，否則攻擊
+        attacking = has_target & (self.e_cooldown <= 0)
+        killed_at = self._tower_kills(attacking)
+        # 與 GameLogic 依列表順序處理相同：防禦塔被摧毀後，排在擊毀者後面的敵人這一幀已經沒有目標
+        late = np.arange(len(self.e_x)) > killed_at[self.e_target]
+        attacking &= ~late
+        np.subtract(self.e_cooldown, 1, out=self.e_cooldown, where=has_target & ~attacking & ~late)
+        if attacking.any():
+            attackers = np.nonzero(attacking)[0]
+            targets = self.e_target[attackers]
+            np.subtract.at(self.t_health, targets, self.e_attack[attackers])
+            self.e_cooldown[attackers] = config.enemy_attack_cooldown
+            if not self.mirror_objects:
+                for t in np.unique(targets).tolist():
+                    self._tower_objs[t].health = self.t_health[t].item()
+
+        # 沒有目標的敵人：檢查是否被防禦塔阻擋，否則前進
+        free = ~has_target | late
+        grid_margin = config.grid.margin
+        grid_size = config.grid.size
+        if len(self.t_x):
+            # 防禦塔對齊網格，能阻擋敵人的只有左邊相鄰格子裡的防禦塔，
+            # 且敵人必須剛越過該格右緣不到一步
+            enemy_cols = np.floor((self.e_x - grid_margin) / grid_size).astype(np.int64)
+            past_edge = self.e_x - (grid_margin + enemy_cols * grid_size)
+            near = np.nonzero(free & (past_edge < self.e_speed)
+                              & (enemy_cols >= 1) & (enemy_cols <= self._tower_grid.shape[1]))[0]
+            if len(near):
+                towers = self._tower_grid[self.e_row[near], enemy_cols[near] - 1]
+                found = towers >= 0
+                near, towers = near[found], towers[found]
+                # 這一幀被摧毀的防禦塔只擋得住排在擊毀者前面的敵人（之後隨即失去目標）
+                blocked = (np.abs(self.e_x[near] - (self.t_x[towers] + grid_size)) < self.e_speed[near]) \
+                          & (self.t_col[towers] < enemy_cols[near]) & (near < killed_at[towers])
+                self.e_target[near[blocked]] = towers[blocked]
+                free[near[blocked]] = False
+        if (self.t_health <= 0).any():
+            self._remove_dead_towers()
+
+        np.subtract(self.e_x, self.e_speed, out=self.e_x, where=free)
+        escaped = free & (self.e_x < 0)
+        if escaped.any():
+            if state.telemetry is not None:
+                for row in self.e_row[escaped].tolist():
+                    state.telemetry.emit(ESCAPE, row)
+            state.lives -= int(escaped.sum())
+            state.check_game_over()
+            self._keep_enemies(~escaped)
+        self._sort_lanes()
+
+    def _sort_lanes(self) -> None:
+        # 與 LaneIndex.resort 相同的穩定排序：x 相同的敵人保持上一幀的先後；
+        # 順序幾乎不變，大多數幀只需確認仍然有序
+        keys = (self.e_row * LANE_STRIDE + self.e_x)[self._lane_order]
+        if (keys[1:] < keys[:-1]).any():
+            self._lane_order = self._lane_order[np.argsort(keys, kind='stable')]
+
+    def _tower_kills(self, attacking: np.ndarray) -> np.ndarray:
+        """Index of the enemy whose attack destroys each tower this tick (enemy count if none).
+
+        One extra entry at the end stands for "no target", so the result can be
+        indexed with ``e_target`` directly.
+        """
+        killed_at = np.full(len(self.t_x) + 1, len(self.e_x), dtype=np.int64)
+        if not attacking.any():
+            return killed_at
+        attackers = np.nonzero(attacking)[0]
+        targets = self.e_target[attackers]
+        # 依防禦塔分組（組內保持敵人順序），累計每次攻擊後的傷害
+        by_tower = np.argsort(targets, kind='stable')
+        grouped = targets[by_tower]
+        done = np.cumsum(self.e_attack[attackers][by_tower])
+        first = np.r_[True, grouped[1:] != grouped[:-1]]
+        group_start = np.maximum.accumulate(np.where(first, np.arange(len(grouped)), 0))
+        done -= np.r_[0.0, done][group_start]
+        kills = self.t_health[grouped] - done <= 0
+        np.minimum.at(killed_at, grouped[kills], attackers[by_tower][kills])
+        return killed_at
+
+    def _remove_dead_towers(self) -> None:
+        keep = self.t_health > 0
+        telemetry = self.game_state.telemetry
+        if telemetry is not None:
+            for row, col in zip(self.t_row[~keep].tolist(), self.t_col[~keep].tolist()):
+                telemetry.emit(TOWER_LOST, row, col)
+        new_index = np.cumsum(keep) - 1
+        has_target = self.e_target >= 0
+        targets = self.e_target[has_target]
+        self.e_target[has_target] = np.where(keep[targets], new_index[targets], -1)
+
+        self.t_x = self.t_x[keep]
+        self.t_y = self.t_y[keep]
+        self.t_row = self.t_row[keep]
+        self.t_col = self.t_col[keep]
+        self.t_health = self.t_health[keep]
+        self.t_cooldown = self.t_cooldown[keep]
+        self.t_cooldown_max = self.t_cooldown_max[keep]
+        self.t_damage = self.t_damage[keep]
+        self._index_towers()
+        self._tower_objs = _compact(self._tower_objs, keep)
+        towers = self.game_state.towers
+        towers[:] = self._tower_objs
+        self._towers_version = towers.version
+
+    def _keep_enemies(self, keep: np.ndarray) -> None:
+        self.e_x = self.e_x[keep]
+        self.e_row = self.e_row[keep]
+        self.e_type = self.e_type[keep]
+        self.e_health = self.e_health[keep]
+        self.e_speed = self.e_speed[keep]
+        self.e_attack = self.e_attack[keep]
+        self.e_reward = self.e_reward[keep]
+        self.e_cooldown = self.e_cooldown[keep]
+        self.e_target = self.e_target[keep]
+        new_index = np.cumsum(keep) - 1
+        self._lane_order = new_index[self._lane_order[keep[self._lane_order]]]
+        self._enemy_objs = _compact(self._enemy_objs, keep)
+
+    def _keep_projectiles(self, keep: np.ndarray) -> None:
+        self.p_x = self.p_x[keep]
+        self.p_row = self.p_row[keep]
+        self.p_damage = self.p_damage[keep]
+        self._projectile_objs = _compact(self._projectile_objs, keep)
+
+    def _step_projectiles(self) -> None:
+        state = self.game_state
+        if not len(self.p_x):
+            return
+        config = current_config()
+        # 子彈只往右移動
+        self.p_x += config.projectile_speed
+        alive = self.p_x <= config.width
+
+        if len(self.e_x):
+            # 以寬度為碰撞距離的格子粗篩，只排序可能被擊中的少數敵人
+            reach = config.projectile_radius + config.enemy_radius
+            bins_per_row = int(config.width // reach) + 3
+            p_bins = self.p_row * bins_per_row + np.clip(self.p_x // reach + 1, 0, bins_per_row - 1).astype(np.int64)
+            marked = np.zeros(config.grid.rows * bins_per_row + 1, dtype=bool)
+            marked[p_bins] = True
+            marked[p_bins - 1] = True
+            marked[p_bins + 1] = True
+            e_bins = self.e_row * bins_per_row + np.clip(self.e_x // reach + 1, 0, bins_per_row - 1).astype(np.int64)
+            candidates = np.nonzero(marked[e_bins])[0]
+
+            if len(candidates):
+                # 每顆子彈擊中同一行中碰撞範圍內最左邊的敵人
+                keys = self.e_row[candidates] * LANE_STRIDE + self.e_x[candidates]
+                lane_rank = np.empty(len(self.e_x), dtype=np.int64)
+                lane_rank[self._lane_order] = np.arange(len(self._lane_order))
+                order = np.lexsort((lane_rank[candidates], keys))
+                sorted_keys = keys[order]
+                p_keys = self.p_row * LANE_STRIDE + self.p_x
+                start = np.searchsorted(sorted_keys, p_keys - reach, side='right')
+                in_range = start < len(sorted_keys)
+                pos = np.minimum(start, len(sorted_keys) - 1)
+                hit = in_range & (sorted_keys[pos] < p_keys + reach)
+
+                if hit.any():
+                    self._resolve_hits(hit, candidates[order], sorted_keys, start, p_keys + reach)
+                    dead = self.e_health <= 0
+                    if dead.any():
+                        if state.telemetry is not None:
+                            for row, x, reward in zip(self.e_row[dead].tolist(), self.e_x[dead].tolist(),
+                                                      self.e_reward[dead].tolist()):
+                                state.telemetry.emit(KILL, row, x, reward)
+                        state.score += int(dead.sum())
+                        state.money += int(self.e_reward[dead].sum())
+                        self._keep_enemies(~dead)
+                    alive &= ~hit
+
+        if not alive.all():
+            self._keep_projectiles(alive)
+
+    def _resolve_hits(self, hit: np.ndarray, sorted_enemies: np.ndarray, sorted_keys: np.ndarray,
+                      start: np.ndarray, limit: np.ndarray) -> None:
+        """Apply the hits in projectile order, as GameLogic does; clears `hit` for projectiles that miss."""
+        shots = np.nonzero(hit)[0]
+        victims = sorted_enemies[start[shots]]
+        damage = self.p_damage[shots]
+        # 依敵人分組（組內保持子彈順序），算出每顆子彈擊中前敵人已受的傷害
+        by_victim = np.argsort(victims, kind='stable')
+        grouped = victims[by_victim]
+        earlier = np.cumsum(damage[by_victim]) - damage[by_victim]
+        first = np.r_[True, grouped[1:] != grouped[:-1]]
+        group_start = np.maximum.accumulate(np.where(first, np.arange(len(shots)), 0))
+        before = earlier - earlier[group_start]
+        late = np.zeros(len(shots), dtype=bool)
+        late[by_victim] = self.e_health[grouped] - before <= 0
+        if not late.any():
+            # 沒有子彈打到同一幀已被擊殺的敵人，同時套用與依序處理結果相同
+            np.subtract.at(self.e_health, victims, damage)
+            return
+
+        # 有子彈打到已死亡敵人的行改為依子彈順序逐一處理，死亡的敵人讓給後面的目標
+        slow = np.isin(self.p_row[shots], np.unique(self.p_row[shots[late]]))
+        np.subtract.at(self.e_health, victims[~slow], damage[~slow])
+        e_health = self.e_health
+        gone = np.zeros(len(sorted_keys), dtype=bool)
+        for i in shots[slow].tolist():
+            j = int(start[i])
+            while j < len(sorted_keys) and gone[j]:
+                j += 1
+            if j < len(sorted_keys) and sorted_keys[j] < limit[i]:
+                enemy = sorted_enemies[j]
+                e_health[enemy] -= self.p_damage[i]
+                if e_health[enemy] <= 0:
+                    gone[j] = True
+            else:
+                hit[i] = False
+
+    def _step_towers(self) -> None:
+        if not len(self.t_x):
+            return
+        grid = current_config().grid
+        grid_margin = grid.margin
+        grid_size = grid.size
+        ready = self.t_cooldown <= 0
+        self.t_cooldown[~ready] -= 1
+
+        # 每一行最右邊的敵人位置決定該行的防禦塔是否有目標
+        rightmost = np.full(grid.rows, -np.inf)
+        if len(self.e_x):
+            np.maximum.at(rightmost, self.e_row, self.e_x)
+        fire = ready & (rightmost[self.t_row] >= grid_margin + (self.t_col + 1) * grid_size)
+        if not fire.any():
+            return
+
+        self.t_cooldown[fire] = self.t_cooldown_max[fire]
+        telemetry = self.game_state.telemetry
+        if telemetry is not None:
+            towers = self._tower_objs
+            for i in np.nonzero(fire)[0].tolist():
+                telemetry.emit(SHOT, self.t_row[i].item(), self.t_col[i].item(), towers[i].damage)
+        self.p_x = np.concatenate((self.p_x, self.t_x[fire] + grid_size))
+        self.p_row = np.concatenate((self.p_row, self.t_row[fire]))
+        self.p_damage = np.concatenate((self.p_damage, self.t_damage[fire]))
+        if self._projectile_objs is not None:
+            self._projectile_objs.extend([None] * int(fire.sum()))
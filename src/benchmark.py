@@ -0,0 +1,207 @@
+"""Time GameLogic phases and rendering on synthetic scenarios of growing size.
+
+    python -m src.benchmark --save benchmarks/baseline.json
+    python -m src.benchmark --compare benchmarks/baseline.json --threshold 0.2
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from .config_manager import CONFIG
+from .entities.enemy import Enemy
+from .entities.projectile import Projectile
+from .entities.tower import Tower
+from .game_state import GameState
+from .game_logic import ENGINES, create_game_logic
+
+SIZES = (10, 100, 1000, 10000, 100000)
+# 無頭模擬與工作行程需要載入的模組，以及需要顯示的渲染器作為對照
+IMPORT_MODULES = ('src.game_state', 'src.headless', 'src.sweep', 'src.renderer')
+PHASES = ('update', '_spawn_enemy', '_update_enemies', '_update_projectiles', '_tower_attack')
+# 低於這個差距的變化視為量測雜訊，不算退步
+NOISE_FLOOR = 20e-6
+
+def build_scenario(size: int, seed: int = 0) -> GameState:
+    """A game with `size` enemies and projectiles and up to `size` towers.
+
+    Towers fill the grid column by column from the left, so their count is
+    capped by the number of cells. Enemies and projectiles are spread over
+    every row to the right of the towers.
+    """
+    rng = random.Random(seed)
+    rows, cols = CONFIG['grid']['rows'], CONFIG['grid']['cols']
+    grid_margin, grid_size = CONFIG['grid']['margin'], CONFIG['grid']['size']
+    width = CONFIG['window']['width'] - grid_margin
+
+    state = GameState(seed)
+    state.lives = sys.maxsize  # 場景要能一直跑下去，不會因為逃脫而結束
+    state.money = 0
+    tower_count = min(size, rows * cols)
+    for i in range(tower_count):
+        row, col = i % rows, i // rows
+        state.towers.append(Tower(grid_margin + col * grid_size, grid_margin + row * grid_size,
+                                  'strong' if i % 3 == 0 else 'normal'))
+
+    front = grid_margin + (tower_count + rows - 1) // rows * grid_size
+    for i in range(size):
+        enemy = Enemy(i % rows, 'strong' if i % 5 == 0 else 'normal')
+        enemy.x = rng.uniform(front + CONFIG['enemy']['radius'], width)
+        state.enemies.append(enemy)
+
+        projectile_row = rng.randrange(rows)
+        state.projectiles.append(Projectile(rng.uniform(front, width),
+                                            grid_margin + projectile_row * grid_size + grid_size // 2,
+                                            CONFIG['tower']['types']['normal']['damage']))
+    state.sync_lanes()
+    return state
+
+def _time_once(func: Callable[[], None]) -> float:
+    gc.collect()
+    gc.disable()
+    try:
+        start = time.perf_counter()
+        func()
+        return time.perf_counter() - start
+    finally:
+        gc.enable()
+
+def time_phase(size: int, phase: str, engine: str = 'object', repeat: int = 5) -> List[float]:
+    """Time one call of `phase` on a fresh scenario `repeat` times."""
+    options = {'mirror_objects': False} if engine != 'object' else {}
+    timings = []
+    for i in range(repeat):
+        game_logic = create_game_logic(build_scenario(size, seed=i), engine, **options)
+        try:
+            timings.append(_time_once(getattr(game_logic, phase)))
+        finally:
+            close = getattr(game_logic, 'close', None)
+            if close is not None:
+                close()
+    return timings
+
+def time_render(size: int, repeat: int = 5) -> List[float]:
+    """Time steady-state Renderer.render() calls on an offscreen display."""
+    import pygame
+    from .renderer import Renderer
+
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    pygame.init()
+    screen = pygame.display.set_mode((CONFIG['window']['width'], CONFIG['window']['height']))
+    state = build_scenario(size)
+    game_logic = create_game_logic(state)
+    renderer = Renderer(screen, state)
+    renderer.render()  # 第一幀是整個畫面重畫，不計入
+
+    timings = []
+    for _ in range(repeat):
+        game_logic.update()
+        timings.append(_time_once(renderer.render))
+    return timings
+
+def time_import(module: str, repeat: int = 5) -> List[float]:
+    """Time importing `module` in fresh interpreters, as a new pool worker would."""
+    code = (f'import time; start = time.perf_counter(); import {module}; '
+            f'print(time.perf_counter() - start)')
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, PYGAME_HIDE_SUPPORT_PROMPT='1')
+    return [float(subprocess.run([sys.executable, '-c', code], cwd=root, env=env, check=True,
+                                 capture_output=True, text=True).stdout)
+            for _ in range(repeat)]
+
+def run_benchmarks(sizes: Iterable[int] = SIZES, engine: str = 'object', repeat: int = 5,
+                   render: bool = True, imports: bool = False,
+                   report: Optional[Callable[[str, List[float]], None]] = None) -> Dict[str, Dict[str, float]]:
+    results = {}
+
+    def record(key: str, timings: List[float]) -> None:
+        results[key] = {'median': statistics.median(timings), 'min': min(timings)}
+        if report:
+            report(key, timings)
+
+    if imports:
+        for module in IMPORT_MODULES:
+            record(f'import/{module}', time_import(module, repeat))
+    for size in sizes:
+        # sharded 引擎的各階段在工作行程中執行，只能量整個 update()
+        for phase in PHASES if engine != 'sharded' else PHASES[:1]:
+            record(f'{engine}/{phase}/{size}', time_phase(size, phase, engine, repeat))
+        if render:
+            record(f'render/{size}', time_render(size, repeat))
+    return results
+
+def compare_results(baseline: Dict[str, Dict[str, float]], current: Dict[str, Dict[str, float]],
+                    threshold: float) -> List[Tuple[str, float, float]]:
+    """Return (key, baseline, current) medians that got slower by more than `threshold`."""
+    regressions = []
+    for key, result in current.items():
+        if key not in baseline:
+            continue
+        before, after = baseline[key]['median'], result['median']
+        if after > before * (1 + threshold) and after - before > NOISE_FLOOR:
+            regressions.append((key, before, after))
+    return regressions
+
+def _format_time(seconds: float) -> str:
+    if seconds >= 1:
+        return f'{seconds:.3f} s'
+    if seconds >= 1e-3:
+        return f'{seconds * 1e3:.3f} ms'
+    return f'{seconds * 1e6:.1f} us'
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description='Benchmark game logic phases and rendering.')
+    parser.add_argument('--sizes', default=','.join(map(str, SIZES)),
+                        help='comma separated entity counts per scenario')
+    parser.add_argument('--engine', choices=ENGINES, default='object')
+    parser.add_argument('--repeat', type=int, default=5, help='timed runs per measurement')
+    parser.add_argument('--no-render', action='store_true', help='skip Renderer.render timings')
+    parser.add_argument('--imports', action='store_true',
+                        help='also time importing the simulation modules in a fresh interpreter')
+    parser.add_argument('--save', metavar='PATH', help='write results as a baseline JSON file')
+    parser.add_argument('--compare', metavar='PATH', help='baseline JSON file to compare against')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='relative slowdown reported as a regression (0.2 = 20%%)')
+    args = parser.parse_args(argv)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            baseline = json.load(f)['results']
+
+    def report(key: str, timings: List[float]) -> None:
+        line = f'{key:<36} {_format_time(statistics.median(timings)):>12}'
+        if baseline and key in baseline:
+            line += f'  ({statistics.median(timings) / baseline[key]["median"]:.2f}x baseline)'
+        print(line, flush=True)
+
+    sizes = [int(size) for size in args.sizes.split(',') if size]
+    results = run_benchmarks(sizes, args.engine, args.repeat, not args.no_render, args.imports, report)
+
+    if args.save:
+        os.makedirs(os.path.dirname(args.save) or '.', exist_ok=True)
+        with open(args.save, 'w') as f:
+            json.dump({
+                'python': platform.python_version(),
+                'machine': platform.machine(),
+                'repeat': args.repeat,
+                'results': results,
+            }, f, indent=2, sort_keys=True)
+            f.write('\n')
+
+    if baseline is not None:
+        regressions = compare_results(baseline, results, args.threshold)
+        for key, before, after in regressions:
+            print(f'REGRESSION {key}: {_format_time(before)} -> {_format_time(after)}')
+        if regressions:
+            sys.exit(1)
+        print(f'No regressions beyond {args.threshold:.0%}')
+
+if __name__ == '__main__':
+    main()
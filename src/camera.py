@@ -0,0 +1,88 @@
+from typing import Tuple
+from .config_manager import GridConfig, current_config
+
+# 縮放倍率只取固定的幾級，縮放後的圖片才能快取重用
+ZOOM_LEVELS: Tuple[float, ...] = (0.25, 0.5, 0.75, 1.0, 1.5, 2.0)
+
+class Camera:
+    """Which part of the world a view of `view_size` screen pixels shows.
+
+    Entities keep their world pixel coordinates; the renderer maps them with
+    `to_screen` and only draws what `visible_cells` covers. `version` changes
+    on every pan or zoom so cached layers know when to rebuild.
+    """
+
+    def __init__(self, view_size: Tuple[int, int], world_size: Tuple[int, int]):
+        self.view_width, self.view_height = view_size
+        self.world_width, self.world_height = world_size
+        self.x = 0.0
+        self.y = 0.0
+        self.zoom_index = ZOOM_LEVELS.index(1.0)
+        self.version = 0
+
+    @classmethod
+    def for_config(cls) -> 'Camera':
+        """A camera over the whole board, with the window as its view."""
+        config = current_config()
+        grid = config.grid
+        return cls((config.width, config.height),
+                   (max(config.width, grid.right + grid.margin),
+                    max(config.height, grid.bottom + grid.margin)))
+
+    @property
+    def zoom(self) -> float:
+        return ZOOM_LEVELS[self.zoom_index]
+
+    def to_screen(self, x: float, y: float) -> Tuple[float, float]:
+        zoom = ZOOM_LEVELS[self.zoom_index]
+        return (x - self.x) * zoom, (y - self.y) * zoom
+
+    def to_world(self, screen_x: float, screen_y: float) -> Tuple[float, float]:
+        zoom = ZOOM_LEVELS[self.zoom_index]
+        return self.x + screen_x / zoom, self.y + screen_y / zoom
+
+    def visible_rect(self) -> Tuple[float, float, float, float]:
+        """(left, top, right, bottom) of the view in world pixels."""
+        zoom = ZOOM_LEVELS[self.zoom_index]
+        return self.x, self.y, self.x + self.view_width / zoom, self.y + self.view_height / zoom
+
+    def visible_cells(self, grid: GridConfig, pad: float = 0) -> Tuple[range, range]:
+        """Rows and columns of `grid` within `pad` world pixels of the view."""
+        left, top, right, bottom = self.visible_rect()
+        size, margin = grid.size, grid.margin
+        rows = range(max(0, int((top - pad - margin) // size)),
+                     min(grid.rows, int((bottom + pad - margin) // size) + 1))
+        cols = range(max(0, int((left - pad - margin) // size)),
+                     min(grid.cols, int((right + pad - margin) // size) + 1))
+        return rows, cols
+
+    def pan(self, dx: float, dy: float) -> None:
+        """Scroll by (dx, dy) screen pixels."""
+        zoom = ZOOM_LEVELS[self.zoom_index]
+        self._move(self.x + dx / zoom, self.y + dy / zoom)
+
+    def zoom_at(self, steps: int, screen_x: float, screen_y: float) -> None:
+        """Zoom in (`steps` > 0) or out, keeping the world point under the given pixel still."""
+        index = max(0, min(len(ZOOM_LEVELS) - 1, self.zoom_index + steps))
+        if index == self.zoom_index:
+            return
+        world_x, world_y = self.to_world(screen_x, screen_y)
+        self.zoom_index = index
+        self.version += 1
+        zoom = ZOOM_LEVELS[index]
+        self._move(world_x - screen_x / zoom, world_y - screen_y / zoom)
+
+    def reset(self) -> None:
+        if self.zoom_index != ZOOM_LEVELS.index(1.0):
+            self.zoom_index = ZOOM_LEVELS.index(1.0)
+            self.version += 1
+        self._move(0.0, 0.0)
+
+    def _move(self, x: float, y: float) -> None:
+        # 不捲出世界範圍；整個世界都看得到時固定在左上角
+        zoom = ZOOM_LEVELS[self.zoom_index]
+        x = max(0.0, min(x, self.world_width - self.view_width / zoom))
+        y = max(0.0, min(y, self.world_height - self.view_height / zoom))
+        if (x, y) != (self.x, self.y):
+            self.x, self.y = x, y
+            self.version += 1
@@ -1,9 +1,255 @@
 import json
-from pathlib import Path
+import os
+import time
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, NamedTuple, Optional, Tuple
 
-def load_config():
-    config_path = Path(__file__).parent.parent / 'config.json'
-    with open(config_path, 'r') as f:
+CONFIG_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'config.json')
+
+Color = Tuple[int, int, int]
+
+def load_config(path: str = CONFIG_PATH) -> Dict[str, Any]:
+    with open(path, 'r') as f:
         return json.load(f)
 
+class TowerType(NamedTuple):
+    name: str
+    cost: int
+    attack_cooldown: int
+    health: int
+    damage: int
+    color: Color
+    image_path: str
+    image_size: Tuple[int, int]
+
+class EnemyType(NamedTuple):
+    name: str
+    speed: float
+    health: int
+    attack_power: int
+    reward: int
+    color: Color
+    radius: int
+    image_path: str
+    image_size: Tuple[int, int]
+
+class GridConfig(NamedTuple):
+    rows: int
+    cols: int
+    size: int
+    margin: int
+    right: int                  # 網格右緣的 x 座標
+    bottom: int                 # 網格下緣的 y 座標
+    lane_y: Tuple[int, ...]     # 每一行的中心 y 座標
+    row_y: Tuple[int, ...]      # 每一行的上緣 y 座標
+    col_x: Tuple[int, ...]      # 每一列的左緣 x 座標
+    row_at: Tuple[int, ...]     # 視窗或網格內每個像素 y 所在的行，網格外為 -1
+    col_at: Tuple[int, ...]     # 視窗或網格內每個像素 x 所在的列，網格外為 -1
+
+    def row_of(self, y: float) -> int:
+        """Row index for a y coordinate (may be outside 0..rows-1)."""
+        return int((y - self.margin) // self.size)
+
+    def cell_at(self, x: int, y: int) -> Optional[Tuple[int, int]]:
+        """The (row, col) under a world pixel, or None outside the grid."""
+        if 0 <= y < len(self.row_at) and 0 <= x < len(self.col_at):
+            row, col = self.row_at[y], self.col_at[x]
+            if row >= 0 and col >= 0:
+                return row, col
+        return None
+
+class GameConfig(NamedTuple):
+    """config.json validated and compiled into typed, read-only records."""
+    width: int
+    height: int
+    fps: int
+    initial_money: int
+    initial_lives: int
+    strong_enemy_score: int
+    grid: GridConfig
+    tower_size: Tuple[int, int]
+    enemy_size: Tuple[int, int]
+    tower_types: Mapping[str, TowerType]
+    enemy_types: Mapping[str, EnemyType]
+    enemy_radius: int
+    enemy_attack_cooldown: int
+    spawn_interval: int
+    projectile_speed: float
+    projectile_radius: int
+    colors: Mapping[str, Color]
+
+def _get(raw: Mapping[str, Any], path: str) -> Any:
+    value: Any = raw
+    for key in path.split('.'):
+        if not isinstance(value, Mapping) or key not in value:
+            raise ValueError(f'Missing config value: {path}')
+        value = value[key]
+    return value
+
+def _number(raw: Mapping[str, Any], path: str, minimum: float = 0, integer: bool = False) -> Any:
+    value = _get(raw, path)
+    if isinstance(value, bool) or not isinstance(value, int if integer else (int, float)):
+        raise ValueError(f'Config value {path} must be {"an integer" if integer else "a number"}, got {value!r}')
+    if value < minimum:
+        raise ValueError(f'Config value {path} must be at least {minimum}, got {value!r}')
+    return value
+
+def _color(raw: Mapping[str, Any], path: str) -> Color:
+    value = _get(raw, path)
+    if (not isinstance(value, (list, tuple)) or len(value) != 3
+            or not all(isinstance(c, int) and 0 <= c <= 255 for c in value)):
+        raise ValueError(f'Config value {path} must be an RGB triple, got {value!r}')
+    return tuple(value)
+
+def _image(raw: Mapping[str, Any], name: str, default: str) -> str:
+    # 例如 'strong' 類型使用 strong_tower，沒有專屬圖片時使用預設圖片
+    key = f'{name}_{default}'
+    return _get(raw, f'images.{key}' if key in _get(raw, 'images') else f'images.{default}')
+
+def _compile_grid(raw: Mapping[str, Any], width: int, height: int) -> GridConfig:
+    rows = _number(raw, 'grid.rows', 1, integer=True)
+    cols = _number(raw, 'grid.cols', 1, integer=True)
+    size = _number(raw, 'grid.size', 1, integer=True)
+    margin = _number(raw, 'grid.margin', 0, integer=True)
+    right, bottom = margin + cols * size, margin + rows * size
+
+    def cell_table(length: int, count: int) -> Tuple[int, ...]:
+        return tuple((p - margin) // size if margin <= p < margin + count * size else -1
+                     for p in range(length))
+
+    return GridConfig(rows, cols, size, margin, right, bottom,
+                      lane_y=tuple(margin + row * size + size // 2 for row in range(rows)),
+                      row_y=tuple(margin + row * size for row in range(rows)),
+                      col_x=tuple(margin + col * size for col in range(cols)),
+                      # 網格可能比視窗大（以攝影機捲動），查表要涵蓋整個網格
+                      row_at=cell_table(max(height, bottom), rows),
+                      col_at=cell_table(max(width, right), cols))
+
+def compile_config(raw: Mapping[str, Any]) -> GameConfig:
+    """Validate a raw config dict; raises ValueError naming the bad entry."""
+    width = _number(raw, 'window.width', 1, integer=True)
+    height = _number(raw, 'window.height', 1, integer=True)
+
+    tower_size = (_number(raw, 'tower_size.width', 1, integer=True),
+                  _number(raw, 'tower_size.height', 1, integer=True))
+    tower_types = {}
+    for name in _get(raw, 'tower.types'):
+        path = f'tower.types.{name}'
+        tower_types[name] = TowerType(
+            name=name,
+            cost=_number(raw, f'{path}.cost', 0),
+            attack_cooldown=_number(raw, f'{path}.attack_cooldown', 1),
+            health=_number(raw, f'{path}.initial_health', 1),
+            damage=_number(raw, f'{path}.damage', 0),
+            color=_color(raw, f'{path}.color'),
+            image_path=_image(raw, name, 'tower'),
+            image_size=tower_size,
+        )
+
+    enemy_size = (_number(raw, 'enemy_size.width', 1, integer=True),
+                  _number(raw, 'enemy_size.height', 1, integer=True))
+    enemy_radius = _number(raw, 'enemy.radius', 1, integer=True)
+    enemy_types = {}
+    for name in _get(raw, 'enemy.types'):
+        path = f'enemy.types.{name}'
+        enemy_types[name] = EnemyType(
+            name=name,
+            speed=_number(raw, f'{path}.speed'),
+            health=_number(raw, f'{path}.health', 1),
+            attack_power=_number(raw, f'{path}.attack_power', 0),
+            reward=_number(raw, f'{path}.reward', 0),
+            color=_color(raw, f'{path}.color'),
+            radius=enemy_radius,
+            image_path=_image(raw, name, 'enemy'),
+            image_size=enemy_size,
+        )
+    if not tower_types or not enemy_types:
+        raise ValueError('Config must define at least one tower type and one enemy type')
+
+    return GameConfig(
+        width=width,
+        height=height,
+        fps=_number(raw, 'game.fps', 1, integer=True),
+        initial_money=_number(raw, 'game.initial_money', 0),
+        initial_lives=_number(raw, 'game.initial_lives', 1),
+        strong_enemy_score=_number(raw, 'game.strong_enemy_score', 0),
+        grid=_compile_grid(raw, width, height),
+        tower_size=tower_size,
+        enemy_size=enemy_size,
+        tower_types=MappingProxyType(tower_types),
+        enemy_types=MappingProxyType(enemy_types),
+        enemy_radius=enemy_radius,
+        enemy_attack_cooldown=_number(raw, 'enemy.attack_cooldown', 1),
+        spawn_interval=_number(raw, 'enemy.spawn_interval', 1),
+        projectile_speed=_number(raw, 'projectile.speed'),
+        projectile_radius=_number(raw, 'projectile.radius', 0, integer=True),
+        colors=MappingProxyType({name: _color(raw, f'colors.{name}') for name in _get(raw, 'colors')}),
+    )
+
 CONFIG = load_config()
+_compiled = compile_config(CONFIG)
+
+def current_config() -> GameConfig:
+    """The active compiled config; hot paths fetch it once per phase, not per entity."""
+    return _compiled
+
+def set_config(raw: Dict[str, Any]) -> GameConfig:
+    """Compile `raw` and make it the active config, keeping CONFIG in step.
+
+    Nothing changes if `raw` fails validation.
+    """
+    global _compiled
+    compiled = compile_config(raw)
+    if raw is not CONFIG:
+        CONFIG.clear()
+        CONFIG.update(raw)
+    _compiled = compiled
+    return compiled
+
+class ConfigWatcher:
+    """Reload config.json when it changes on disk.
+
+    Call ``poll()`` between ticks; a changed file is recompiled and swapped in
+    only if it is valid and keeps the window and grid geometry, which the
+    running game cannot change. New values apply to entities created after the
+    swap. A rejected file leaves the old config active and the reason in
+    ``error`` until a later reload succeeds.
+    """
+
+    def __init__(self, path: str = CONFIG_PATH, interval: float = 0.5):
+        self.path = path
+        self.interval = interval
+        self.error: Optional[str] = None
+        self._mtime = self._stat()
+        self._next_check = time.monotonic() + interval
+
+    def _stat(self) -> Optional[int]:
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except OSError:
+            return None
+
+    def poll(self) -> bool:
+        """Returns True when a new config was swapped in."""
+        now = time.monotonic()
+        if now < self._next_check:
+            return False
+        self._next_check = now + self.interval
+        mtime = self._stat()
+        if mtime is None or mtime == self._mtime:
+            return False
+        self._mtime = mtime
+
+        try:
+            raw = load_config(self.path)
+            compiled = compile_config(raw)
+            active = current_config()
+            if (compiled.width, compiled.height, compiled.grid) != (active.width, active.height, active.grid):
+                raise ValueError('window and grid settings need a restart')
+            set_config(raw)
+        except (OSError, ValueError) as e:
+            # 由呼叫端顯示（遊戲中顯示在 HUD 上）
+            self.error = f'Config reload failed: {e}'
+            return False
+        self.error = None
+        return True
@@ -1,30 +1,68 @@
 from typing import Optional
-import pygame
-from ..config_manager import CONFIG
-from ..utils.image_loader import load_image
+from ..config_manager import EnemyType, current_config
 from .tower import Tower
 
 class Enemy:
+    __slots__ = ('x', 'y', 'kind', 'health', 'attack_cooldown', '_target')
+
     def __init__(self, row: int, enemy_type: str = 'normal'):
-        self.x = CONFIG['window']['width'] - CONFIG['grid']['margin']
-        self.y = CONFIG['grid']['margin'] + row * CONFIG['grid']['size'] + CONFIG['grid']['size'] // 2
-        self.enemy_type = enemy_type
-        self.radius = CONFIG['enemy']['radius']
-        
-        # 從配置中獲取該類型殭屍的屬性
-        enemy_config = CONFIG['enemy']['types'][enemy_type]
-        self.speed = enemy_config['speed']
-        self.health = enemy_config['health']
-        self.max_health = enemy_config['health']
-        self.attack_power = enemy_config['attack_power']
-        self.reward = enemy_config['reward']
-        self.color = enemy_config['color']
-        
+        self._target: Optional[Tower] = None
+        self.reset(row, enemy_type)
+
+    def reset(self, row: int, enemy_type: str = 'normal') -> None:
+        config = current_config()
+        self.x = config.width - config.grid.margin
+        self.y = config.grid.lane_y[row]
+        # 同類型的敵人共用編譯後的類型資料
+        self.kind: EnemyType = config.enemy_types[enemy_type]
+        self.health = self.kind.health
         self.attack_cooldown = 0
-        self.current_target: Optional[Tower] = None
-        
-        # 根據殭屍類型加載不同圖片
-        image_key = 'strong_enemy' if enemy_type == 'strong' else 'enemy'
-        image_path = CONFIG['images'][image_key]
-        size = (CONFIG['enemy_size']['width'], CONFIG['enemy_size']['height'])
-        self.image = load_image(image_path, size)
+        self.current_target = None
+
+    @property
+    def current_target(self) -> Optional[Tower]:
+        return self._target
+
+    @current_target.setter
+    def current_target(self, tower: Optional[Tower]) -> None:
+        # 不論從哪裡設定目標，都同步更新防禦塔上正在攻擊它的敵人集合
+        old = self._target
+        if old is not None:
+            old.attackers.discard(self)
+        self._target = tower
+        if tower is not None:
+            tower.attackers.add(self)
+
+    @property
+    def enemy_type(self) -> str:
+        return self.kind.name
+
+    @property
+    def speed(self) -> float:
+        return self.kind.speed
+
+    @property
+    def max_health(self) -> int:
+        return self.kind.health
+
+    @property
+    def attack_power(self) -> int:
+        return self.kind.attack_power
+
+    @property
+    def reward(self) -> int:
+        return self.kind.reward
+
+    @property
+    def color(self):
+        return self.kind.color
+
+    @property
+    def radius(self) -> int:
+        return self.kind.radius
+
+    @property
+    def image(self):
+        # 圖片只在需要繪製時才載入，模擬核心不依賴 pygame
+        from ..utils.image_loader import sprite
+        return sprite(self.kind)
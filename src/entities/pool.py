@@ -0,0 +1,34 @@
+from typing import Callable, Generic, List, TypeVar
+
+T = TypeVar('T')
+
+class EntityPool(Generic[T]):
+    """Free list that recycles dead entities through their reset() method."""
+
+    def __init__(self, factory: Callable[..., T], max_size: int = 10000):
+        self.factory = factory
+        self.max_size = max_size
+        self._free: List[T] = []
+        self.created = 0
+        self.reused = 0
+
+    def __len__(self) -> int:
+        return len(self._free)
+
+    def acquire(self, *args) -> T:
+        if self._free:
+            entity = self._free.pop()
+            entity.reset(*args)
+            self.reused += 1
+            return entity
+        self.created += 1
+        return self.factory(*args)
+
+    def release(self, entity: T) -> None:
+        if len(self._free) < self.max_size:
+            self._free.append(entity)
+
+    def release_all(self, entities) -> None:
+        room = self.max_size - len(self._free)
+        if room > 0:
+            self._free.extend(entities[:room] if isinstance(entities, list) else list(entities)[:room])
@@ -1,35 +1,48 @@
 from typing import TYPE_CHECKING
-from ..config_manager import CONFIG
+from ..config_manager import current_config
+from ..telemetry import KILL
 
 if TYPE_CHECKING:
+    from ..config_manager import GameConfig
     from ..game_state import GameState
 
 class Projectile:
-    def __init__(self, x: int, y: int, game_state: 'GameState', damage: int):
+    # anchor_tick / event_id 供事件驅動引擎使用：x 所對應的幀與目前有效的排程
+    __slots__ = ('x', 'y', 'row', 'damage', 'speed', 'radius', 'anchor_tick', 'event_id')
+
+    def __init__(self, x: int, y: int, damage: int):
+        self.reset(x, y, damage)
+
+    def reset(self, x: int, y: int, damage: int) -> None:
+        config = current_config()
         self.x = x
         self.y = y
-        self.speed = CONFIG['projectile']['speed']
-        self.radius = CONFIG['projectile']['radius']
-        self.game_state = game_state
+        self.row = config.grid.row_of(y)
         self.damage = damage
+        self.speed = config.projectile_speed
+        self.radius = config.projectile_radius
+        self.anchor_tick = 0
+        self.event_id = -1
 
-    def move(self) -> bool:
+    def move(self, game_state: 'GameState', config: 'GameConfig') -> bool:
         # 子彈只往右移動
         self.x += self.speed
         
-        # 檢查是否擊中敵人
-        for enemy in self.game_state.enemies[:]:
-            if (abs(self.x - enemy.x) < (self.radius + enemy.radius) and
-                abs(self.y - enemy.y) < (self.radius + enemy.radius)):
-                enemy.health -= self.damage
-                if enemy.health <= 0:
-                    self.game_state.enemies.remove(enemy)
-                    self.game_state.score += 1
-                    self.game_state.money += enemy.reward
-                return False
+        # 檢查是否擊中敵人：只需查詢同一行中 x 落在碰撞範圍內的敵人
+        reach = self.radius + config.enemy_radius
+        enemy = game_state.enemy_lanes.first_between(self.row, self.x - reach, self.x + reach)
+        if enemy is not None:
+            enemy.health -= self.damage
+            if enemy.health <= 0:
+                game_state.remove_enemy(enemy)
+                game_state.score += 1
+                game_state.money += enemy.reward
+                if game_state.telemetry is not None:
+                    game_state.telemetry.emit(KILL, self.row, enemy.x, enemy.reward)
+            return False
         
         # 如果子彈超出螢幕，則移除
-        if self.x > CONFIG['window']['width']:
+        if self.x > config.width:
             return False
             
         return True
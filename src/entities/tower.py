@@ -1,7 +1,8 @@
-from typing import Optional
-import pygame
-from ..config_manager import CONFIG
-from ..utils.image_loader import load_image
+from typing import TYPE_CHECKING, Optional, Set
+from ..config_manager import current_config
+if TYPE_CHECKING:
+    from .enemy import Enemy
+    from ..game_state import GameState
 
 class Tower:
     def __init__(self, x: int, y: int, tower_type: str = 'normal'):
@@ -9,17 +10,46 @@ class Tower:
         self.y = y
         self.tower_type = tower_type
         
-        # 從配置中獲取該類型植物的屬性
-        tower_config = CONFIG['tower']['types'][tower_type]
-        self.attack_cooldown_max = tower_config['attack_cooldown']
-        self.attack_cooldown = 0
-        self.health = tower_config['initial_health']
-        self.max_health = tower_config['initial_health']
-        self.damage = tower_config['damage']
-        self.color = tower_config['color']
-        
-        # 根據植物類型加載不同圖片
-        image_key = 'strong_tower' if tower_type == 'strong' else 'tower'
-        image_path = CONFIG['images'][image_key]
-        size = (CONFIG['tower_size']['width'], CONFIG['tower_size']['height'])
-        self.image = load_image(image_path, size)
+        # 從編譯後的配置中獲取該類型植物的屬性
+        self.kind = current_config().tower_types[tower_type]
+        self.attack_cooldown_max = self.kind.attack_cooldown
+        # 引擎排程冷卻時記下開始倒數的幀，attack_cooldown 隨遊戲的幀數推算，不必每幀遞減
+        self._cooldown = 0
+        self._cooldown_tick = 0
+        self._cooldown_clock: Optional['GameState'] = None
+        self.health = self.kind.health
+        self.max_health = self.kind.health
+        self.damage = self.kind.damage
+        self.color = self.kind.color
+        # 以此防禦塔為目標的敵人，由 Enemy.current_target 維護
+        self.attackers: Set['Enemy'] = set()
+
+    @property
+    def attack_cooldown(self) -> float:
+        clock = self._cooldown_clock
+        if clock is None:
+            return self._cooldown
+        return self._cooldown - (clock.tick - self._cooldown_tick)
+
+    @attack_cooldown.setter
+    def attack_cooldown(self, value: float) -> None:
+        self._cooldown = value
+        if self._cooldown_clock is not None:
+            self._cooldown_tick = self._cooldown_clock.tick
+
+    def run_cooldown(self, clock: 'GameState', tick: int, cooldown: float) -> None:
+        """Count down from `cooldown` (its value at the start of `tick`) as ``clock.tick`` advances."""
+        self._cooldown = cooldown
+        self._cooldown_tick = tick
+        self._cooldown_clock = clock
+
+    def hold_cooldown(self) -> None:
+        """Stop counting down, keeping the current value."""
+        self._cooldown = self.attack_cooldown
+        self._cooldown_clock = None
+
+    @property
+    def image(self):
+        # 圖片只在需要繪製時才載入，模擬核心不依賴 pygame
+        from ..utils.image_loader import sprite
+        return sprite(self.kind)
@@ -0,0 +1,40 @@
+"""Measure the memory cost of live entities.
+
+    python -m src.entity_memory --count 10000
+"""
+import argparse
+import tracemalloc
+from typing import Callable, Dict
+from .config_manager import CONFIG
+from .entities.enemy import Enemy
+from .entities.projectile import Projectile
+
+def bytes_per_entity(factory: Callable[[int], object], count: int) -> float:
+    """Average traced allocation per object while `count` of them are alive."""
+    factory(0)  # 先建立一次，排除型別快取等一次性配置
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        entities = [factory(i) for i in range(count)]
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del entities
+    return (after - before) / count
+
+def measure(count: int = 10000) -> Dict[str, float]:
+    rows = CONFIG['grid']['rows']
+    return {
+        'enemy': bytes_per_entity(lambda i: Enemy(i % rows, 'normal'), count),
+        'projectile': bytes_per_entity(lambda i: Projectile(80, 50 + i % rows, 15), count),
+    }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Report bytes per live entity')
+    parser.add_argument('--count', type=int, default=10000)
+    args = parser.parse_args()
+    for name, size in measure(args.count).items():
+        print(f'{name:<11} {size:8.1f} B')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+from typing import TYPE_CHECKING, Optional
+import pygame
+from .config_manager import current_config
+
+if TYPE_CHECKING:
+    from .camera import Camera
+    from .game_state import GameState
+    from .profiler import TickProfiler
+    from .replay import ReplayRecorder
+    from .timestep import FixedTimestep
+
+# 數字鍵 1-4 對應 FixedTimestep.SPEEDS 中的速度
+SPEED_KEYS = (pygame.K_1, pygame.K_2, pygame.K_3, pygame.K_4)
+ZOOM_IN_KEYS = (pygame.K_EQUALS, pygame.K_PLUS, pygame.K_KP_PLUS)
+ZOOM_OUT_KEYS = (pygame.K_MINUS, pygame.K_KP_MINUS)
+# 按住方向鍵時每幀捲動的螢幕像素
+PAN_SPEED = 12
+PAN_KEYS = ((pygame.K_LEFT, -1, 0), (pygame.K_RIGHT, 1, 0), (pygame.K_UP, 0, -1), (pygame.K_DOWN, 0, 1))
+
+class EventHandler:
+    def __init__(self, game_state: 'GameState', recorder: Optional['ReplayRecorder'] = None,
+                 timestep: Optional['FixedTimestep'] = None,
+                 profiler: Optional['TickProfiler'] = None,
+                 camera: Optional['Camera'] = None):
+        self.game_state = game_state
+        self.recorder = recorder
+        self.timestep = timestep
+        self.profiler = profiler
+        self.camera = camera
+
+    def handle_events(self) -> bool:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                return False
+            elif event.type == pygame.KEYDOWN:
+                # F3 開關效能分析覆蓋層
+                if event.key == pygame.K_F3 and self.profiler:
+                    self.profiler.toggle()
+                # Tab 循環切換遊戲速度，數字鍵直接指定
+                elif event.key == pygame.K_TAB and self.timestep:
+                    self.timestep.cycle_speed()
+                elif event.key in SPEED_KEYS and self.timestep:
+                    self.timestep.set_speed(self.timestep.SPEEDS[SPEED_KEYS.index(event.key)])
+                # +/- 以畫面中心縮放，Home 回到原始視角
+                elif event.key in ZOOM_IN_KEYS + ZOOM_OUT_KEYS and self.camera:
+                    camera = self.camera
+                    camera.zoom_at(1 if event.key in ZOOM_IN_KEYS else -1,
+                                   camera.view_width / 2, camera.view_height / 2)
+                elif event.key == pygame.K_HOME and self.camera:
+                    self.camera.reset()
+            elif event.type == pygame.MOUSEWHEEL and self.camera:
+                # 滾輪以游標位置為中心縮放
+                self.camera.zoom_at(1 if event.y > 0 else -1, *pygame.mouse.get_pos())
+            elif event.type == pygame.MOUSEBUTTONDOWN and not self.game_state.game_over:
+                mouse_x, mouse_y = event.pos
+
+                # 右鍵點擊切換植物類型
+                if event.button == 3:  # 右鍵
+                    self.select_tower_type(
+                        'strong' if self.game_state.selected_tower_type == 'normal' else 'normal'
+                    )
+                # 左鍵放置植物
+                elif event.button == 1:
+                    if self.camera:
+                        mouse_x, mouse_y = map(int, self.camera.to_world(mouse_x, mouse_y))
+                    cell = current_config().grid.cell_at(mouse_x, mouse_y)
+                    if cell is not None:
+                        self.place_tower(*cell)
+
+        if self.camera:
+            # 方向鍵按住時持續捲動
+            pressed = pygame.key.get_pressed()
+            dx = sum(x for key, x, _ in PAN_KEYS if pressed[key])
+            dy = sum(y for key, _, y in PAN_KEYS if pressed[key])
+            if dx or dy:
+                self.camera.pan(dx * PAN_SPEED, dy * PAN_SPEED)
+        return True
+
+    def select_tower_type(self, tower_type: str) -> None:
+        self.game_state.selected_tower_type = tower_type
+        if self.recorder:
+            self.recorder.record_select(self.game_state.tick, tower_type)
+
+    def place_tower(self, row: int, col: int) -> bool:
+        tower_type = self.game_state.selected_tower_type
+        if not self.game_state.place_tower(row, col, tower_type):
+            return False
+        if self.recorder:
+            self.recorder.record_place(self.game_state.tick, row, col, tower_type)
+        return True
@@ -0,0 +1,193 @@
+import math
+from heapq import heappop, heappush
+from itertools import count
+from typing import TYPE_CHECKING, Dict, List, Tuple
+from .config_manager import current_config
+from .entities.projectile import Projectile
+from .game_logic import GameLogic
+from .telemetry import KILL
+
+if TYPE_CHECKING:
+    from .config_manager import GameConfig
+    from .game_state import GameState
+
+# 浮點誤差的容許量：排程寧可提早一幀檢查，也不能晚
+_EPSILON = 1e-9
+
+class EventGameLogic(GameLogic):
+    """GameLogic that schedules projectile collisions instead of testing every tick.
+
+    Projectiles move right at a fixed speed and enemies move left no faster
+    than the fastest enemy seen so far, so the nearest enemy ahead gives a
+    lower bound on the tick a projectile can first hit anything. Each
+    projectile is only looked at on that tick (or when it leaves the screen);
+    if nothing is in reach yet it is rescheduled. Blocked or killed enemies
+    can only delay an impact, so the only lane change that needs a reschedule
+    is a spawn, which wakes every projectile in that lane.
+
+    Results match GameLogic tick for tick. Projectile positions are only
+    brought up to date when a projectile is checked; with
+    ``mirror_objects=True`` they are written back to ``GameState.projectiles``
+    every tick, otherwise call ``sync_state()`` before reading them.
+    """
+
+    def __init__(self, game_state: 'GameState', mirror_objects: bool = True):
+        super().__init__(game_state)
+        self.mirror_objects = mirror_objects
+        # 佇列項目 (到期幀, 發射順序, 排程編號, 子彈)；同一幀內依發射順序處理，與逐幀引擎一致
+        self._queue: List[Tuple[int, int, int, Projectile]] = []
+        self._event_ids = count()
+        self._births = count()
+        self._birth: Dict[Projectile, int] = {}
+        self._lanes: List[Dict[Projectile, None]] = [{} for _ in range(current_config().grid.rows)]
+        self._max_enemy_speed = 0.0
+        self.events = 0
+        self._load_state()
+
+    # ------------------------------------------------------------------
+    # 狀態同步
+    # ------------------------------------------------------------------
+    def _load_state(self) -> None:
+        state = self.game_state
+        config = current_config()
+        self._queue.clear()
+        self._birth.clear()
+        for lane in self._lanes:
+            lane.clear()
+        self._max_enemy_speed = max([kind.speed for kind in config.enemy_types.values()] +
+                                    [enemy.speed for enemy in state.enemies])
+        # 既有子彈的 x 是上一幀的位置，這一幀全部檢查一次
+        for projectile in state.projectiles:
+            self._track(projectile, state.tick - 1)
+            self._push(projectile, state.tick)
+        if not self.mirror_objects:
+            state.projectiles.clear()
+            state.sync_lanes()
+
+    def sync_state(self) -> None:
+        """Bring every projectile's x up to the last simulated tick and list them on GameState."""
+        super().sync_state()
+        self._advance(self.game_state.tick - 1)
+        self._publish()
+
+    def _advance(self, tick: int) -> None:
+        for projectile in self._birth:
+            if projectile.anchor_tick < tick:
+                projectile.x += projectile.speed * (tick - projectile.anchor_tick)
+                projectile.anchor_tick = tick
+
+    def _publish(self) -> None:
+        state = self.game_state
+        state.projectiles[:] = self._birth
+        state.sync_lanes()
+
+    def reschedule(self) -> None:
+        """Re-check every projectile next tick, e.g. after editing the state by hand."""
+        super().reschedule()
+        self._wake_projectiles()
+
+    def _enemies_edited(self) -> None:
+        super()._enemies_edited()
+        self._wake_projectiles()
+
+    def _wake_projectiles(self) -> None:
+        # 敵人可能是直接加入列表的：更新最快速度，所有子彈在這一幀重新檢查
+        self._max_enemy_speed = max([self._max_enemy_speed] + [e.speed for e in self.game_state.enemies])
+        for projectile in self._birth:
+            self._push(projectile, self.game_state.tick)
+
+    def _track(self, projectile: Projectile, anchor_tick: int) -> None:
+        projectile.anchor_tick = anchor_tick
+        self._birth[projectile] = next(self._births)
+        self._lanes[projectile.row][projectile] = None
+
+    def _untrack(self, projectile: Projectile) -> None:
+        projectile.event_id = -1
+        del self._birth[projectile]
+        del self._lanes[projectile.row][projectile]
+
+    def _push(self, projectile: Projectile, due: int) -> None:
+        # 舊的排程不必從堆積中刪除，彈出時比對編號即可忽略
+        event_id = next(self._event_ids)
+        projectile.event_id = event_id
+        heappush(self._queue, (due, self._birth[projectile], event_id, projectile))
+
+    def _schedule(self, projectile: Projectile, config: 'GameConfig') -> None:
+        """Queue the earliest tick after anchor_tick at which the projectile can hit or leave."""
+        x, speed = projectile.x, projectile.speed
+        reach = projectile.radius + config.enemy_radius
+        ticks = math.inf
+        if speed > 0:
+            ticks = math.floor((config.width - x) / speed) + 1
+        closing = speed + self._max_enemy_speed
+        if closing > 0:
+            nearest = self.game_state.enemy_lanes.first_between(projectile.row, x - reach, math.inf)
+            if nearest is not None:
+                gap = nearest.x - (x + reach)
+                ticks = min(ticks, math.floor(gap / closing - _EPSILON) + 1)
+        if ticks != math.inf:
+            # 不會撞到也不會離開的子彈只能被生成事件喚醒
+            self._push(projectile, projectile.anchor_tick + max(1, ticks))
+
+    # ------------------------------------------------------------------
+    # 遊戲階段
+    # ------------------------------------------------------------------
+    def _spawn_enemy(self) -> None:
+        state = self.game_state
+        spawned = len(state.enemies)
+        super()._spawn_enemy()
+        # 新敵人可能讓同一行的子彈提早命中，喚醒該行所有子彈在這一幀重新檢查；
+        # 波次一次生成多個敵人時每行只喚醒一次
+        rows = set()
+        for enemy in state.enemies[spawned:]:
+            self._max_enemy_speed = max(self._max_enemy_speed, enemy.speed)
+            rows.add(state.enemy_lanes.row_of(enemy))
+        for row in rows:
+            for projectile in self._lanes[row]:
+                self._push(projectile, state.tick)
+
+    def _update_projectiles(self) -> None:
+        state = self.game_state
+        state.sync_lanes()
+        config = current_config()
+        tick = state.tick
+        queue = self._queue
+        pool = state.projectile_pool
+
+        while queue and queue[0][0] <= tick:
+            _, _, event_id, projectile = heappop(queue)
+            if projectile.event_id != event_id:
+                continue  # 已被重新排程或已移除
+            self.events += 1
+            projectile.x += projectile.speed * (tick - projectile.anchor_tick)
+            projectile.anchor_tick = tick
+
+            # 與 Projectile.move 相同的命中判定
+            reach = projectile.radius + config.enemy_radius
+            enemy = state.enemy_lanes.first_between(projectile.row, projectile.x - reach,
+                                                    projectile.x + reach)
+            if enemy is not None:
+                enemy.health -= projectile.damage
+                if enemy.health <= 0:
+                    state.remove_enemy(enemy)
+                    state.score += 1
+                    state.money += enemy.reward
+                    if state.telemetry is not None:
+                        state.telemetry.emit(KILL, projectile.row, enemy.x, enemy.reward)
+            elif projectile.x <= config.width:
+                self._schedule(projectile, config)
+                continue
+            self._untrack(projectile)
+            pool.release(projectile)
+
+        if self.mirror_objects:
+            self._advance(tick)
+            self._publish()
+
+    def _fire(self, x: int, y: int, damage: int) -> None:
+        state = self.game_state
+        projectile = state.projectile_pool.acquire(x, y, damage)
+        self._track(projectile, state.tick)
+        self._schedule(projectile, current_config())
+        if self.mirror_objects:
+            state.add_projectile(projectile)
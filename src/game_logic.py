@@ -1,96 +1,285 @@
-import random
-from typing import TYPE_CHECKING
+import math
+from typing import TYPE_CHECKING, Dict, List, Optional
 if TYPE_CHECKING:
+    from .entities.tower import Tower
     from .game_state import GameState
-from .entities.enemy import Enemy
-from .entities.projectile import Projectile
-from .config_manager import CONFIG
+    from .profiler import TickProfiler
+    from .waves import WaveSpawner
+from .config_manager import current_config
+from .telemetry import ESCAPE, SHOT, SPAWN, TOWER_LOST
+from .timing_wheel import TimingWheel
 
 class GameLogic:
+    """Tick-by-tick simulation over the GameState object lists.
+
+    Towers are only looked at on the tick their cooldown runs out. A ready
+    tower with nothing to shoot at is parked on its row until an enemy spawns
+    there, since nothing else can bring a target into range; enemies added to
+    ``GameState.enemies`` between ticks wake every parked tower. Nothing counts
+    cooldowns down in between: ``Tower.attack_cooldown`` is worked out from
+    the tick its countdown started, so it is always current.
+    """
+
     def __init__(self, game_state: 'GameState'):
         self.game_state = game_state
+        self.profiler: Optional['TickProfiler'] = None
+        # 設定後以波次檔取代預設的定時隨機生成
+        self.waves: Optional['WaveSpawner'] = None
+        # 冷卻中的防禦塔依到期幀排在時間輪上，閒置的防禦塔停在所在的行
+        self.tower_timers: TimingWheel['Tower'] = TimingWheel(game_state.tick)
+        self._tower_order: Dict['Tower', int] = {}
+        self._towers_version = -1
+        # 上一幀結束時的敵人列表版本；兩幀之間被直接修改過就喚醒停著的防禦塔
+        self._enemies_version = game_state.enemies.version
+        self._parked: List[Dict['Tower', None]] = [{} for _ in range(current_config().grid.rows)]
+        self._load_towers()
 
     def update(self) -> None:
         if not self.game_state.game_over:
-            self._spawn_enemy()
-            self._update_enemies()
-            self._update_projectiles()
-            self._tower_attack()
+            state = self.game_state
+            if state.enemies.version != self._enemies_version:
+                self._enemies_edited()
+            profiler = self.profiler
+            if profiler is None or not profiler.enabled:
+                self._spawn_enemy()
+                self._update_enemies()
+                self._update_projectiles()
+                self._tower_attack()
+            else:
+                profiler.time('_spawn_enemy', self._spawn_enemy)
+                profiler.time('_update_enemies', self._update_enemies)
+                profiler.time('_update_projectiles', self._update_projectiles)
+                profiler.time('_tower_attack', self._tower_attack)
+                profiler.count_entities(len(state.towers), len(state.enemies), len(state.projectiles))
+            # 這一幀的生成與擊殺都已處理，之後的版本變化來自引擎以外
+            self._enemies_version = state.enemies.version
+            telemetry = state.telemetry
+            if telemetry is not None:
+                telemetry.end_tick(state)
+            state.tick += 1
+
+    # ------------------------------------------------------------------
+    # 防禦塔冷卻排程
+    # ------------------------------------------------------------------
+    def _load_towers(self) -> None:
+        # 新加入的防禦塔依目前的冷卻排程；列表順序決定同一幀內的開火順序
+        state = self.game_state
+        order = {tower: i for i, tower in enumerate(state.towers)}
+        for tower in self._tower_order.keys() - order.keys():
+            self._untrack_tower(tower)
+        for tower in order.keys() - self._tower_order.keys():
+            self._schedule_tower(tower, state.tick)
+        self._tower_order = order
+        self._towers_version = state.towers.version
+
+    def _schedule_tower(self, tower: 'Tower', tick: int) -> None:
+        """Wake `tower` when attack_cooldown (its value at the start of `tick`) runs out."""
+        cooldown = tower.attack_cooldown
+        tower.run_cooldown(self.game_state, tick, cooldown)
+        self.tower_timers.schedule(tower, tick + max(0, math.ceil(cooldown)))
+
+    def _untrack_tower(self, tower: 'Tower') -> None:
+        self._tower_order.pop(tower, None)
+        tower.hold_cooldown()
+        self.tower_timers.cancel(tower)
+        self._parked[current_config().grid.row_of(tower.y)].pop(tower, None)
 
+    def _wake_row(self, row: int) -> None:
+        parked = self._parked[row]
+        if parked:
+            tick = self.game_state.tick
+            for tower in parked:
+                self._schedule_tower(tower, tick)
+            parked.clear()
+
+    def _enemies_edited(self) -> None:
+        # 不知道新敵人在哪幾行，所有停著的防禦塔都在這一幀重新檢查
+        for row in range(len(self._parked)):
+            self._wake_row(row)
+
+    def sync_state(self) -> None:
+        """Nothing to write back: this engine works on the GameState objects directly."""
+
+    def reschedule(self) -> None:
+        """Re-read tower cooldowns and re-check parked towers, e.g. after editing the state by hand."""
+        self.tower_timers.clear()
+        for parked in self._parked:
+            parked.clear()
+        self._tower_order = {}
+        self._load_towers()
+        self._enemies_version = self.game_state.enemies.version
+
+    # ------------------------------------------------------------------
+    # 遊戲階段
+    # ------------------------------------------------------------------
     def _update_projectiles(self) -> None:
-        # 更新所有子彈的位置，並移除已經消失的子彈
-        self.game_state.projectiles = [p for p in self.game_state.projectiles if p.move()]
+        state = self.game_state
+        state.sync_lanes()
+        config = current_config()
+        # 更新所有子彈的位置，回收已經消失的子彈，再一次換掉列表內容
+        projectiles = state.projectiles
+        pool = state.projectile_pool
+        alive = []
+        for projectile in projectiles:
+            if projectile.move(state, config):
+                alive.append(projectile)
+            else:
+                pool.release(projectile)
+        projectiles[:] = alive
+        # 子彈都移動過，列表也換過，sync_lanes 會重建子彈索引
+        state.sync_lanes()
 
     def _spawn_enemy(self) -> None:
+        if self.waves is not None:
+            self._spawn_wave()
+            return
+        config = current_config()
         self.game_state.spawn_timer += 1
-        if self.game_state.spawn_timer >= CONFIG['enemy']['spawn_interval']:
+        if self.game_state.spawn_timer >= config.spawn_interval:
             self.game_state.spawn_timer = 0
-            row = random.randint(0, CONFIG['grid']['rows'] - 1)
+            rng = self.game_state.rng
+            row = rng.randint(0, config.grid.rows - 1)
             
             # 根據分數決定是否生成強力殭屍
-            if (self.game_state.score >= CONFIG['game']['strong_enemy_score'] and 
-                random.random() < 0.3):  # 30% 機率生成強力殭屍
-                self.game_state.enemies.append(Enemy(row, 'strong'))
+            if (self.game_state.score >= config.strong_enemy_score and 
+                rng.random() < 0.3):  # 30% 機率生成強力殭屍
+                enemy = self.game_state.spawn_enemy(row, 'strong')
             else:
-                self.game_state.enemies.append(Enemy(row, 'normal'))
+                enemy = self.game_state.spawn_enemy(row, 'normal')
+            telemetry = self.game_state.telemetry
+            if telemetry is not None:
+                telemetry.emit(SPAWN, row, enemy.enemy_type)
+            # 只有新生成的敵人能讓停著的防禦塔重新有目標
+            self._wake_row(row)
+
+    def _spawn_wave(self) -> None:
+        state = self.game_state
+        rows = set()
+        telemetry = state.telemetry
+        for row, enemy_type in self.waves.due(state.tick):
+            state.spawn_enemy(row, enemy_type)
+            rows.add(row)
+            if telemetry is not None:
+                telemetry.emit(SPAWN, row, enemy_type)
+        for row in rows:
+            self._wake_row(row)
 
     def _update_enemies(self) -> None:
-        grid_margin = CONFIG['grid']['margin']
-        grid_size = CONFIG['grid']['size']
+        config = current_config()
+        grid = config.grid
+        grid_margin = grid.margin
+        grid_size = grid.size
+        attack_cooldown = config.enemy_attack_cooldown
+        cols = grid.cols
+        state = self.game_state
+        state.sync_lanes()
+        tower_grid = state.tower_grid
+        escaped = []
         
-        for enemy in self.game_state.enemies[:]:
-            if enemy.current_target:
+        for enemy in state.enemies:
+            target = enemy.current_target
+            if target is not None:
                 if enemy.attack_cooldown <= 0:
-                    enemy.current_target.health -= enemy.attack_power
-                    enemy.attack_cooldown = CONFIG['enemy']['attack_cooldown']
+                    target.health -= enemy.attack_power
+                    enemy.attack_cooldown = attack_cooldown
                     
-                    if enemy.current_target.health <= 0:
-                        if enemy.current_target in self.game_state.towers:
-                            self.game_state.towers.remove(enemy.current_target)
-                        for e in self.game_state.enemies:
-                            if e.current_target == enemy.current_target:
-                                e.current_target = None
+                    if target.health <= 0:
+                        if state.has_tower(target):
+                            state.remove_tower(target)
+                            self._untrack_tower(target)
+                            if state.telemetry is not None:
+                                state.telemetry.emit(TOWER_LOST, grid.row_of(target.y),
+                                                     int((target.x - grid_margin) // grid_size))
+                        # 反向索引直接列出以此防禦塔為目標的敵人
+                        state.release_attackers(target)
                 else:
                     enemy.attack_cooldown -= 1
             else:
-                enemy_col = (enemy.x - grid_margin) // grid_size
-                enemy_row = (enemy.y - grid_margin) // grid_size
-                
-                for tower in self.game_state.towers:
-                    tower_col = (tower.x - grid_margin) // grid_size
-                    tower_row = (tower.y - grid_margin) // grid_size
-                    
-                    if (tower_row == enemy_row and 
-                        tower_col < enemy_col and 
-                        abs(enemy.x - (tower.x + grid_size)) < enemy.speed):
-                        enemy.current_target = tower
+                enemy_x = enemy.x
+                speed = enemy.speed
+                enemy_row = int((enemy.y - grid_margin) // grid_size)
+
+                # 阻擋條件 abs(enemy.x - (tower.x + grid_size)) < speed，且防禦塔在敵人所在格子的左邊：
+                # 只需由左到右檢查右緣落在 enemy.x - speed 之後的格子，通常只有一格
+                offset = enemy_x - grid_margin
+                col = int((offset - speed) // grid_size)
+                if col < 0:
+                    col = 0
+                end = int(offset // grid_size)
+                if end > cols:
+                    end = cols
+                cells = tower_grid[enemy_row]
+                while col < end:
+                    tower = cells[col]
+                    if tower is not None and abs(enemy_x - (tower.x + grid_size)) < speed:
+                        enemy.current_target = target = tower
                         break
-                
-                if not enemy.current_target:
-                    enemy.x -= enemy.speed
-                    if enemy.x < 0:
-                        self.game_state.enemies.remove(enemy)
-                        self.game_state.lives -= 1
-                        self.game_state.check_game_over()
+                    col += 1
+
+                if target is None:
+                    enemy.x = enemy_x = enemy_x - speed
+                    if enemy_x < 0:
+                        escaped.append(enemy)
+                        state.lives -= 1
+                        state.check_game_over()
+                        if state.telemetry is not None:
+                            state.telemetry.emit(ESCAPE, enemy_row)
+
+        for enemy in escaped:
+            state.remove_enemy(enemy)
+        state.enemy_lanes.resort()
 
     def _tower_attack(self) -> None:
-        grid_margin = CONFIG['grid']['margin']
-        grid_size = CONFIG['grid']['size']
-        
-        for tower in self.game_state.towers:
-            if tower.attack_cooldown <= 0:
-                # 檢查同一行是否有敵人
-                tower_row = (tower.y - grid_margin) // grid_size
-                for enemy in self.game_state.enemies:
-                    enemy_row = (enemy.y - grid_margin) // grid_size
-                    enemy_col = (enemy.x - grid_margin) // grid_size
-                    tower_col = (tower.x - grid_margin) // grid_size
-                    
-                    if enemy_row == tower_row and enemy_col > tower_col:
-                        self.game_state.projectiles.append(
-                            Projectile(tower.x + grid_size, tower.y + grid_size // 2,
-                                     self.game_state, tower.damage))
-                        tower.attack_cooldown = tower.attack_cooldown_max
-                        break
+        grid = current_config().grid
+        grid_margin = grid.margin
+        grid_size = grid.size
+        state = self.game_state
+        state.sync_lanes()
+        if state.towers.version != self._towers_version:
+            self._load_towers()
+        tick = state.tick
+        ready = self.tower_timers.advance(tick)
+        if not ready:
+            return
+        # 同一幀內依防禦塔列表的順序開火，與逐一倒數冷卻時相同
+        ready.sort(key=self._tower_order.__getitem__)
+        schedule = self.tower_timers.schedule
+        ceil = math.ceil
+
+        for tower in ready:
+            # 檢查同一行是否有位於防禦塔右側格子的敵人（只需看最右邊的敵人）
+            tower_row = grid.row_of(tower.y)
+            tower_col = (tower.x - grid_margin) // grid_size
+            rightmost = state.enemy_lanes.last(tower_row)
+
+            if rightmost is not None and rightmost.x >= grid_margin + (tower_col + 1) * grid_size:
+                self._fire(tower.x + grid_size, tower.y + grid_size // 2, tower.damage)
+                if state.telemetry is not None:
+                    state.telemetry.emit(SHOT, tower_row, int(tower_col), tower.damage)
+                # 與 _schedule_tower(tower, tick + 1) 相同，展開以減少開火時的呼叫
+                cooldown = tower.attack_cooldown_max
+                tower.run_cooldown(state, tick + 1, cooldown)
+                schedule(tower, tick + 1 + ceil(cooldown))
             else:
-                tower.attack_cooldown -= 1
+                tower.hold_cooldown()
+                self._parked[tower_row][tower] = None
+
+    def _fire(self, x: int, y: int, damage: int) -> None:
+        self.game_state.fire_projectile(x, y, damage)
+
+ENGINES = ('object', 'event', 'numpy', 'sharded')
+
+def create_game_logic(game_state: 'GameState', engine: str = 'object', **options):
+    """Build the simulation engine selected by name (see ENGINES)."""
+    if engine == 'object':
+        return GameLogic(game_state)
+    if engine == 'event':
+        from .event_logic import EventGameLogic
+        return EventGameLogic(game_state, **options)
+    if engine == 'numpy':
+        from .array_logic import ArrayGameLogic
+        return ArrayGameLogic(game_state, **options)
+    if engine == 'sharded':
+        from .sharded_logic import ShardedGameLogic
+        return ShardedGameLogic(game_state, **options)
+    raise ValueError(f'Unknown engine: {engine}')
@@ -1,25 +1,251 @@
-from typing import List
-import pygame
+import random
+from itertools import count
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Tuple
 from .entities.tower import Tower
 from .entities.enemy import Enemy
 from .entities.projectile import Projectile
-from .config_manager import CONFIG
+from .config_manager import current_config
+from .entities.pool import EntityPool
+from .lane_index import LaneIndex
+if TYPE_CHECKING:
+    from .telemetry import Telemetry
+
+# 所有列表共用的版本號來源：整個列表被換掉後也不會再出現看過的版本號
+_versions = count()
+
+class EntityList(list):
+    """A list whose version changes on every edit, so GameState and the engines can tell when they are stale."""
+    __slots__ = ('version',)
+
+    def __init__(self, items: Iterable = ()):
+        super().__init__(items)
+        self.version = next(_versions)
+
+def _counted(name: str):
+    method = getattr(list, name)
+    def change(self, *args, **kwargs):
+        self.version = next(_versions)
+        return method(self, *args, **kwargs)
+    change.__name__ = name
+    return change
+
+for _name in ('append', 'extend', 'insert', 'remove', 'pop', 'clear', 'sort', 'reverse',
+              '__setitem__', '__delitem__', '__iadd__', '__imul__'):
+    setattr(EntityList, _name, _counted(_name))
 
 class GameState:
-    def __init__(self):
-        self.money = CONFIG['game']['initial_money']
+    def __init__(self, seed: Optional[int] = None):
+        # 每局遊戲擁有自己的亂數產生器，相同種子可以重現整局
+        self.seed = seed if seed is not None else random.randrange(1 << 32)
+        self.rng = random.Random(self.seed)
+        self.tick = 0
+        config = current_config()
+        self.money = config.initial_money
         self.score = 0
-        self.lives = CONFIG['game']['initial_lives']
-        self.towers: List[Tower] = []
-        self.enemies: List[Enemy] = []
-        self.projectiles: List[Projectile] = []
+        self.lives = config.initial_lives
+        # 列表可以直接修改；索引記下建立時的版本號，sync_lanes 比對後才重建
+        self._towers = EntityList()
+        self._enemies = EntityList()
+        self._projectiles = EntityList()
         self.spawn_timer = 0
         self.game_over = False
         self.selected_tower_type = 'normal'
 
+        # 依行分桶、依 x 排序的索引，用於瞄準與碰撞查詢
+        rows = config.grid.rows
+        self.enemy_lanes = LaneIndex(rows)
+        self.projectile_lanes = LaneIndex(rows)
+
+        # 每個格子上的防禦塔（取代依行排序的防禦塔索引）；正在攻擊每座防禦塔的敵人記在 Tower.attackers
+        self.tower_grid: List[List[Optional[Tower]]] = [[None] * config.grid.cols for _ in range(rows)]
+        self._towers_seen = self._towers.version
+        self._enemies_seen = self._enemies.version
+        self._projectiles_seen = self._projectiles.version
+        # 被擊殺的敵人先從索引移除，每幀從列表中一次壓縮掉（保留順序），避免每次 list.remove
+        self._removed: Dict[Enemy, None] = {}
+
+        # 回收死亡的敵人與子彈，減少大量波次時的配置與 GC 負擔
+        self.enemy_pool: EntityPool[Enemy] = EntityPool(Enemy)
+        self.projectile_pool: EntityPool[Projectile] = EntityPool(Projectile)
+        # 設定後引擎會把遊戲事件交給它，由背景執行緒寫入檔案
+        self.telemetry: Optional['Telemetry'] = None
+
+    @property
+    def towers(self) -> List[Tower]:
+        return self._towers
+
+    @towers.setter
+    def towers(self, towers: Iterable[Tower]) -> None:
+        self._towers = EntityList(towers)
+        self._towers_seen = -1
+
+    @property
+    def enemies(self) -> List[Enemy]:
+        if self._removed:
+            self._flush_removed()
+        return self._enemies
+
+    @enemies.setter
+    def enemies(self, enemies: Iterable[Enemy]) -> None:
+        if self._removed:
+            self._flush_removed()
+        self._enemies = EntityList(enemies)
+        self._enemies_seen = -1
+
+    @property
+    def projectiles(self) -> List[Projectile]:
+        return self._projectiles
+
+    @projectiles.setter
+    def projectiles(self, projectiles: Iterable[Projectile]) -> None:
+        self._projectiles = EntityList(projectiles)
+        self._projectiles_seen = -1
+
     def check_game_over(self) -> bool:
         if self.lives <= 0:
             self.lives = 0  # 確保生命值不會變成負數
             self.game_over = True
             return True
         return False
+
+    def place_tower(self, row: int, col: int, tower_type: str) -> bool:
+        """Buy and place a tower on a grid cell; returns False if not allowed."""
+        config = current_config()
+        grid = config.grid
+        if not (0 <= row < grid.rows and 0 <= col < grid.cols):
+            return False
+        tower_cost = config.tower_types[tower_type].cost
+        if self.money < tower_cost:
+            return False
+        self.sync_lanes()  # 防禦塔列表可能被引擎直接改寫過
+        if self.tower_grid[row][col] is not None:
+            return False
+        self.add_tower(Tower(grid.col_x[col], grid.row_y[row], tower_type))
+        self.money -= tower_cost
+        return True
+
+    def _cell(self, tower: Tower) -> Optional[Tuple[int, int]]:
+        grid = current_config().grid
+        row, col = grid.row_of(tower.y), int((tower.x - grid.margin) // grid.size)
+        if 0 <= row < grid.rows and 0 <= col < grid.cols:
+            return row, col
+        return None
+
+    def tower_at(self, row: int, col: int) -> Optional[Tower]:
+        grid = current_config().grid
+        if 0 <= row < grid.rows and 0 <= col < grid.cols:
+            return self.tower_grid[row][col]
+        return None
+
+    def has_tower(self, tower: Tower) -> bool:
+        """Whether `tower` is placed on the grid, without scanning the tower list."""
+        cell = self._cell(tower)
+        return cell is not None and self.tower_grid[cell[0]][cell[1]] is tower
+
+    def add_tower(self, tower: Tower) -> None:
+        towers = self._towers
+        synced = towers.version == self._towers_seen
+        towers.append(tower)
+        cell = self._cell(tower)
+        if cell is not None:
+            self.tower_grid[cell[0]][cell[1]] = tower
+        if synced:
+            self._towers_seen = towers.version
+
+    def remove_tower(self, tower: Tower) -> None:
+        towers = self._towers
+        synced = towers.version == self._towers_seen
+        towers.remove(tower)
+        cell = self._cell(tower)
+        if cell is not None and self.tower_grid[cell[0]][cell[1]] is tower:
+            self.tower_grid[cell[0]][cell[1]] = None
+        if synced:
+            self._towers_seen = towers.version
+
+    def set_target(self, enemy: Enemy, tower: Optional[Tower]) -> None:
+        """Point `enemy` at `tower` (or None); same as assigning ``enemy.current_target``."""
+        enemy.current_target = tower
+
+    def release_attackers(self, tower: Tower) -> None:
+        """Clear the target of every enemy attacking `tower`."""
+        for enemy in list(tower.attackers):
+            enemy.current_target = None
+
+    def add_enemy(self, enemy: Enemy) -> None:
+        enemies = self.enemies
+        synced = enemies.version == self._enemies_seen
+        enemies.append(enemy)
+        self.enemy_lanes.add(enemy)
+        if synced:
+            self._enemies_seen = enemies.version
+
+    def spawn_enemy(self, row: int, enemy_type: str) -> Enemy:
+        if self._removed:
+            self._flush_removed()  # 先回收上一幀擊殺的敵人
+        enemy = self.enemy_pool.acquire(row, enemy_type)
+        self.add_enemy(enemy)
+        return enemy
+
+    def remove_enemy(self, enemy: Enemy) -> None:
+        """Take `enemy` out of play; it leaves the list at the next read of ``enemies``."""
+        if enemy in self._removed:
+            return
+        enemy.current_target = None
+        if self._enemies.version != self._enemies_seen:
+            self.sync_lanes()
+        self.enemy_lanes.remove(enemy)
+        self._removed[enemy] = None
+
+    def _flush_removed(self) -> None:
+        removed = self._removed
+        self._removed = {}
+        enemies = self._enemies
+        synced = enemies.version == self._enemies_seen
+        enemies[:] = [enemy for enemy in enemies if enemy not in removed]
+        if synced:
+            self._enemies_seen = enemies.version
+        self.enemy_pool.release_all(list(removed))
+
+    def fire_projectile(self, x: int, y: int, damage: int) -> Projectile:
+        projectile = self.projectile_pool.acquire(x, y, damage)
+        self.add_projectile(projectile)
+        return projectile
+
+    def add_projectile(self, projectile: Projectile) -> None:
+        projectiles = self._projectiles
+        synced = projectiles.version == self._projectiles_seen
+        projectiles.append(projectile)
+        self.projectile_lanes.add(projectile)
+        if synced:
+            self._projectiles_seen = projectiles.version
+
+    def sync_lanes(self) -> None:
+        # 如果列表被直接修改（未經 add_/remove_），版本號對不上，重建索引
+        if self._towers.version != self._towers_seen:
+            self._rebuild_tower_grid()
+        enemies = self.enemies
+        if enemies.version != self._enemies_seen:
+            self.enemy_lanes.rebuild(enemies)
+            self._enemies_seen = enemies.version
+        projectiles = self._projectiles
+        if projectiles.version != self._projectiles_seen:
+            self.projectile_lanes.rebuild(projectiles)
+            self._projectiles_seen = projectiles.version
+
+    def _rebuild_tower_grid(self) -> None:
+        for row in self.tower_grid:
+            row[:] = [None] * len(row)
+        for tower in self.towers:
+            cell = self._cell(tower)
+            if cell is not None:
+                self.tower_grid[cell[0]][cell[1]] = tower
+        self._towers_seen = self._towers.version
+
+    def rebuild_attackers(self) -> None:
+        # 敵人列表被整個換掉之後（例如還原快照），丟掉已不在列表中的敵人留下的記錄
+        for tower in self.towers:
+            tower.attackers.clear()
+        for enemy in self.enemies:
+            target = enemy.current_target
+            if target is not None:
+                target.attackers.add(enemy)
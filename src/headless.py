@@ -0,0 +1,157 @@
+"""Run games without a display or renderer, as fast as the CPU allows.
+
+    python -m src.headless --ticks 20000 --seed 7 --layout "0:0,1:0:strong,2:1@600"
+    python -m src.headless --ticks 5000 --snapshot checkpoint.tds --save-snapshot after.tds
+    python -m src.headless --ticks 20000 --waves waves/stress.jsonl --engine numpy
+    python -m src.headless --ticks 20000 --waves waves/stress.jsonl --engine sharded --shards 4
+    python -m src.headless --ticks 20000 --telemetry events.tdt --telemetry-format binary
+"""
+import argparse
+import json
+import time
+from collections import deque
+from pathlib import Path
+from typing import Iterable, List, NamedTuple, Optional, Tuple
+from .config_manager import CONFIG, current_config
+from .game_state import GameState
+from .game_logic import ENGINES, create_game_logic
+from .snapshot import load_snapshot, save_snapshot
+from .telemetry import FORMATS, Telemetry
+from .waves import load_waves
+
+class Placement(NamedTuple):
+    tick: int
+    row: int
+    col: int
+    tower_type: str = 'normal'
+
+class HeadlessResult(NamedTuple):
+    ticks: int
+    elapsed: float
+    score: int
+    lives: int
+    money: int
+    game_over: bool
+    money_curve: Tuple[int, ...] = ()
+
+    @property
+    def ticks_per_second(self) -> float:
+        return self.ticks / self.elapsed if self.elapsed > 0 else float('inf')
+
+def parse_layout(spec: str) -> List[Placement]:
+    """Parse "row:col[:type][@tick]" entries separated by commas."""
+    placements = []
+    for entry in filter(None, (part.strip() for part in spec.split(','))):
+        cell, _, tick = entry.partition('@')
+        fields = cell.split(':')
+        if len(fields) not in (2, 3):
+            raise ValueError(f'Invalid tower placement: {entry!r}')
+        tower_type = fields[2] if len(fields) == 3 else 'normal'
+        if tower_type not in CONFIG['tower']['types']:
+            raise ValueError(f'Unknown tower type: {tower_type!r}')
+        placements.append(Placement(int(tick or 0), int(fields[0]), int(fields[1]), tower_type))
+    return placements
+
+def load_layout(source: str) -> List[Placement]:
+    """Load a layout from a JSON file or parse it as an inline spec."""
+    path = Path(source)
+    if not path.is_file():
+        return parse_layout(source)
+    with open(path, 'r') as f:
+        entries = json.load(f)
+    placements = []
+    for entry in entries:
+        tower_type = entry.get('type', 'normal')
+        if tower_type not in CONFIG['tower']['types']:
+            raise ValueError(f'Unknown tower type at row {entry["row"]}, col {entry["col"]}: {tower_type!r}')
+        placements.append(Placement(entry.get('tick', 0), entry['row'], entry['col'], tower_type))
+    return placements
+
+def run_headless(ticks: int, seed: Optional[int] = None, layout: Iterable[Placement] = (),
+                 engine: str = 'object', sample_every: int = 0,
+                 game_state: Optional[GameState] = None, waves: Optional[str] = None,
+                 shards: Optional[int] = None, telemetry: Optional[Telemetry] = None) -> HeadlessResult:
+    """Run `ticks` ticks from a fresh game or from `game_state`, e.g. a restored snapshot.
+
+    Placement ticks count from the start of this run. `waves` is a wave file
+    that replaces the built-in spawning. `shards` is the number of worker
+    processes for the sharded engine (default: one per CPU). Game events go
+    to `telemetry` if given; closing it is left to the caller. Engines that
+    own worker processes are closed before returning.
+    """
+    if game_state is None:
+        game_state = GameState(seed)
+    if telemetry is not None:
+        game_state.telemetry = telemetry
+    options = {'mirror_objects': False} if engine != 'object' else {}
+    if engine == 'sharded' and shards:
+        options['shards'] = shards
+    game_logic = create_game_logic(game_state, engine, **options)
+    try:
+        if waves:
+            game_logic.waves = load_waves(waves, game_state.rng)
+        pending = deque(sorted(layout, key=lambda p: p.tick))
+        money_curve = []
+
+        start = time.perf_counter()
+        tick = 0
+        while tick < ticks and not game_state.game_over:
+            # 依序放置到期的防禦塔；錢不夠時等待，不跳過後面的順序
+            while pending and pending[0].tick <= tick:
+                placement = pending[0]
+                if game_state.money < current_config().tower_types[placement.tower_type].cost:
+                    break
+                game_state.place_tower(placement.row, placement.col, placement.tower_type)
+                pending.popleft()
+            game_logic.update()
+            tick += 1
+            if sample_every and tick % sample_every == 0:
+                money_curve.append(game_state.money)
+        elapsed = time.perf_counter() - start
+        game_logic.sync_state()  # 讓呼叫端讀到最新的冷卻與完整的子彈列表
+    finally:
+        # sharded 引擎的工作行程與共享記憶體不等到垃圾回收才釋放
+        close = getattr(game_logic, 'close', None)
+        if close is not None:
+            close()
+
+    return HeadlessResult(tick, elapsed, game_state.score, game_state.lives,
+                          game_state.money, game_state.game_over, tuple(money_curve))
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description='Run a tower defense game headless and uncapped.')
+    parser.add_argument('--ticks', type=int, default=10000, help='maximum number of logic ticks')
+    parser.add_argument('--seed', type=int, default=None, help='random seed for enemy spawns')
+    parser.add_argument('--layout', default='',
+                        help='JSON file or inline "row:col[:type][@tick],..." tower placements')
+    parser.add_argument('--engine', choices=ENGINES, default='object')
+    parser.add_argument('--waves', metavar='PATH', help='spawn enemies from a JSON Lines wave file')
+    parser.add_argument('--shards', type=int, default=None,
+                        help='worker processes for --engine sharded (default: one per CPU)')
+    parser.add_argument('--snapshot', metavar='PATH', help='continue from a saved snapshot')
+    parser.add_argument('--save-snapshot', metavar='PATH', help='save the final state as a snapshot')
+    parser.add_argument('--telemetry', metavar='PATH', help='log game events to rotating files')
+    parser.add_argument('--telemetry-format', choices=FORMATS, default='jsonl')
+    parser.add_argument('--telemetry-policy', choices=('drop', 'block'), default='block',
+                        help='when the writer falls behind: drop ticks or wait for it (default)')
+    args = parser.parse_args(argv)
+
+    game_state = load_snapshot(args.snapshot) if args.snapshot else GameState(args.seed)
+    telemetry = Telemetry(args.telemetry, args.telemetry_format, policy=args.telemetry_policy) \
+        if args.telemetry else None
+    result = run_headless(args.ticks, args.seed, load_layout(args.layout) if args.layout else (),
+                          args.engine, game_state=game_state, waves=args.waves, shards=args.shards,
+                          telemetry=telemetry)
+    if args.save_snapshot:
+        save_snapshot(game_state, args.save_snapshot)
+    print(f'Ticks: {result.ticks} in {result.elapsed:.3f}s ({result.ticks_per_second:.0f} ticks/sec)')
+    print(f'Score: {result.score}  Lives: {result.lives}  Money: {result.money}'
+          f'{"  (game over)" if result.game_over else ""}')
+    if telemetry is not None:
+        telemetry.close()
+        stats = telemetry.stats()
+        print(f'Telemetry: {stats["written_events"]} events written, '
+              f'{stats["dropped_events"]} dropped, {stats["stalls"]} stalls')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,26 @@
+from typing import Optional, Tuple
+import pygame
+
+class HudText:
+    """A HUD label whose text surface is only re-rendered when the text changes."""
+
+    def __init__(self, font: pygame.font.Font, color: Tuple[int, int, int], position: Tuple[int, int]):
+        self.font = font
+        self.color = color
+        self.position = position
+        self.text: Optional[str] = None
+        self.surface: Optional[pygame.Surface] = None
+        self.rect = pygame.Rect(position, (0, 0))
+
+    def set_text(self, text: str) -> Optional[pygame.Rect]:
+        """Update the label; returns the area it used to cover if it changed."""
+        if text == self.text:
+            return None
+        old_rect = self.rect
+        self.text = text
+        self.surface = self.font.render(text, True, self.color)
+        self.rect = self.surface.get_rect(topleft=self.position)
+        return old_rect
+
+    def draw(self, surface: pygame.Surface) -> pygame.Rect:
+        return surface.blit(self.surface, self.rect)
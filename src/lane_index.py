@@ -0,0 +1,90 @@
+from bisect import bisect_left, bisect_right
+from operator import attrgetter
+from typing import Any, Iterable, Iterator, List, Optional
+from .config_manager import current_config
+
+_get_x = attrgetter('x')
+
+class LaneIndex:
+    """Entities bucketed by grid row, each bucket kept sorted by x."""
+
+    def __init__(self, rows: int):
+        self.rows = rows
+        # 網格幾何在遊戲中不會改變，建立時記下即可
+        grid = current_config().grid
+        self._margin = grid.margin
+        self._size = grid.size
+        self._xs: List[List[float]] = [[] for _ in range(rows)]
+        self._items: List[List[Any]] = [[] for _ in range(rows)]
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def row_of(self, entity: Any) -> int:
+        return int((entity.y - self._margin) // self._size)
+
+    def rebuild(self, entities: Iterable[Any]) -> None:
+        items: List[List[Any]] = [[] for _ in range(self.rows)]
+        count = 0
+        for entity in entities:
+            items[self.row_of(entity)].append(entity)
+            count += 1
+        for lane in items:
+            lane.sort(key=_get_x)
+        self._items = items
+        self._xs = [[e.x for e in lane] for lane in items]
+        self._count = count
+
+    def resort(self) -> None:
+        # 實體移動後重新排序；每條路線幾乎已排好，timsort 近似線性
+        for row in range(self.rows):
+            lane = self._items[row]
+            if lane:
+                lane.sort(key=_get_x)
+                self._xs[row] = [e.x for e in lane]
+
+    def add(self, entity: Any) -> None:
+        row = self.row_of(entity)
+        xs = self._xs[row]
+        i = bisect_right(xs, entity.x)
+        xs.insert(i, entity.x)
+        self._items[row].insert(i, entity)
+        self._count += 1
+
+    def remove(self, entity: Any) -> None:
+        row = self.row_of(entity)
+        xs = self._xs[row]
+        lane = self._items[row]
+        i = bisect_left(xs, entity.x)
+        while i < len(lane) and lane[i] is not entity and xs[i] == entity.x:
+            i += 1
+        if i >= len(lane) or lane[i] is not entity:
+            # x 已經改變但尚未重新排序，退回線性搜尋
+            i = next(j for j, e in enumerate(lane) if e is entity)
+        del xs[i]
+        del lane[i]
+        self._count -= 1
+
+    def in_row(self, row: int) -> List[Any]:
+        return self._items[row]
+
+    def between(self, row: int, low: float, high: float) -> Iterator[Any]:
+        """Yield entities in `row` with low < x < high, in ascending x."""
+        xs = self._xs[row]
+        lane = self._items[row]
+        i = bisect_right(xs, low)
+        while i < len(xs) and xs[i] < high:
+            yield lane[i]
+            i += 1
+
+    def first_between(self, row: int, low: float, high: float) -> Optional[Any]:
+        xs = self._xs[row]
+        i = bisect_right(xs, low)
+        if i < len(xs) and xs[i] < high:
+            return self._items[row][i]
+        return None
+
+    def last(self, row: int) -> Optional[Any]:
+        lane = self._items[row]
+        return lane[-1] if lane else None
@@ -0,0 +1,84 @@
+import csv
+from array import array
+from time import perf_counter_ns
+from typing import Callable, Dict, List, Optional, Tuple
+
+class RingBuffer:
+    """Fixed-size buffer of integers that overwrites its oldest samples."""
+
+    def __init__(self, capacity: int):
+        self._data = array('q', bytes(8 * capacity))
+        self._next = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def append(self, value: int) -> None:
+        self._data[self._next] = value
+        self._next = (self._next + 1) % len(self._data)
+        if self._size < len(self._data):
+            self._size += 1
+
+    def values(self) -> List[int]:
+        """Samples from oldest to newest."""
+        if self._size < len(self._data):
+            return self._data[:self._size].tolist()
+        return (self._data[self._next:] + self._data[:self._next]).tolist()
+
+class TickProfiler:
+    """Per-phase timings and entity counts over the most recent ticks.
+
+    Engines check ``enabled`` once per tick and only then time their phases,
+    so a disabled profiler costs a single attribute lookup.
+    """
+
+    PHASES: Tuple[str, ...] = ('_spawn_enemy', '_update_enemies', '_update_projectiles',
+                               '_tower_attack', 'render')
+    COUNTS: Tuple[str, ...] = ('towers', 'enemies', 'projectiles')
+
+    def __init__(self, capacity: int = 600, enabled: bool = False):
+        self.enabled = enabled
+        self.series: Dict[str, RingBuffer] = {name: RingBuffer(capacity)
+                                              for name in self.PHASES + self.COUNTS}
+
+    def toggle(self) -> None:
+        self.enabled = not self.enabled
+
+    def time(self, phase: str, func: Callable[[], None]) -> None:
+        start = perf_counter_ns()
+        func()
+        self.series[phase].append(perf_counter_ns() - start)
+
+    def count_entities(self, towers: int, enemies: int, projectiles: int) -> None:
+        self.series['towers'].append(towers)
+        self.series['enemies'].append(enemies)
+        self.series['projectiles'].append(projectiles)
+
+    def percentile(self, name: str, q: float) -> Optional[int]:
+        """Nearest-rank percentile (0-100) of the buffered samples."""
+        values = sorted(self.series[name].values())
+        if not values:
+            return None
+        rank = max(0, min(len(values) - 1, round(q / 100 * len(values)) - 1))
+        return values[rank]
+
+    def summary(self) -> List[str]:
+        lines = []
+        for phase in self.PHASES:
+            p50, p99 = self.percentile(phase, 50), self.percentile(phase, 99)
+            if p50 is not None:
+                lines.append(f'{phase.strip("_"):<18} p50 {p50 / 1e6:6.2f}ms  p99 {p99 / 1e6:6.2f}ms')
+        latest = {name: self.series[name].values()[-1:] for name in self.COUNTS}
+        if all(latest.values()):
+            lines.append('  '.join(f'{name} {latest[name][0]}' for name in self.COUNTS))
+        return lines
+
+    def dump_csv(self, path: str) -> None:
+        """Write every buffered sample as (series, sample, value) rows, oldest first."""
+        with open(path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['series', 'sample', 'value'])
+            for name, buffer in self.series.items():
+                for index, value in enumerate(buffer.values()):
+                    writer.writerow([name, index, value])
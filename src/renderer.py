@@ -1,112 +1,383 @@
 import pygame
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Iterator, List, Optional, Tuple
 if TYPE_CHECKING:
     from .game_state import GameState
-from .config_manager import CONFIG
+    from .lane_index import LaneIndex
+    from .entities.tower import Tower
+    from .profiler import TickProfiler
+from .camera import Camera
+from .config_manager import CONFIG, current_config
+from .hud import HudText
+from .utils.image_loader import sprite
+
+# 效能分析覆蓋層每隔幾幀才重新計算一次，避免數字閃動
+OVERLAY_REFRESH_FRAMES = 15
 
 class Renderer:
-    def __init__(self, screen: pygame.Surface, game_state: 'GameState'):
+    """Draws the part of the board inside `camera`'s view.
+
+    Grid cells and towers come from the visible range of `tower_grid`, and
+    enemies and projectiles from the row/x lane indexes, so a frame costs
+    the same however large the board is.
+    """
+
+    def __init__(self, screen: pygame.Surface, game_state: 'GameState',
+                 profiler: Optional['TickProfiler'] = None, camera: Optional[Camera] = None):
         self.screen = screen
         self.game_state = game_state
+        self.profiler = profiler
+        self.camera = camera if camera is not None else Camera.for_config()
+        # 繪圖迴圈使用編譯後的配置；每幀取一次，熱重載後自動套用新值
+        self.config = current_config()
         self.font = pygame.font.Font(None, 36)
+        self.game_over_font = pygame.font.Font(None, 74)
+
+        # HUD 文字只在數值改變時重新產生
+        text_color = CONFIG['colors']['text']
+        self.money_text = HudText(self.font, text_color, (10, 10))
+        self.score_text = HudText(self.font, text_color, (200, 10))
+        self.lives_text = HudText(self.font, text_color, (400, 10))
+        self.tower_text = HudText(self.font, text_color, (10, CONFIG['window']['height'] - 40))
+        # 狀態訊息（例如 config.json 重新載入失敗的原因），由主迴圈設定
+        self.status = ''
+        self.status_text = HudText(pygame.font.Font(None, 24), text_color,
+                                   (10, CONFIG['window']['height'] - 64))
+        self.hud = (self.money_text, self.score_text, self.lives_text, self.tower_text, self.status_text)
+
+        # 效能分析覆蓋層：每個階段一行，再加一行實體數量
+        self.profiler_text: Tuple[HudText, ...] = ()
+        if profiler is not None:
+            overlay_font = pygame.font.Font(None, 22)
+            overlay_x = CONFIG['window']['width'] - 300
+            self.profiler_text = tuple(HudText(overlay_font, text_color, (overlay_x, 40 + i * 18))
+                                       for i in range(len(profiler.PHASES) + 1))
+        self._overlay_shown = False
+        self._overlay_frames = 0
+
+        # 半透明黑色背景
+        self.overlay = pygame.Surface((CONFIG['window']['width'], CONFIG['window']['height']))
+        self.overlay.set_alpha(128)
+        self.overlay.fill((0, 0, 0))
+        self._game_over_drawn = False
+
+        # 網格只在攝影機移動後重畫；防禦塔很少變動，畫在靜態圖層上
+        self.background = pygame.Surface(screen.get_size()).convert()
+        self.static_layer = self.background.copy()
+        self._tower_marks: Dict[int, Tuple[float, float, float]] = {}
+        self._scaled_sprites: Dict[Tuple[str, Tuple[int, int]], pygame.Surface] = {}
+        # 血條與子彈預先畫好，和圖片一起以 Surface.blits 批次繪製
+        self._health_bars: Dict[Tuple, Tuple[pygame.Surface, List[pygame.Rect]]] = {}
+        self._dots: Dict[Tuple, pygame.Surface] = {}
+        self._view_version: Optional[int] = None
+        self._view_zoom = self.camera.zoom
+
+        # 上一幀畫過的動態區域，下一幀要先還原
+        self._drawn_rects: List[pygame.Rect] = []
+        self._full_redraw = True
 
     def render(self) -> None:
-        self.screen.fill(CONFIG['colors']['background'])
-        self._draw_grid()
-        self._draw_towers()
-        self._draw_enemies()
-        self._draw_projectiles()
-        self._draw_ui()
-        
+        self.config = current_config()
+        self.game_state.sync_lanes()
+        if self.camera.version != self._view_version:
+            self._rebuild_view()
         if self.game_state.game_over:
-            self._draw_game_over()
-            
-        pygame.display.flip()
-
-    def _draw_grid(self) -> None:
-        grid_margin = CONFIG['grid']['margin']
-        grid_size = CONFIG['grid']['size']
-        rows = CONFIG['grid']['rows']
-        cols = CONFIG['grid']['cols']
-        
-        for row in range(rows):
-            for col in range(cols):
-                rect = pygame.Rect(
-                    grid_margin + col * grid_size,
-                    grid_margin + row * grid_size,
-                    grid_size - 1,
-                    grid_size - 1
-                )
-                pygame.draw.rect(self.screen, CONFIG['colors']['grid'], rect, 1)
-
-    def _draw_towers(self) -> None:
-        for tower in self.game_state.towers:
-            self.screen.blit(tower.image, (tower.x, tower.y))
-            
-            # 繪製血條
-            health_width = CONFIG['grid']['size'] * (tower.health / tower.max_health)
-            health_height = 5
-            health_y = tower.y - 10
-            
-            pygame.draw.rect(self.screen, CONFIG['colors']['health_bg'],
-                           (tower.x, health_y, CONFIG['grid']['size'], health_height))
-            pygame.draw.rect(self.screen, CONFIG['colors']['health'],
-                           (tower.x, health_y, health_width, health_height))
-
-    def _draw_enemies(self) -> None:
-        for enemy in self.game_state.enemies:
-            self.screen.blit(enemy.image, (enemy.x - enemy.radius, enemy.y - enemy.radius))
-            
-            # 繪製血條
-            health_width = enemy.radius * 2 * (enemy.health / enemy.max_health)
-            health_height = 5
-            health_y = enemy.y - enemy.radius - 10
-            
-            pygame.draw.rect(self.screen, CONFIG['colors']['health_bg'],
-                           (enemy.x - enemy.radius, health_y, enemy.radius * 2, health_height))
-            pygame.draw.rect(self.screen, CONFIG['colors']['health'],
-                           (enemy.x - enemy.radius, health_y, health_width, health_height))
-
-    def _draw_projectiles(self) -> None:
-        for projectile in self.game_state.projectiles:
-            pygame.draw.circle(self.screen, CONFIG['colors']['projectile'],
-                             (int(projectile.x), int(projectile.y)),
-                             projectile.radius)
-
-    def _draw_ui(self) -> None:
-        # 顯示金錢
-        money_text = self.font.render(f'Money: {self.game_state.money}', True, CONFIG['colors']['text'])
-        self.screen.blit(money_text, (10, 10))
-        
-        # 顯示分數
-        score_text = self.font.render(f'Score: {self.game_state.score}', True, CONFIG['colors']['text'])
-        self.screen.blit(score_text, (200, 10))
-        
-        # 顯示生命值
-        lives_text = self.font.render(f'Lives: {self.game_state.lives}', True, CONFIG['colors']['text'])
-        self.screen.blit(lives_text, (400, 10))
-        
-        # 顯示選擇的防禦塔類型
+            # 遊戲結束後畫面不再變化，只需要畫一次
+            if not self._game_over_drawn:
+                self._refresh_static_layer()
+                self._update_ui_text()
+                self.screen.blit(self.static_layer, (0, 0))
+                self._draw_enemies()
+                self._draw_projectiles()
+                self._draw_ui(self.hud)
+                self._draw_game_over()
+                pygame.display.flip()
+                self._game_over_drawn = True
+            return
+
+        overlay = self.profiler is not None and self.profiler.enabled
+        if overlay != self._overlay_shown:
+            # 覆蓋層開關時整個畫面重畫一次
+            self._overlay_shown = overlay
+            self._overlay_frames = 0
+            self._full_redraw = True
+
+        restore = self._drawn_rects + self._refresh_static_layer()
+        changed_labels, stale_rects = self._update_ui_text()
+        restore += stale_rects
+
+        if self._full_redraw:
+            self.screen.blit(self.static_layer, (0, 0))
+        else:
+            static_layer = self.static_layer
+            self.screen.blits([(static_layer, rect, rect) for rect in restore], False)
+
+        drawn = self._draw_enemies()
+        drawn += self._draw_projectiles()
+
+        if self._full_redraw:
+            self._draw_ui(self.labels)
+            pygame.display.flip()
+            self._full_redraw = False
+        else:
+            # 只重畫數值改變或被其他圖形覆蓋到的 HUD 文字；
+            # 文字是半透明混色，重畫前要先把底下還原，否則會越疊越深
+            touched = restore + drawn
+            labels = [label for label in self.labels
+                      if label in changed_labels or label.rect.collidelist(touched) != -1]
+            for label in labels:
+                self._redraw_area(label.rect)
+            pygame.display.update(restore + drawn + self._draw_ui(labels))
+        self._drawn_rects = drawn
+
+    @property
+    def labels(self) -> Tuple[HudText, ...]:
+        return self.hud + self.profiler_text if self._overlay_shown else self.hud
+
+    def invalidate(self) -> None:
+        """Force a full-screen redraw on the next frame."""
+        self._full_redraw = True
+        self._game_over_drawn = False
+
+    def _rebuild_view(self) -> None:
+        """Redraw the background and towers after the camera moved or zoomed."""
+        if self.camera.zoom != self._view_zoom:
+            self._view_zoom = self.camera.zoom
+            self._scaled_sprites.clear()
+            self._health_bars.clear()
+            self._dots.clear()
+        self._view_version = self.camera.version
+        self.background.fill(CONFIG['colors']['background'])
+        self._draw_grid(self.background)
+        self.static_layer.blit(self.background, (0, 0))
+        towers = self._visible_towers()
+        self._draw_towers(self.static_layer, towers)
+        self._tower_marks = {id(t): (t.x, t.y, t.health) for t in towers}
+        self.invalidate()
+
+    def _draw_grid(self, surface: pygame.Surface) -> None:
+        grid = self.config.grid
+        zoom = self.camera.zoom
+        cell_size = max(1, round(grid.size * zoom) - 1)
+        color = CONFIG['colors']['grid']
+        rows, cols = self.camera.visible_cells(grid)
+
+        for row in rows:
+            for col in cols:
+                x, y = self.camera.to_screen(grid.col_x[col], grid.row_y[row])
+                pygame.draw.rect(surface, color, pygame.Rect(x, y, cell_size, cell_size), 1)
+
+    def _visible_towers(self) -> List['Tower']:
+        # 防禦塔的血條畫在格子上方，多看一格才不會漏掉
+        grid = self.config.grid
+        rows, cols = self.camera.visible_cells(grid, grid.size)
+        tower_grid = self.game_state.tower_grid
+        return [tower for row in rows for tower in tower_grid[row][cols.start:cols.stop]
+                if tower is not None]
+
+    def _visible(self, lanes: 'LaneIndex', left: float, top: float,
+                 right: float, bottom: float) -> Iterator[Any]:
+        """Entities of `lanes` whose drawing may overlap the world rect, found by row and x."""
+        # 圖片與血條都不會超出實體位置一個格子加一張圖片的距離
+        grid = self.config.grid
+        reach = grid.size + max(self.config.enemy_size)
+        first = max(0, grid.row_of(top - reach))
+        last = min(grid.rows - 1, grid.row_of(bottom + reach))
+        for row in range(first, last + 1):
+            yield from lanes.between(row, left - reach, right + reach)
+
+    def _sprite(self, kind) -> pygame.Surface:
+        image = sprite(kind)
+        zoom = self.camera.zoom
+        if zoom == 1:
+            return image
+        key = (kind.image_path, kind.image_size)
+        scaled = self._scaled_sprites.get(key)
+        if scaled is None:
+            width, height = image.get_size()
+            scaled = pygame.transform.scale(image, (max(1, round(width * zoom)),
+                                                    max(1, round(height * zoom))))
+            self._scaled_sprites[key] = scaled
+        return scaled
+
+    def _tower_rect(self, x: float, y: float) -> pygame.Rect:
+        # 防禦塔圖片加上方的血條
+        zoom = self.camera.zoom
+        image_width, image_height = self.config.tower_size
+        x, y = self.camera.to_screen(x, y - 10)
+        return pygame.Rect(x, y, max(image_width, self.config.grid.size) * zoom + 1,
+                           (image_height + 10) * zoom + 1)
+
+    def _refresh_static_layer(self) -> List[pygame.Rect]:
+        """Redraw towers that were placed, removed or damaged; returns changed rects."""
+        towers = self._visible_towers()
+        marks = {id(t): (t.x, t.y, t.health) for t in towers}
+        if marks == self._tower_marks:
+            return []
+
+        changed = []
+        for key in self._tower_marks.keys() | marks.keys():
+            old, new = self._tower_marks.get(key), marks.get(key)
+            if old != new:
+                for mark in (old, new):
+                    if mark is not None:
+                        changed.append(self._tower_rect(mark[0], mark[1]))
+        self._tower_marks = marks
+
+        for rect in changed:
+            self.static_layer.blit(self.background, rect, rect)
+            self.static_layer.set_clip(rect)
+            self._draw_towers(self.static_layer, [t for t in towers
+                                                  if rect.colliderect(self._tower_rect(t.x, t.y))])
+            self.static_layer.set_clip(None)
+        return changed
+
+    def _health_bar(self, width: int, height: int) -> Tuple[pygame.Surface, List[pygame.Rect]]:
+        """A strip of health bar frames, one per filled pixel, and the area of each frame."""
+        colors = self.config.colors
+        key = (width, height, colors['health_bar_border'], colors['health_bar_fill'])
+        bar = self._health_bars.get(key)
+        if bar is None:
+            # 第 n 格是填滿 n 個像素的血條，由上而下排成一張圖
+            strip = pygame.Surface((max(1, width), height * (width + 1))).convert()
+            strip.fill(colors['health_bar_border'])
+            for filled in range(1, width + 1):
+                strip.fill(colors['health_bar_fill'], (0, filled * height, filled, height))
+            bar = strip, [pygame.Rect(0, filled * height, width, height) for filled in range(width + 1)]
+            self._health_bars[key] = bar
+        return bar
+
+    def _dot(self, radius: int) -> pygame.Surface:
+        """A pre-drawn projectile circle, blitted with its center at (radius, radius)."""
+        color = self.config.colors['projectile']
+        dot = self._dots.get((radius, color))
+        if dot is None:
+            dot = pygame.Surface((radius * 2, radius * 2)).convert()
+            key_color = (255, 0, 255) if color != (255, 0, 255) else (0, 0, 0)
+            dot.fill(key_color)
+            dot.set_colorkey(key_color)
+            pygame.draw.circle(dot, color, (radius, radius), radius)
+            self._dots[(radius, color)] = dot
+        return dot
+
+    def _tower_blits(self, towers: Iterable['Tower']) -> List[Tuple]:
+        camera = self.camera
+        zoom, camera_x, camera_y = camera.zoom, camera.x, camera.y
+        strip, frames = self._health_bar(int(self.config.grid.size * zoom), max(1, round(5 * zoom)))
+        width = len(frames) - 1
+        bar_offset = 10 * zoom
+        sprites: Dict[int, pygame.Surface] = {}
+        blits = []
+        for tower in towers:
+            image = sprites.get(id(tower.kind))
+            if image is None:
+                image = sprites[id(tower.kind)] = self._sprite(tower.kind)
+            x = (tower.x - camera_x) * zoom
+            y = (tower.y - camera_y) * zoom
+            # 血條依剩餘生命取對應填滿程度的那一格
+            filled = min(width, max(0, int(width * (tower.health / tower.max_health))))
+            blits.append((image, (x, y)))
+            blits.append((strip, (x, y - bar_offset), frames[filled]))
+        return blits
+
+    def _enemy_blits(self, enemies: Iterable[Any]) -> List[Tuple]:
+        camera = self.camera
+        zoom, camera_x, camera_y = camera.zoom, camera.x, camera.y
+        bar_height = max(1, round(5 * zoom))
+        bar_offset = 10 * zoom
+        # 同一種敵人共用圖片與血條，每幀只查一次快取
+        looks: Dict[int, Tuple[pygame.Surface, pygame.Surface, List[pygame.Rect]]] = {}
+        blits = []
+        for enemy in enemies:
+            look = looks.get(id(enemy.kind))
+            if look is None:
+                look = looks[id(enemy.kind)] = (self._sprite(enemy.kind),
+                                                *self._health_bar(int(enemy.radius * 2 * zoom), bar_height))
+            image, strip, frames = look
+            width = len(frames) - 1
+            radius = enemy.radius
+            x = (enemy.x - radius - camera_x) * zoom
+            y = (enemy.y - radius - camera_y) * zoom
+            filled = min(width, max(0, int(width * (enemy.health / enemy.max_health))))
+            blits.append((image, (x, y)))
+            blits.append((strip, (x, y - bar_offset), frames[filled]))
+        return blits
+
+    def _projectile_blits(self, projectiles: Iterable[Any]) -> List[Tuple]:
+        camera = self.camera
+        zoom, camera_x, camera_y = camera.zoom, camera.x, camera.y
+        dots: Dict[int, Tuple[pygame.Surface, int]] = {}
+        blits = []
+        for projectile in projectiles:
+            look = dots.get(projectile.radius)
+            if look is None:
+                radius = max(1, round(projectile.radius * zoom))
+                look = dots[projectile.radius] = (self._dot(radius), radius)
+            dot, radius = look
+            blits.append((dot, (int((projectile.x - camera_x) * zoom) - radius,
+                                int((projectile.y - camera_y) * zoom) - radius)))
+        return blits
+
+    def _draw_towers(self, surface: pygame.Surface, towers: List['Tower']) -> None:
+        surface.blits(self._tower_blits(towers), False)
+
+    def _draw_enemies(self) -> List[pygame.Rect]:
+        enemies = self._visible(self.game_state.enemy_lanes, *self.camera.visible_rect())
+        return self.screen.blits(self._enemy_blits(enemies))
+
+    def _draw_projectiles(self) -> List[pygame.Rect]:
+        projectiles = self._visible(self.game_state.projectile_lanes, *self.camera.visible_rect())
+        return self.screen.blits(self._projectile_blits(projectiles))
+
+    def _redraw_area(self, rect: pygame.Rect) -> None:
+        """Restore `rect` from the static layer and redraw the sprites inside it."""
+        self.screen.set_clip(rect)
+        self.screen.blit(self.static_layer, rect, rect)
+        left, top = self.camera.to_world(rect.left, rect.top)
+        right, bottom = self.camera.to_world(rect.right, rect.bottom)
+        lanes = self.game_state.enemy_lanes, self.game_state.projectile_lanes
+        self.screen.blits(self._enemy_blits(self._visible(lanes[0], left, top, right, bottom)) +
+                          self._projectile_blits(self._visible(lanes[1], left, top, right, bottom)), False)
+        self.screen.set_clip(None)
+
+    def _update_ui_text(self) -> Tuple[List[HudText], List[pygame.Rect]]:
+        """Refresh HUD labels; returns the changed labels and the areas they vacated."""
         tower_type = 'Strong Tower' if self.game_state.selected_tower_type == 'strong' else 'Normal Tower'
-        tower_cost = CONFIG['tower']['types'][self.game_state.selected_tower_type]['cost']
-        tower_text = self.font.render(f'Selected: {tower_type} (Cost: {tower_cost})',
-                                    True, CONFIG['colors']['text'])
-        self.screen.blit(tower_text, (10, CONFIG['window']['height'] - 40))
+        tower_cost = self.config.tower_types[self.game_state.selected_tower_type].cost
+        texts = [
+            f'Money: {self.game_state.money}',  # 顯示金錢
+            f'Score: {self.game_state.score}',  # 顯示分數
+            f'Lives: {self.game_state.lives}',  # 顯示生命值
+            f'Selected: {tower_type} (Cost: {tower_cost})',  # 顯示選擇的防禦塔類型
+            self.status,
+        ]
+        labels = self.hud
+        if self._overlay_shown and self._overlay_frames % OVERLAY_REFRESH_FRAMES == 0:
+            lines = self.profiler.summary()
+            texts += lines + [''] * (len(self.profiler_text) - len(lines))
+            labels = self.labels
+        self._overlay_frames += 1
+
+        changed = []
+        stale_rects = []
+        for label, text in zip(labels, texts):
+            old_rect = label.set_text(text)
+            if old_rect is not None:
+                changed.append(label)
+                stale_rects.append(old_rect)
+        return changed, stale_rects
+
+    def _draw_ui(self, labels) -> List[pygame.Rect]:
+        return [label.draw(self.screen) for label in labels]
 
     def _draw_game_over(self) -> None:
-        # 半透明黑色背景
-        s = pygame.Surface((CONFIG['window']['width'], CONFIG['window']['height']))
-        s.set_alpha(128)
-        s.fill((0, 0, 0))
-        self.screen.blit(s, (0, 0))
-        
+        self.screen.blit(self.overlay, (0, 0))
+
         # 遊戲結束文字
-        game_over_font = pygame.font.Font(None, 74)
-        text = game_over_font.render('Game Over!', True, CONFIG['colors']['text'])
+        text = self.game_over_font.render('Game Over!', True, CONFIG['colors']['text'])
         text_rect = text.get_rect(center=(CONFIG['window']['width'] / 2,
                                         CONFIG['window']['height'] / 2))
         self.screen.blit(text, text_rect)
-        
+
         # 最終分數
         score_text = self.font.render(f'Final Score: {self.game_state.score}',
                                     True, CONFIG['colors']['text'])
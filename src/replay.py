@@ -0,0 +1,215 @@
+"""Compact input replays: record (tick, action) pairs and re-simulate them.
+
+A replay stores the game seed and only the player inputs, so playing it back
+on the same config reproduces the session tick for tick without rendering:
+
+    python main.py --record session.tdr
+    python -m src.replay session.tdr --profile
+
+Layout: a header ``<4sBIQ`` (magic, version, config CRC32 when recording
+started, seed) followed by records of varint tick delta, an action byte and
+the action payload. A config hot-reloaded during the session is stored as an
+action too (varint length and zlib-compressed JSON), and playback switches to
+it on the same tick.
+"""
+import argparse
+import cProfile
+import json
+import pstats
+import struct
+import time
+import zlib
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple, TYPE_CHECKING
+from .config_manager import CONFIG, set_config
+
+if TYPE_CHECKING:
+    from .game_state import GameState
+
+MAGIC = b'TDRP'
+VERSION = 2
+# 第 1 版沒有 ACTION_CONFIG，其餘格式相同，仍可讀取
+VERSIONS = (1, 2)
+HEADER = struct.Struct('<4sBIQ')
+
+ACTION_END = 0
+ACTION_PLACE = 1
+ACTION_SELECT = 2
+ACTION_CONFIG = 3
+
+class ReplayAction(NamedTuple):
+    tick: int
+    action: int
+    tower_type: str
+    row: int = 0
+    col: int = 0
+    config: Optional[Dict[str, Any]] = None
+
+class Replay(NamedTuple):
+    seed: int
+    config_crc: int
+    actions: List[ReplayAction]
+    end_tick: int
+
+def config_crc() -> int:
+    return zlib.crc32(json.dumps(CONFIG, sort_keys=True).encode('utf-8'))
+
+def _write_varint(buffer: bytearray, value: int) -> None:
+    if value < 0:
+        raise ValueError(f'Cannot encode negative value: {value}')
+    while value >= 0x80:
+        buffer.append((value & 0x7F) | 0x80)
+        value >>= 7
+    buffer.append(value)
+
+def _read_varint(data: bytes, pos: int) -> Tuple[int, int]:
+    value = 0
+    shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+class ReplayRecorder:
+    def __init__(self, game_state: 'GameState'):
+        self.seed = game_state.seed
+        # 開始錄製時的配置；之後的熱重載記錄在輸入之間
+        self.config_crc = config_crc()
+        self.tower_types = list(CONFIG['tower']['types'])
+        self._body = bytearray()
+        self._last_tick = 0
+
+    def _begin(self, tick: int, action: int) -> None:
+        _write_varint(self._body, tick - self._last_tick)
+        self._body.append(action)
+        self._last_tick = tick
+
+    def record_place(self, tick: int, row: int, col: int, tower_type: str) -> None:
+        self._begin(tick, ACTION_PLACE)
+        _write_varint(self._body, row)
+        _write_varint(self._body, col)
+        self._body.append(self.tower_types.index(tower_type))
+
+    def record_select(self, tick: int, tower_type: str) -> None:
+        self._begin(tick, ACTION_SELECT)
+        self._body.append(self.tower_types.index(tower_type))
+
+    def record_config(self, tick: int) -> None:
+        """Record the active config, e.g. right after a hot reload swapped it in."""
+        data = zlib.compress(json.dumps(CONFIG, sort_keys=True).encode('utf-8'))
+        self._begin(tick, ACTION_CONFIG)
+        _write_varint(self._body, len(data))
+        self._body += data
+        self.tower_types = list(CONFIG['tower']['types'])
+
+    def to_bytes(self, end_tick: int) -> bytes:
+        tail = bytearray()
+        _write_varint(tail, end_tick - self._last_tick)
+        tail.append(ACTION_END)
+        return HEADER.pack(MAGIC, VERSION, self.config_crc, self.seed) + bytes(self._body) + bytes(tail)
+
+    def save(self, path: str, end_tick: int) -> None:
+        Path(path).write_bytes(self.to_bytes(end_tick))
+
+def parse_replay(data: bytes) -> Replay:
+    magic, version, crc, seed = HEADER.unpack_from(data, 0)
+    if magic != MAGIC or version not in VERSIONS:
+        raise ValueError('Not a replay file or unsupported replay version')
+    tower_types = list(CONFIG['tower']['types'])
+    actions = []
+    pos = HEADER.size
+    tick = 0
+    while True:
+        delta, pos = _read_varint(data, pos)
+        tick += delta
+        action = data[pos]
+        pos += 1
+        if action == ACTION_END:
+            return Replay(seed, crc, actions, tick)
+        if action == ACTION_PLACE:
+            row, pos = _read_varint(data, pos)
+            col, pos = _read_varint(data, pos)
+            actions.append(ReplayAction(tick, action, tower_types[data[pos]], row, col))
+            pos += 1
+        elif action == ACTION_SELECT:
+            actions.append(ReplayAction(tick, action, tower_types[data[pos]]))
+            pos += 1
+        elif action == ACTION_CONFIG:
+            size, pos = _read_varint(data, pos)
+            config = json.loads(zlib.decompress(data[pos:pos + size]))
+            actions.append(ReplayAction(tick, action, '', config=config))
+            tower_types = list(config['tower']['types'])
+            pos += size
+        else:
+            raise ValueError(f'Unknown replay action {action} at byte {pos - 1}')
+
+def load_replay(path: str) -> Replay:
+    return parse_replay(Path(path).read_bytes())
+
+def play_replay(replay: Replay, check_config: bool = True) -> 'GameState':
+    """Re-simulate a replay at uncapped speed and return the final state.
+
+    Configs reloaded during the recording are switched in on the same ticks;
+    the config active before the call is restored afterwards.
+    """
+    from .game_state import GameState
+    from .game_logic import GameLogic
+
+    if check_config and replay.config_crc != config_crc():
+        raise ValueError('Replay was recorded with a different config.json')
+    original = dict(CONFIG)
+    game_state = GameState(replay.seed)
+    game_logic = GameLogic(game_state)
+    actions = replay.actions
+    next_action = 0
+
+    try:
+        while game_state.tick < replay.end_tick and not game_state.game_over:
+            # 在與錄製時相同的幀、相同的更新之前套用輸入
+            while next_action < len(actions) and actions[next_action].tick <= game_state.tick:
+                action = actions[next_action]
+                if action.action == ACTION_PLACE:
+                    game_state.place_tower(action.row, action.col, action.tower_type)
+                elif action.action == ACTION_CONFIG:
+                    set_config(action.config)
+                else:
+                    game_state.selected_tower_type = action.tower_type
+                next_action += 1
+            game_logic.update()
+        game_logic.sync_state()
+    finally:
+        if original != CONFIG:
+            set_config(original)
+    return game_state
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description='Re-simulate a recorded game without rendering.')
+    parser.add_argument('replay', help='replay file written by main.py --record')
+    parser.add_argument('--profile', action='store_true', help='run the playback under cProfile')
+    parser.add_argument('--sort', default='cumulative', help='profile sort key')
+    parser.add_argument('--ignore-config', action='store_true',
+                        help='play back even if config.json changed since recording')
+    args = parser.parse_args(argv)
+
+    replay = load_replay(args.replay)
+    profiler = cProfile.Profile() if args.profile else None
+    start = time.perf_counter()
+    if profiler:
+        profiler.enable()
+    game_state = play_replay(replay, check_config=not args.ignore_config)
+    if profiler:
+        profiler.disable()
+    elapsed = time.perf_counter() - start
+
+    print(f'Seed: {replay.seed}  Inputs: {len(replay.actions)}  '
+          f'Ticks: {game_state.tick} in {elapsed:.3f}s')
+    print(f'Score: {game_state.score}  Lives: {game_state.lives}  Money: {game_state.money}'
+          f'{"  (game over)" if game_state.game_over else ""}')
+    if profiler:
+        pstats.Stats(profiler).sort_stats(args.sort).print_stats(25)
+
+if __name__ == '__main__':
+    main()
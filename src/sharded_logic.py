@@ -0,0 +1,391 @@
+"""Row-sharded simulation of one game across worker processes.
+
+Enemies, towers and projectiles only interact inside their own grid row, so
+the rows are split into contiguous shards and each shard is stepped by its
+own process, running one of the single-process engines on a GameState that
+holds only its rows. The parent keeps what the rows share:
+
+- spawning, which draws from the game's RNG and depends on the global score;
+- money, score and lives, merged from every shard's per-tick deltas in shard
+  order;
+- the tower list, so ``GameState.place_tower`` keeps working between ticks.
+
+Each tick the parent writes the shard's spawns into a shared-memory block and
+wakes the worker with a one-byte message on its pipe; the worker steps, writes
+its counter deltas and destroyed towers back into the block and answers.
+Rare or oversized payloads (placed or removed towers, big spawn batches, full states for
+``sync_state``) go through the pipe as snapshots or pickles.
+
+Results match the single-process engines; only the order of the merged
+entity lists differs, since they are concatenated shard by shard.
+"""
+import os
+import weakref
+from multiprocessing import Pipe, Process
+from multiprocessing.connection import Connection
+from multiprocessing.shared_memory import SharedMemory
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+from .config_manager import CONFIG, current_config, set_config
+from .entities.tower import Tower
+from .game_state import GameState
+from .snapshot import restore_snapshot, take_snapshot
+from .telemetry import SPAWN, TOWER_LOST
+
+if TYPE_CHECKING:
+    from .profiler import TickProfiler
+    from .waves import Batch, WaveSpawner
+
+# 指令以單一位元組透過管線傳送
+STEP, SYNC, LOAD, STOP = b's', b'y', b'l', b'q'
+
+# 共享區塊以 float64 為單位：標頭之後是生成與被摧毀防禦塔的固定容量區
+TICK, SPAWNS, PLACED, MONEY, SCORE, ESCAPED, DESTROYED = range(7)
+HEADER_SLOTS = 7
+SPAWN_SLOTS = 256
+DESTROYED_SLOTS = 256
+BLOCK_SLOTS = HEADER_SLOTS + 2 * SPAWN_SLOTS + 2 * DESTROYED_SLOTS
+# 超過容量時改由管線傳送
+OVERFLOW = -1
+
+# 分片內的生命值永遠不會歸零；遊戲結束只由主行程判斷
+SHARD_LIVES = 1 << 52
+
+def split_rows(rows: int, shards: int) -> List[range]:
+    """Contiguous row ranges of nearly equal size, one per shard."""
+    shards = max(1, min(shards, rows))
+    bounds = [rows * i // shards for i in range(shards + 1)]
+    return [range(bounds[i], bounds[i + 1]) for i in range(shards)]
+
+def shard_state(data: bytes, rows: range) -> GameState:
+    """Restore a snapshot keeping only the entities in `rows`."""
+    state = restore_snapshot(data, check_config=False)
+    row_of = current_config().grid.row_of
+    state.towers[:] = [t for t in state.towers if row_of(t.y) in rows]
+    state.enemies[:] = [e for e in state.enemies if row_of(e.y) in rows]
+    state.projectiles[:] = [p for p in state.projectiles if p.row in rows]
+    state.sync_lanes()
+    state.rebuild_attackers()
+    state.lives = SHARD_LIVES
+    state.game_over = False
+    return state
+
+class _Mailbox:
+    """Stands in for a WaveSpawner so every engine spawns what the parent sent."""
+
+    finished = False
+
+    def __init__(self):
+        self.batch: 'Batch' = []
+
+    def due(self, tick: int) -> 'Batch':
+        batch, self.batch = self.batch, []
+        return batch
+
+class _Shard:
+    """One worker process's view of its rows."""
+
+    def __init__(self, rows: range, engine: str, block: memoryview, conn: Connection):
+        self.rows = rows
+        self.engine = engine
+        self.block = block
+        self.conn = conn
+        self.enemy_types = list(current_config().enemy_types)
+        self.state: Optional[GameState] = None
+        self.game_logic: Any = None
+        self.cells: Dict[Tower, Tuple[int, int]] = {}
+
+    def load(self, data: bytes) -> None:
+        from .game_logic import create_game_logic
+        self.state = shard_state(data, self.rows)
+        options = {'mirror_objects': False} if self.engine != 'object' else {}
+        self.game_logic = create_game_logic(self.state, self.engine, **options)
+        self.game_logic.waves = _Mailbox()
+        self.cells = {tower: self.state._cell(tower) for tower in self.state.towers}
+
+    def step(self) -> None:
+        block = self.block
+        state = self.state
+        count = int(block[SPAWNS])
+        if count == OVERFLOW:
+            spawns = self.conn.recv()
+        else:
+            names = self.enemy_types
+            spawns = [(int(block[HEADER_SLOTS + 2 * i]), names[int(block[HEADER_SLOTS + 2 * i + 1])])
+                      for i in range(count)]
+        if block[PLACED]:
+            grid = current_config().grid
+            removed, placed = self.conn.recv()
+            for cell in removed:
+                tower = state.tower_at(*cell)
+                if tower is not None:
+                    state.remove_tower(tower)
+                    state.release_attackers(tower)
+                    self.cells.pop(tower, None)
+            for row, col, tower_type, health, cooldown in placed:
+                tower = Tower(grid.col_x[col], grid.row_y[row], tower_type)
+                tower.health = health
+                tower.attack_cooldown = cooldown
+                state.add_tower(tower)
+                self.cells[tower] = (row, col)
+        self.game_logic.waves.batch = spawns
+
+        money, score, lives = state.money, state.score, state.lives
+        self.game_logic.update()
+        block[MONEY] = state.money - money
+        block[SCORE] = state.score - score
+        block[ESCAPED] = lives - state.lives
+
+        destroyed = []
+        if len(state.towers) < len(self.cells):
+            alive = set(state.towers)
+            destroyed = [tower for tower in self.cells if tower not in alive]
+        if len(destroyed) > DESTROYED_SLOTS:
+            block[DESTROYED] = OVERFLOW
+        else:
+            block[DESTROYED] = len(destroyed)
+            base = HEADER_SLOTS + 2 * SPAWN_SLOTS
+            for i, tower in enumerate(destroyed):
+                block[base + 2 * i], block[base + 2 * i + 1] = self.cells[tower]
+        cells = [self.cells.pop(tower) for tower in destroyed]
+        self.conn.send_bytes(STEP)
+        if block[DESTROYED] == OVERFLOW:
+            self.conn.send(cells)
+
+    def sync(self) -> None:
+        self.game_logic.sync_state()
+        self.conn.send_bytes(take_snapshot(self.state))
+
+def _run_shard(raw_config: Dict[str, Any], rows: range, engine: str, block_name: str,
+               conn: Connection) -> None:
+    set_config(raw_config)
+    memory = SharedMemory(block_name)
+    block = memory.buf.cast('d')
+    shard = _Shard(rows, engine, block, conn)
+    try:
+        while True:
+            try:
+                command = conn.recv_bytes()
+            except EOFError:
+                break
+            if command == STEP:
+                shard.step()
+            elif command == SYNC:
+                shard.sync()
+            elif command == LOAD:
+                shard.load(conn.recv_bytes())
+                conn.send_bytes(LOAD)
+            else:
+                break
+    finally:
+        shard.block = None
+        block.release()
+        memory.close()
+
+def _shutdown(processes: List[Process], conns: List[Connection], views: List[memoryview],
+              blocks: List[SharedMemory]) -> None:
+    for conn in conns:
+        try:
+            conn.send_bytes(STOP)
+        except (BrokenPipeError, OSError):
+            pass
+        conn.close()
+    for process in processes:
+        process.join(timeout=5)
+        if process.is_alive():
+            process.terminate()
+    for view in views:
+        view.release()
+    for memory in blocks:
+        memory.close()
+        memory.unlink()
+
+class ShardedGameLogic:
+    """Steps one game's rows in parallel worker processes (see the module docstring).
+
+    Between ticks only the towers and the money, score and lives on the
+    GameState are current; call ``sync_state()`` to gather the enemies,
+    projectiles and tower health from the workers, or create the engine with
+    ``mirror_objects=True`` to do that after every tick (slow, for display).
+    Towers added to or removed from ``GameState.towers`` are passed on at the
+    next tick; call ``reschedule()`` after editing the rest of the state by
+    hand to send it to the workers again.
+    """
+
+    def __init__(self, game_state: GameState, shards: Optional[int] = None,
+                 shard_engine: str = 'object', mirror_objects: bool = True):
+        self.game_state = game_state
+        self.profiler: Optional['TickProfiler'] = None
+        self.waves: Optional['WaveSpawner'] = None
+        self.mirror_objects = mirror_objects
+        config = current_config()
+        self.rows = split_rows(config.grid.rows, shards or os.cpu_count() or 1)
+        self._shard_of_row = [i for i, rows in enumerate(self.rows) for _ in rows]
+        self._type_index = {name: i for i, name in enumerate(config.enemy_types)}
+        self._known: Dict[Tower, None] = {}
+        self._towers_version = -1
+
+        self._blocks: List[SharedMemory] = []
+        self._views: List[memoryview] = []
+        self._conns: List[Connection] = []
+        processes = []
+        for rows in self.rows:
+            memory = SharedMemory(create=True, size=BLOCK_SLOTS * 8)
+            conn, child_conn = Pipe()
+            process = Process(target=_run_shard, args=(dict(CONFIG), rows, shard_engine, memory.name, child_conn),
+                              daemon=True)
+            process.start()
+            # 關閉主行程的子端，工作行程結束時 recv 才會收到 EOFError
+            child_conn.close()
+            self._blocks.append(memory)
+            self._views.append(memory.buf.cast('d'))
+            self._conns.append(conn)
+            processes.append(process)
+        self._finalizer = weakref.finalize(self, _shutdown, processes, self._conns, self._views, self._blocks)
+        self.reschedule()
+
+    def close(self) -> None:
+        """Stop the worker processes and free the shared memory."""
+        self._finalizer()
+
+    def reschedule(self) -> None:
+        """Send the whole GameState to the workers again, e.g. after editing it by hand."""
+        data = take_snapshot(self.game_state)
+        for conn in self._conns:
+            conn.send_bytes(LOAD)
+            conn.send_bytes(data)
+        for conn in self._conns:
+            conn.recv_bytes()
+        self._known = dict.fromkeys(self.game_state.towers)
+        self._towers_version = self.game_state.towers.version
+
+    def update(self) -> None:
+        state = self.game_state
+        if state.game_over:
+            return
+        placed: List[Tuple[List, List]] = [([], []) for _ in self.rows]
+        if state.towers.version != self._towers_version:
+            self._send_tower_edits(placed)
+        spawns: List['Batch'] = [[] for _ in self.rows]
+        telemetry = state.telemetry
+        for row, enemy_type in self._spawns():
+            spawns[self._shard_of_row[row]].append((row, enemy_type))
+            if telemetry is not None:
+                telemetry.emit(SPAWN, row, enemy_type)
+
+        for i, conn in enumerate(self._conns):
+            block = self._views[i]
+            block[TICK] = state.tick
+            block[PLACED] = bool(placed[i][0] or placed[i][1])
+            batch = spawns[i]
+            if len(batch) > SPAWN_SLOTS:
+                block[SPAWNS] = OVERFLOW
+            else:
+                block[SPAWNS] = len(batch)
+                type_index = self._type_index
+                for j, (row, enemy_type) in enumerate(batch):
+                    block[HEADER_SLOTS + 2 * j] = row
+                    block[HEADER_SLOTS + 2 * j + 1] = type_index[enemy_type]
+            conn.send_bytes(STEP)
+            if block[SPAWNS] == OVERFLOW:
+                conn.send(batch)
+            if block[PLACED]:
+                conn.send(placed[i])
+
+        # 依分片順序合併，結果與工作行程完成的先後無關
+        for i, conn in enumerate(self._conns):
+            conn.recv_bytes()
+            block = self._views[i]
+            state.money += self._number(block[MONEY])
+            state.score += int(block[SCORE])
+            state.lives -= int(block[ESCAPED])
+            count = int(block[DESTROYED])
+            if count == OVERFLOW:
+                cells = conn.recv()
+            else:
+                base = HEADER_SLOTS + 2 * SPAWN_SLOTS
+                cells = [(int(block[base + 2 * j]), int(block[base + 2 * j + 1])) for j in range(count)]
+            for row, col in cells:
+                self._remove_tower(row, col)
+                if telemetry is not None:
+                    telemetry.emit(TOWER_LOST, row, col)
+        self._towers_version = state.towers.version
+        state.check_game_over()
+        # 射擊、擊殺與逃脫發生在工作行程中，這裡只記錄生成、被摧毀的防禦塔與經濟
+        if telemetry is not None:
+            telemetry.end_tick(state)
+        state.tick += 1
+        if self.mirror_objects:
+            self.sync_state()
+
+    @staticmethod
+    def _number(value: float) -> Any:
+        return int(value) if value.is_integer() else value
+
+    def _send_tower_edits(self, placed: List[Tuple[List, List]]) -> None:
+        # 在兩幀之間移除、放置或替換的防禦塔轉交給所在行的分片：(移除的格子, 新的防禦塔)
+        state = self.game_state
+        state.sync_lanes()  # 列表被直接修改時先重建格子上的防禦塔
+        current = dict.fromkeys(state.towers)
+        for tower in [t for t in self._known if t not in current]:
+            del self._known[tower]
+            cell = state._cell(tower)
+            if cell is not None:
+                placed[self._shard_of_row[cell[0]]][0].append(cell)
+        for tower in current:
+            if tower not in self._known:
+                cell = state._cell(tower)
+                if cell is None:
+                    continue
+                self._known[tower] = None
+                placed[self._shard_of_row[cell[0]]][1].append(
+                    (cell[0], cell[1], tower.tower_type, tower.health, tower.attack_cooldown))
+        self._towers_version = state.towers.version
+
+    def _remove_tower(self, row: int, col: int) -> None:
+        state = self.game_state
+        tower = state.tower_at(row, col)
+        if tower is not None:
+            state.remove_tower(tower)
+            state.release_attackers(tower)
+            self._known.pop(tower, None)
+
+    def _spawns(self) -> 'Batch':
+        # 與 GameLogic._spawn_enemy 相同的亂數使用順序，生成結果與單一行程一致
+        state = self.game_state
+        if self.waves is not None:
+            return self.waves.due(state.tick)
+        config = current_config()
+        state.spawn_timer += 1
+        if state.spawn_timer < config.spawn_interval:
+            return []
+        state.spawn_timer = 0
+        rng = state.rng
+        row = rng.randint(0, config.grid.rows - 1)
+        if state.score >= config.strong_enemy_score and rng.random() < 0.3:
+            return [(row, 'strong')]
+        return [(row, 'normal')]
+
+    def sync_state(self) -> None:
+        """Gather enemies, projectiles and tower health and cooldowns from the workers."""
+        state = self.game_state
+        for conn in self._conns:
+            conn.send_bytes(SYNC)
+        enemies, projectiles = [], []
+        for conn in self._conns:
+            part = restore_snapshot(conn.recv_bytes(), check_config=False)
+            # 分片中的防禦塔對應回主行程的同一格
+            towers = {}
+            for tower in part.towers:
+                own = state.tower_at(*part._cell(tower))
+                own.health = tower.health
+                own.attack_cooldown = tower.attack_cooldown
+                towers[tower] = own
+            for enemy in part.enemies:
+                if enemy.current_target is not None:
+                    enemy.current_target = towers[enemy.current_target]
+            enemies += part.enemies
+            projectiles += part.projectiles
+        state.enemies[:] = enemies
+        state.projectiles[:] = projectiles
+        state.sync_lanes()
+        state.rebuild_attackers()
@@ -0,0 +1,162 @@
+"""Binary GameState snapshots for checkpoints and what-if branches.
+
+A snapshot holds everything the simulation needs to continue exactly where
+it stopped, including the RNG state, so restoring it and running on gives the
+same result as never having stopped:
+
+    python -m src.headless --ticks 3000 --layout "0:0,1:0" --save-snapshot mid.tds
+    python -m src.headless --snapshot mid.tds --ticks 5000 --layout "2:0"
+
+Layout: a header ``<4sBIQQdqdq?B`` (magic, version, config CRC32, seed, tick,
+money, score, lives, spawn timer, game over, selected tower type), the RNG
+state, then towers, enemies and projectiles as column arrays, each table
+prefixed with its row count. Types are indexes into the config's type lists
+and enemy targets are indexes into the tower table (-1 for none).
+"""
+import struct
+import sys
+from array import array
+from pathlib import Path
+from typing import List, Sequence, Tuple, Union
+from .config_manager import current_config
+from .entities.tower import Tower
+from .game_state import GameState
+from .replay import config_crc
+
+MAGIC = b'TDSN'
+VERSION = 1
+HEADER = struct.Struct('<4sBIQQdqdq?B')
+RNG_TAIL = struct.Struct('<I?d')
+COUNT = struct.Struct('<I')
+
+# 每個資料表的欄位型別，依序寫入
+TOWER_COLUMNS = 'ddBdd'         # x, y, 類型, 生命值, 冷卻
+ENEMY_COLUMNS = 'ddBddq'        # x, y, 類型, 生命值, 冷卻, 目標防禦塔
+PROJECTILE_COLUMNS = 'ddd'      # x, y, 傷害
+
+Number = Union[int, float]
+
+def _number(value: float) -> Number:
+    # 數值以 double 儲存；原本是整數的還原成 int
+    return int(value) if value.is_integer() else value
+
+def _pack_table(out: bytearray, columns: str, rows: Sequence[Tuple]) -> None:
+    out += COUNT.pack(len(rows))
+    for typecode, values in zip(columns, zip(*rows) if rows else [()] * len(columns)):
+        data = array(typecode, values)
+        if sys.byteorder == 'big':
+            data.byteswap()
+        out += data.tobytes()
+
+def _unpack_table(data: memoryview, pos: int, columns: str) -> Tuple[List[List], int]:
+    (count,), pos = COUNT.unpack_from(data, pos), pos + COUNT.size
+    result = []
+    for typecode in columns:
+        column = array(typecode)
+        end = pos + count * column.itemsize
+        column.frombytes(data[pos:end])
+        if sys.byteorder == 'big':
+            column.byteswap()
+        result.append(column.tolist())
+        pos = end
+    return result, pos
+
+def take_snapshot(state: GameState) -> bytes:
+    """Pack a GameState; call the engine's sync_state() first."""
+    config = current_config()
+    tower_types = list(config.tower_types)
+    enemy_types = list(config.enemy_types)
+
+    out = bytearray(HEADER.pack(MAGIC, VERSION, config_crc(), state.seed, state.tick,
+                                state.money, state.score, state.lives, state.spawn_timer,
+                                state.game_over, tower_types.index(state.selected_tower_type)))
+
+    version, internal, gauss_next = state.rng.getstate()
+    mt = array('I', internal[:-1])
+    if sys.byteorder == 'big':
+        mt.byteswap()
+    out += mt.tobytes()
+    out += RNG_TAIL.pack(internal[-1], gauss_next is not None, gauss_next or 0.0)
+
+    tower_index = {id(t): i for i, t in enumerate(state.towers)}
+    _pack_table(out, TOWER_COLUMNS, [
+        (t.x, t.y, tower_types.index(t.tower_type), t.health, t.attack_cooldown)
+        for t in state.towers])
+    _pack_table(out, ENEMY_COLUMNS, [
+        (e.x, e.y, enemy_types.index(e.enemy_type), e.health, e.attack_cooldown,
+         tower_index.get(id(e.current_target), -1))
+        for e in state.enemies])
+    _pack_table(out, PROJECTILE_COLUMNS, [(p.x, p.y, p.damage) for p in state.projectiles])
+    return bytes(out)
+
+def restore_snapshot(data: bytes, check_config: bool = True) -> GameState:
+    """Rebuild a GameState from take_snapshot() output."""
+    (magic, version, crc, seed, tick, money, score, lives, spawn_timer,
+     game_over, selected) = HEADER.unpack_from(data, 0)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError('Not a snapshot file or unsupported snapshot version')
+    if check_config and crc != config_crc():
+        raise ValueError('Snapshot was taken with a different config.json')
+
+    config = current_config()
+    tower_types = list(config.tower_types)
+    enemy_types = list(config.enemy_types)
+    view = memoryview(data)
+    pos = HEADER.size
+
+    mt = array('I')
+    mt.frombytes(view[pos:pos + 624 * mt.itemsize])
+    if sys.byteorder == 'big':
+        mt.byteswap()
+    pos += 624 * mt.itemsize
+    index, has_gauss, gauss_next = RNG_TAIL.unpack_from(view, pos)
+    pos += RNG_TAIL.size
+
+    state = GameState(seed)
+    state.rng.setstate((3, tuple(mt) + (index,), gauss_next if has_gauss else None))
+    state.tick = tick
+    state.money = _number(money)
+    state.score = score
+    state.lives = _number(lives)
+    state.spawn_timer = spawn_timer
+    state.game_over = game_over
+    state.selected_tower_type = tower_types[selected]
+
+    (xs, ys, types, healths, cooldowns), pos = _unpack_table(view, pos, TOWER_COLUMNS)
+    towers = []
+    for x, y, kind, health, cooldown in zip(xs, ys, types, healths, cooldowns):
+        tower = Tower(_number(x), _number(y), tower_types[kind])
+        tower.health = _number(health)
+        tower.attack_cooldown = _number(cooldown)
+        towers.append(tower)
+    state.towers = towers
+
+    (xs, ys, types, healths, cooldowns, targets), pos = _unpack_table(view, pos, ENEMY_COLUMNS)
+    grid = config.grid
+    enemies = []
+    for x, y, kind, health, cooldown, target in zip(xs, ys, types, healths, cooldowns, targets):
+        enemy = state.enemy_pool.acquire(grid.row_of(y), enemy_types[kind])
+        enemy.x = _number(x)
+        enemy.y = _number(y)
+        enemy.health = _number(health)
+        enemy.attack_cooldown = _number(cooldown)
+        enemy.current_target = towers[target] if target >= 0 else None
+        enemies.append(enemy)
+    state.enemies = enemies
+    state.rebuild_attackers()
+
+    (xs, ys, damages), pos = _unpack_table(view, pos, PROJECTILE_COLUMNS)
+    state.projectiles = [state.projectile_pool.acquire(_number(x), _number(y), _number(damage))
+                         for x, y, damage in zip(xs, ys, damages)]
+    state.sync_lanes()
+    return state
+
+def fork(state: GameState) -> GameState:
+    """An independent copy of `state` for branching what-if simulations."""
+    return restore_snapshot(take_snapshot(state), check_config=False)
+
+def save_snapshot(state: GameState, path: str) -> None:
+    Path(path).write_bytes(take_snapshot(state))
+
+def load_snapshot(path: str, check_config: bool = True) -> GameState:
+    return restore_snapshot(Path(path).read_bytes(), check_config)
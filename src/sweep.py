@@ -0,0 +1,173 @@
+"""Monte Carlo balance sweep over config.json parameters.
+
+Every combination of the given parameter values is played with every seed
+in headless games spread over a process pool. Rows are appended to a CSV file
+as chunks finish, and runs already in the file are skipped, so an interrupted
+sweep can be resumed with the same command.
+
+    python -m src.sweep --param enemy.spawn_interval=40:80:10 \\
+        --param tower.types.normal.damage=10,15,20 --seeds 50 --out sweep.csv
+"""
+import argparse
+import copy
+import csv
+import itertools
+import json
+import os
+from multiprocessing import Pool
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Set, Tuple
+from .config_manager import CONFIG, set_config
+from .game_logic import ENGINES
+from .headless import Placement, load_layout, run_headless
+
+RESULT_FIELDS = ['survival_ticks', 'game_over', 'score', 'lives', 'money', 'money_curve']
+
+# 一筆工作：(variant, seed, 參數覆寫)
+RunSpec = Tuple[int, int, Dict[str, Any]]
+
+def _parse_value(text: str) -> Any:
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        return text
+
+def parse_param(spec: str) -> Tuple[str, List[Any]]:
+    """Parse "path=v1,v2,..." or "path=start:stop:step" (stop inclusive)."""
+    path, sep, values = spec.partition('=')
+    if not sep or not values:
+        raise ValueError(f'Invalid parameter range: {spec!r}')
+    if ':' in values and ',' not in values:
+        start, stop, step = (float(v) for v in values.split(':'))
+        if step <= 0:
+            raise ValueError(f'Step must be positive: {spec!r}')
+        count = int(round((stop - start) / step)) + 1
+        points = [start + i * step for i in range(count)]
+        if all(float(v).is_integer() for v in (start, stop, step)):
+            return path, [int(p) for p in points]
+        return path, [round(p, 10) for p in points]
+    return path, [_parse_value(v) for v in values.split(',')]
+
+def apply_overrides(config: Dict[str, Any], overrides: Dict[str, Any]) -> None:
+    for path, value in overrides.items():
+        keys = path.split('.')
+        node = config
+        for key in keys[:-1]:
+            node = node[key]
+        if keys[-1] not in node:
+            raise KeyError(f'Unknown config key: {path}')
+        node[keys[-1]] = value
+
+def expand_runs(params: Sequence[Tuple[str, List[Any]]], seeds: Sequence[int]) -> Iterator[RunSpec]:
+    paths = [path for path, _ in params]
+    variants = itertools.product(*(values for _, values in params))
+    for variant_index, variant in enumerate(variants):
+        overrides = dict(zip(paths, variant))
+        for seed in seeds:
+            yield variant_index, seed, overrides
+
+def _run_key(seed: Any, values: Sequence[Any]) -> Tuple[str, ...]:
+    # 以種子與參數值（CSV 中的字串形式）識別一局，續跑時不受範圍順序影響
+    return (str(seed),) + tuple(str(v) for v in values)
+
+def _chunks(runs: Iterator[RunSpec], size: int) -> Iterator[List[RunSpec]]:
+    while True:
+        chunk = list(itertools.islice(runs, size))
+        if not chunk:
+            return
+        yield chunk
+
+_pristine_config: Dict[str, Any] = {}
+_worker_options: Dict[str, Any] = {}
+
+def _init_worker(options: Dict[str, Any]) -> None:
+    _pristine_config.update(copy.deepcopy(CONFIG))
+    _worker_options.update(options)
+
+def _run_chunk(chunk: List[RunSpec]) -> List[Dict[str, Any]]:
+    rows = []
+    for variant, seed, overrides in chunk:
+        # 每局都從原始設定開始，避免前一局的覆寫殘留
+        config = copy.deepcopy(_pristine_config)
+        apply_overrides(config, overrides)
+        set_config(config)
+        result = run_headless(_worker_options['ticks'], seed, _worker_options['layout'],
+                              _worker_options['engine'], _worker_options['sample_every'])
+        row = {'variant': variant, 'seed': seed, **overrides}
+        row.update({
+            'survival_ticks': result.ticks,
+            'game_over': int(result.game_over),
+            'score': result.score,
+            'lives': result.lives,
+            'money': result.money,
+            'money_curve': ' '.join(map(str, result.money_curve)),
+        })
+        rows.append(row)
+    return rows
+
+def _completed_runs(path: Path, paths: Sequence[str]) -> Set[Tuple[str, ...]]:
+    if not path.exists():
+        return set()
+    with open(path, 'r', newline='') as f:
+        return {_run_key(row['seed'], [row[p] for p in paths])
+                for row in csv.DictReader(f) if row.get('score')}
+
+def run_sweep(params: Sequence[Tuple[str, List[Any]]], seeds: Sequence[int], out_path: Path,
+              ticks: int, layout: Sequence[Placement] = (), engine: str = 'object',
+              sample_every: int = 100, chunk_size: int = 16,
+              processes: Optional[int] = None) -> int:
+    """Run every pending game of the sweep and return how many were played."""
+    for path, _ in params:
+        apply_overrides(copy.deepcopy(CONFIG), {path: None})  # 提早檢查鍵是否存在
+
+    paths = [path for path, _ in params]
+    done = _completed_runs(out_path, paths)
+    pending = (run for run in expand_runs(params, seeds)
+               if _run_key(run[1], list(run[2].values())) not in done)
+    fields = ['variant', 'seed'] + paths + RESULT_FIELDS
+    options = {'ticks': ticks, 'layout': list(layout), 'engine': engine,
+               'sample_every': sample_every}
+
+    played = 0
+    write_header = not out_path.exists() or out_path.stat().st_size == 0
+    with open(out_path, 'a', newline='') as f, \
+         Pool(processes or os.cpu_count(), _init_worker, (options,)) as pool:
+        writer = csv.DictWriter(f, fieldnames=fields)
+        if write_header:
+            writer.writeheader()
+        for rows in pool.imap_unordered(_run_chunk, _chunks(pending, chunk_size)):
+            writer.writerows(rows)
+            f.flush()
+            played += len(rows)
+        # 正常結束時讓工作行程自行退出；離開 with 時的 terminate() 送出的 SIGTERM
+        # 可能被繼承來的訊號處理常式（例如 pygame）攔下，join 會一直等待
+        pool.close()
+        pool.join()
+    return played
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description='Sweep config.json parameters over many headless games.')
+    parser.add_argument('--param', action='append', default=[], metavar='PATH=VALUES',
+                        help='dotted config path with "v1,v2,..." or "start:stop:step" values')
+    parser.add_argument('--seeds', type=int, default=10, help='number of seeds per variant')
+    parser.add_argument('--seed-start', type=int, default=0)
+    parser.add_argument('--ticks', type=int, default=20000)
+    parser.add_argument('--layout', default='', help='tower layout, as in src.headless')
+    # 進程池的工作行程不能再建立子行程，所以不提供 sharded 引擎；整批對局本來就已經並行
+    parser.add_argument('--engine', choices=[e for e in ENGINES if e != 'sharded'], default='object')
+    parser.add_argument('--sample-every', type=int, default=100,
+                        help='record money every N ticks (0 disables the curve)')
+    parser.add_argument('--chunk-size', type=int, default=16, help='games per work unit')
+    parser.add_argument('--processes', type=int, default=None)
+    parser.add_argument('--out', default='sweep.csv')
+    args = parser.parse_args(argv)
+
+    params = [parse_param(spec) for spec in args.param]
+    seeds = range(args.seed_start, args.seed_start + args.seeds)
+    played = run_sweep(params, seeds, Path(args.out), args.ticks,
+                       load_layout(args.layout) if args.layout else (), args.engine,
+                       args.sample_every, args.chunk_size, args.processes)
+    print(f'Played {played} games, results in {args.out}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,262 @@
+"""Gameplay event logs written off the game loop.
+
+    python -m src.headless --ticks 20000 --telemetry events.jsonl
+    python -m src.telemetry events.tdt --tail 20
+
+Engines call ``emit`` for spawns, shots, kills, escapes and destroyed towers
+and ``end_tick`` once per tick, which adds the economy record and hands the
+tick's batch to a bounded queue. A background thread drains the queue into
+rotating JSON Lines or binary files, so the game thread never formats or
+writes anything itself.
+"""
+import argparse
+import json
+import os
+import struct
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, BinaryIO, Deque, Dict, Iterator, List, Optional, Tuple
+from .config_manager import current_config
+if TYPE_CHECKING:
+    from .game_state import GameState
+
+# 事件種類；每筆記錄是 (種類, 整數欄位, 數值, 數值)，欄位名稱依種類而定
+ECONOMY, SPAWN, SHOT, KILL, ESCAPE, TOWER_LOST = range(6)
+EVENTS: Tuple[Tuple[str, Tuple[str, ...]], ...] = (
+    ('economy', ('lives', 'money', 'score')),
+    ('spawn', ('row', 'enemy_type')),
+    ('shot', ('row', 'col', 'damage')),
+    ('kill', ('row', 'x', 'reward')),
+    ('escape', ('row',)),
+    ('tower_lost', ('row', 'col')),
+)
+FORMATS = ('jsonl', 'binary')
+
+# 二進位格式：檔頭後接固定長度的記錄（幀、種類、整數欄位、兩個數值）
+MAGIC = b'TDTL'
+VERSION = 1
+HEADER = struct.Struct('<4sHI')
+RECORD = struct.Struct('<IBidd')
+
+Event = Tuple[int, int, Any, Any]
+Batch = Tuple[int, Event, List[Event]]
+
+class RotatingFile:
+    """Append-only file that moves on to a fresh file past `max_bytes`.
+
+    Full files are renamed ``path.1``, ``path.2``, ... (newest first) and only
+    `backups` of them are kept. `header` is written at the start of every file
+    so each one can be read on its own.
+    """
+
+    def __init__(self, path: str, max_bytes: int, backups: int, header: bytes = b''):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.header = header
+        self._file: Optional[BinaryIO] = None
+        self._size = 0
+        self._open()
+
+    def write(self, data: bytes) -> None:
+        if self._size > len(self.header) and self._size + len(data) > self.max_bytes:
+            self.rollover()
+        self._file.write(data)
+        self._size += len(data)
+
+    def rollover(self) -> None:
+        self._file.close()
+        if self.backups > 0:
+            for n in range(self.backups - 1, 0, -1):
+                older = self.path.with_name(f'{self.path.name}.{n}')
+                if older.exists():
+                    os.replace(older, self.path.with_name(f'{self.path.name}.{n + 1}'))
+            os.replace(self.path, self.path.with_name(f'{self.path.name}.1'))
+        self._open()
+
+    def flush(self) -> None:
+        self._file.flush()
+
+    def close(self) -> None:
+        self._file.close()
+
+    def _open(self) -> None:
+        self._file = open(self.path, 'wb')
+        self._file.write(self.header)
+        self._size = len(self.header)
+
+class Telemetry:
+    """Event bus from the engines to a background file writer.
+
+    The queue holds up to `capacity` ticks. When the writer falls behind,
+    ``policy='drop'`` discards whole ticks and counts them in
+    ``dropped_ticks`` / ``dropped_events``, so the game never waits;
+    ``policy='block'`` makes ``end_tick`` wait for room instead (counted in
+    ``stalls``), for offline runs that need every event.
+    """
+
+    def __init__(self, path: str, format: str = 'jsonl', capacity: int = 4096,
+                 policy: str = 'drop', max_bytes: int = 64 << 20, backups: int = 5,
+                 interval: float = 0.05):
+        if format not in FORMATS:
+            raise ValueError(f'Unknown telemetry format: {format}')
+        if policy not in ('drop', 'block'):
+            raise ValueError(f'Unknown back-pressure policy: {policy}')
+        self.format = format
+        self.capacity = capacity
+        self.block = policy == 'block'
+        self.interval = interval
+        self.enemy_types = list(current_config().enemy_types)
+        self.written_ticks = 0
+        self.written_events = 0
+        self.dropped_ticks = 0
+        self.dropped_events = 0
+        self.stalls = 0
+
+        # 遊戲執行緒只做 list.append 與 deque.append（在 GIL 下是原子操作），不需要鎖
+        self._events: List[Event] = []
+        self._queue: Deque[Batch] = deque()
+        self._closed = threading.Event()
+        header = b''
+        if format == 'binary':
+            meta = json.dumps({'enemy_types': self.enemy_types}).encode()
+            header = HEADER.pack(MAGIC, VERSION, len(meta)) + meta
+        self._file = RotatingFile(path, max_bytes, backups, header)
+        self._thread = threading.Thread(target=self._run, name='telemetry-writer', daemon=True)
+        self._thread.start()
+
+    def __enter__(self) -> 'Telemetry':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def emit(self, kind: int, value: int, a: Any = 0, b: Any = 0) -> None:
+        """Record an event of the current tick (see EVENTS for the fields of each kind)."""
+        self._events.append((kind, value, a, b))
+
+    def end_tick(self, state: 'GameState') -> None:
+        """Close the tick: add the economy record and queue the tick's events."""
+        batch = (state.tick, (ECONOMY, state.lives, state.money, state.score), self._events)
+        self._events = []
+        if len(self._queue) >= self.capacity:
+            if not self.block:
+                self.dropped_ticks += 1
+                self.dropped_events += len(batch[2]) + 1
+                return
+            self.stalls += 1
+            while len(self._queue) >= self.capacity and self._thread.is_alive():
+                time.sleep(self.interval / 10)
+        self._queue.append(batch)
+
+    @property
+    def pending(self) -> int:
+        return len(self._queue)
+
+    def close(self) -> None:
+        """Write out everything queued and stop the writer thread."""
+        if self._closed.is_set():
+            return
+        self._closed.set()
+        self._thread.join()
+        self._file.close()
+
+    def stats(self) -> Dict[str, int]:
+        return {'written_ticks': self.written_ticks, 'written_events': self.written_events,
+                'dropped_ticks': self.dropped_ticks, 'dropped_events': self.dropped_events,
+                'stalls': self.stalls}
+
+    # ------------------------------------------------------------------
+    # 寫入執行緒
+    # ------------------------------------------------------------------
+    def _run(self) -> None:
+        queue = self._queue
+        encode = self._encode_binary if self.format == 'binary' else self._encode_jsonl
+        while True:
+            closing = self._closed.is_set()
+            if not queue:
+                if closing:
+                    break
+                self._closed.wait(self.interval)
+                continue
+            # 每幀編碼後直接寫入；寫檔時會釋放 GIL，遊戲執行緒不必等整批編碼完
+            while queue:
+                tick, economy, events = queue.popleft()
+                self._file.write(encode(tick, economy, events))
+                self.written_ticks += 1
+                self.written_events += len(events) + 1
+            self._file.flush()
+
+    def _encode_jsonl(self, tick: int, economy: Event, events: List[Event]) -> bytes:
+        lines = [_json_line(tick, economy)]
+        lines.extend(_json_line(tick, event) for event in events)
+        lines.append('')
+        return '\n'.join(lines).encode()
+
+    def _encode_binary(self, tick: int, economy: Event, events: List[Event]) -> bytes:
+        pack = RECORD.pack
+        type_index = self.enemy_types.index
+        records = [pack(tick, *economy)]
+        for kind, value, a, b in events:
+            if kind == SPAWN:
+                a = type_index(a)
+            records.append(pack(tick, kind, value, a, b))
+        return b''.join(records)
+
+def _json_line(tick: int, event: Event) -> str:
+    kind, value, a, b = event
+    name, fields = EVENTS[kind]
+    record = {'tick': tick, 'event': name}
+    # 各引擎的座標可能是 int 或 float，輸出時統一
+    record.update(zip(fields, (value, _number(a) if isinstance(a, float) else a,
+                               _number(b) if isinstance(b, float) else b)))
+    return json.dumps(record, separators=(',', ':'))
+
+def read_events(path: str) -> Iterator[Dict[str, Any]]:
+    """Records of one telemetry file (either format) as dicts, in order."""
+    with open(path, 'rb') as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            f.seek(0)
+            for line in f:
+                yield json.loads(line)
+            return
+        f.seek(0)
+        _, version, meta_size = HEADER.unpack(f.read(HEADER.size))
+        if version != VERSION:
+            raise ValueError(f'Unsupported telemetry version: {version}')
+        enemy_types = json.loads(f.read(meta_size))['enemy_types']
+        data = f.read()
+    for tick, kind, value, a, b in RECORD.iter_unpack(data[:len(data) - len(data) % RECORD.size]):
+        name, fields = EVENTS[kind]
+        values = (value, enemy_types[int(a)] if kind == SPAWN else _number(a), _number(b))
+        record = {'tick': tick, 'event': name}
+        record.update(zip(fields, values))
+        yield record
+
+def _number(value: float) -> Any:
+    return int(value) if value.is_integer() else value
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description='Print a telemetry file as JSON Lines or summarize it')
+    parser.add_argument('path')
+    parser.add_argument('--tail', type=int, default=0, help='only print the last N records')
+    parser.add_argument('--summary', action='store_true', help='count records per event instead')
+    args = parser.parse_args(argv)
+
+    if args.summary:
+        counts: Dict[str, int] = {}
+        for record in read_events(args.path):
+            counts[record['event']] = counts.get(record['event'], 0) + 1
+        for name, count in counts.items():
+            print(f'{name:12s} {count}')
+        return
+    records = read_events(args.path)
+    if args.tail:
+        records = deque(records, maxlen=args.tail)
+    for record in records:
+        print(json.dumps(record, separators=(',', ':')))
+
+if __name__ == '__main__':
+    main()
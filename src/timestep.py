@@ -0,0 +1,75 @@
+import time
+from typing import Callable, Optional, Tuple
+
+MAX_SPEED = 0  # 不限速：在每幀的時間預算內盡可能多跑幾幀邏輯
+
+class FixedTimestep:
+    """Run logic at a fixed tick rate, independent of how fast frames render.
+
+    Real time is accumulated every frame and converted into whole logic ticks
+    (scaled by the speed setting), so a slow renderer runs several ticks per
+    frame instead of slowing the game down. At MAX_SPEED the logic runs until
+    the frame's time budget is used up. `clock` returns the time in seconds
+    (``time.perf_counter`` unless a test supplies its own).
+    """
+
+    SPEEDS: Tuple[int, ...] = (1, 2, 4, MAX_SPEED)
+
+    def __init__(self, tick_rate: int, max_ticks_per_frame: int = 8,
+                 frame_budget: Optional[float] = None,
+                 clock: Callable[[], float] = time.perf_counter):
+        self.clock = clock
+        self.tick_duration = 1.0 / tick_rate
+        self.max_ticks_per_frame = max_ticks_per_frame
+        self.frame_budget = frame_budget if frame_budget is not None else self.tick_duration
+        self.speed = 1
+        self.accumulator = 0.0
+        self.dropped_ticks = 0
+        self._last_time: Optional[float] = None
+
+    @property
+    def speed_label(self) -> str:
+        return 'Max' if self.speed == MAX_SPEED else f'{self.speed}x'
+
+    def set_speed(self, speed: int) -> None:
+        if speed not in self.SPEEDS:
+            raise ValueError(f'Unsupported speed: {speed}')
+        self.speed = speed
+        self.accumulator = 0.0
+
+    def cycle_speed(self) -> None:
+        index = self.SPEEDS.index(self.speed)
+        self.set_speed(self.SPEEDS[(index + 1) % len(self.SPEEDS)])
+
+    def advance(self, elapsed: float) -> int:
+        """Add `elapsed` seconds of real time and return the ticks now due."""
+        self.accumulator += elapsed * self.speed
+        ticks = int(self.accumulator / self.tick_duration)
+        self.accumulator -= ticks * self.tick_duration
+
+        # 負載過高時丟棄積壓的時間，避免越追越慢
+        limit = self.max_ticks_per_frame * self.speed
+        if ticks > limit:
+            self.dropped_ticks += ticks - limit
+            ticks = limit
+        return ticks
+
+    def run(self, update: Callable[[], None]) -> int:
+        """Run the logic ticks due since the previous call; returns how many ran."""
+        now = self.clock()
+        elapsed = 0.0 if self._last_time is None else now - self._last_time
+        self._last_time = now
+
+        if self.speed == MAX_SPEED:
+            deadline = now + self.frame_budget
+            ticks = 0
+            while True:
+                update()
+                ticks += 1
+                if self.clock() >= deadline:
+                    return ticks
+
+        ticks = self.advance(elapsed)
+        for _ in range(ticks):
+            update()
+        return ticks
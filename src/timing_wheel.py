@@ -0,0 +1,98 @@
+from typing import Dict, Generic, Hashable, List, Tuple, TypeVar
+
+T = TypeVar('T', bound=Hashable)
+
+class TimingWheel(Generic[T]):
+    """Hierarchical timing wheel of items keyed by the tick they are due.
+
+    Level 0 has one slot per tick; each higher level covers `slots` times the
+    span of the one below and is cascaded down when the current tick reaches
+    it. Scheduling is O(1) and advancing a tick only touches the items that
+    expire (plus an occasional cascade), however many are waiting. Cancelled
+    or rescheduled entries stay in their slots and are skipped when reached.
+    """
+
+    def __init__(self, tick: int = 0, bits: int = 6, levels: int = 4):
+        self._bits = bits
+        self._mask = (1 << bits) - 1
+        self._levels = levels
+        self._wheels: List[List[List[Tuple[int, T]]]] = [[[] for _ in range(1 << bits)]
+                                                        for _ in range(levels)]
+        self._overflow: List[Tuple[int, T]] = []
+        self._due: Dict[T, int] = {}
+        self.now = tick  # 下一個尚未處理的幀
+
+    def __len__(self) -> int:
+        return len(self._due)
+
+    def __contains__(self, item: T) -> bool:
+        return item in self._due
+
+    def due(self, item: T) -> int:
+        return self._due[item]
+
+    def schedule(self, item: T, tick: int) -> None:
+        """Wake `item` on `tick` (or the next processed tick if that has passed)."""
+        now = self.now
+        if tick < now:
+            tick = now
+        self._due[item] = tick
+        if tick >> self._bits == now >> self._bits:
+            # 最常見的情況：在目前這一圈內到期，直接放進第 0 層
+            self._wheels[0][tick & self._mask].append((tick, item))
+        else:
+            self._place(tick, item)
+
+    def cancel(self, item: T) -> None:
+        self._due.pop(item, None)
+
+    def clear(self) -> None:
+        for wheel in self._wheels:
+            for slot in wheel:
+                slot.clear()
+        self._overflow.clear()
+        self._due.clear()
+
+    def _place(self, tick: int, item: T) -> None:
+        # 放在與目前幀的高位元相同的最低一層
+        now = self.now
+        for level in range(self._levels):
+            shift = self._bits * (level + 1)
+            if tick >> shift == now >> shift:
+                self._wheels[level][(tick >> (shift - self._bits)) & self._mask].append((tick, item))
+                return
+        self._overflow.append((tick, item))
+
+    def _cascade(self, entries: List[Tuple[int, T]]) -> None:
+        due = self._due
+        for tick, item in entries:
+            if due.get(item) == tick:
+                self._place(tick, item)
+
+    def advance(self, tick: int) -> List[T]:
+        """Process every tick up to and including `tick`; return the items that expired."""
+        expired: List[T] = []
+        due = self._due
+        bits, mask = self._bits, self._mask
+        while self.now <= tick:
+            now = self.now
+            if now & mask == 0 and now:
+                # 跨越上層的邊界時，把該格的項目分配到下層
+                if now & ((1 << bits * self._levels) - 1) == 0:
+                    overflow, self._overflow = self._overflow, []
+                    self._cascade(overflow)
+                for level in range(self._levels - 1, 0, -1):
+                    if now & ((1 << bits * level) - 1) == 0:
+                        slot = self._wheels[level][(now >> bits * level) & mask]
+                        entries = slot[:]
+                        slot.clear()
+                        self._cascade(entries)
+            slot = self._wheels[0][now & mask]
+            if slot:
+                for entry_tick, item in slot:
+                    if due.get(item) == entry_tick:
+                        del due[item]
+                        expired.append(item)
+                slot.clear()
+            self.now = now + 1
+        return expired
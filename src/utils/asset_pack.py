@@ -0,0 +1,139 @@
+"""Sprites pre-scaled to their configured sizes, stored as raw pixels in one file.
+
+    python -m src.utils.asset_pack            # writes assets/sprites.pack
+    python -m src.utils.asset_pack --list
+
+The file starts with a JSON index (image path, size, pixel format, offset and
+the source PNG's size and mtime) followed by the pixel rows of every sprite.
+At runtime the file is memory-mapped and each sprite becomes a Surface over
+its bytes with ``pygame.image.frombuffer``, so nothing is decoded or scaled.
+Entries whose PNG changed since the build are reported as stale and the
+loader falls back to decoding them.
+"""
+import argparse
+import json
+import mmap
+import os
+import struct
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+import pygame
+
+MAGIC = b'TDAP'
+VERSION = 1
+HEADER = struct.Struct('<4sHI')
+# 像素資料對齊到 16 位元組
+ALIGN = 16
+
+PackKey = Tuple[str, Tuple[int, int]]
+
+class PackEntry(NamedTuple):
+    path: str
+    size: Tuple[int, int]
+    format: str
+    offset: int
+    length: int
+    source_bytes: int
+    source_mtime_ns: int
+
+def _source_stamp(source: Path) -> Tuple[int, int]:
+    try:
+        stat = source.stat()
+    except FileNotFoundError:
+        return -1, -1
+    return stat.st_size, stat.st_mtime_ns
+
+def write_pack(pack_path: str, sprites: Iterable[Tuple[str, Tuple[int, int], pygame.Surface, Path]]) -> int:
+    """Write (image path, size, scaled surface, source file) sprites; returns the entry count."""
+    blobs: List[bytes] = []
+    index = []
+    offset = 0
+    for path, size, surface, source in sprites:
+        pixel_format = 'RGBA' if surface.get_flags() & pygame.SRCALPHA else 'RGB'
+        data = pygame.image.tobytes(surface, pixel_format)
+        source_bytes, source_mtime_ns = _source_stamp(source)
+        index.append({'path': path, 'size': list(size), 'format': pixel_format, 'offset': offset,
+                      'length': len(data), 'source_bytes': source_bytes,
+                      'source_mtime_ns': source_mtime_ns})
+        padding = -len(data) % ALIGN
+        blobs.append(data + bytes(padding))
+        offset += len(data) + padding
+
+    meta = json.dumps({'sprites': index}).encode()
+    head = HEADER.pack(MAGIC, VERSION, len(meta)) + meta
+    head += bytes(-len(head) % ALIGN)
+    # 先寫暫存檔再替換，執行中的遊戲不會映射到寫到一半的檔案
+    tmp_path = f'{pack_path}.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(head)
+        for blob in blobs:
+            f.write(blob)
+    os.replace(tmp_path, pack_path)
+    return len(index)
+
+class AssetPack:
+    """A memory-mapped sprite pack.
+
+    The mapping is copy-on-write, so surfaces built over it may be drawn on
+    without touching the file. Those surfaces share its memory, so it can
+    only be closed once they are gone (``Surface.convert`` makes a copy).
+    """
+
+    def __init__(self, pack_path: str):
+        with open(pack_path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+        magic, version, meta_size = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != VERSION:
+            self._map.close()
+            raise ValueError(f'Not a version {VERSION} asset pack: {pack_path}')
+        meta = json.loads(self._map[HEADER.size:HEADER.size + meta_size])
+        head = HEADER.size + meta_size
+        self._data_start = head + (-head % ALIGN)
+        self.entries: Dict[PackKey, PackEntry] = {}
+        for raw in meta['sprites']:
+            entry = PackEntry(raw['path'], tuple(raw['size']), raw['format'], raw['offset'],
+                              raw['length'], raw['source_bytes'], raw['source_mtime_ns'])
+            self.entries[(entry.path, entry.size)] = entry
+
+    def is_fresh(self, key: PackKey, source: Path) -> bool:
+        """Whether the pack has `key` and its source file is unchanged since the build."""
+        entry = self.entries.get(key)
+        return entry is not None and _source_stamp(source) == (entry.source_bytes, entry.source_mtime_ns)
+
+    def surface(self, key: PackKey) -> pygame.Surface:
+        entry = self.entries[key]
+        start = self._data_start + entry.offset
+        view = memoryview(self._map)[start:start + entry.length]
+        return pygame.image.frombuffer(view, entry.size, entry.format)
+
+    def close(self) -> None:
+        self._map.close()
+
+def open_pack(pack_path: str) -> Optional[AssetPack]:
+    """The pack at `pack_path`, or None if there is none or it cannot be read."""
+    try:
+        return AssetPack(pack_path)
+    except (OSError, ValueError, KeyError, struct.error):
+        return None
+
+def main(argv: Optional[List[str]] = None) -> None:
+    from .image_loader import PACK_PATH, build_pack
+
+    parser = argparse.ArgumentParser(description='Build the pre-scaled sprite pack from config.json images')
+    parser.add_argument('--out', default=str(PACK_PATH), help=f'pack file (default: {PACK_PATH})')
+    parser.add_argument('--list', action='store_true', help='list the entries of an existing pack')
+    args = parser.parse_args(argv)
+
+    if args.list:
+        pack = open_pack(args.out)
+        if pack is None:
+            raise SystemExit(f'No readable asset pack at {args.out}')
+        for (path, size), entry in pack.entries.items():
+            print(f'{path} {size[0]}x{size[1]} {entry.format} {entry.length} bytes')
+        pack.close()
+        return
+    count = build_pack(args.out)
+    print(f'Packed {count} sprites into {args.out} ({os.path.getsize(args.out)} bytes)')
+
+if __name__ == '__main__':
+    main()
@@ -1,15 +1,134 @@
+import threading
 from pathlib import Path
 import pygame
-from typing import Tuple
+from typing import Dict, Optional, Tuple
+from ..config_manager import CONFIG
+from .asset_pack import AssetPack, open_pack, write_pack
 
-def load_image(image_path: str, size: Tuple[int, int]) -> pygame.Surface:
-    """Load and scale an image from the assets directory."""
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+# 由 `python -m src.utils.asset_pack` 產生的預先縮放圖片包
+PACK_PATH = PROJECT_ROOT / 'assets' / 'sprites.pack'
+
+# 以 (路徑, 尺寸) 為鍵的全域 surface 快取，所有實體共用同一張圖
+_image_cache: Dict[Tuple[str, Tuple[int, int]], pygame.Surface] = {}
+_converted = set()
+_cache_stats = {'hits': 0, 'misses': 0, 'packed': 0}
+# 圖片包中的 surface 直接引用映射的記憶體，映射需保持開啟
+_pack: Optional[AssetPack] = None
+_preload_thread: Optional[threading.Thread] = None
+
+def _resolve_path(image_path: str) -> Path:
+    path = Path(image_path)
+    if path.is_absolute():
+        return path
+    # config.json 中的路徑已包含 assets/ 前綴，相對於專案根目錄
+    if (PROJECT_ROOT / path).exists():
+        return PROJECT_ROOT / path
+    return PROJECT_ROOT / 'assets' / path
+
+def _convert(image: pygame.Surface) -> pygame.Surface:
+    # 只有在顯示模式建立後才能轉換成螢幕像素格式
+    if image.get_flags() & pygame.SRCALPHA:
+        return image.convert_alpha()
+    return image.convert()
+
+def _decode(image_path: str, size: Tuple[int, int]) -> pygame.Surface:
     try:
-        assets_path = Path(__file__).parent.parent.parent / 'assets'
-        image = pygame.image.load(str(assets_path / image_path))
+        image = pygame.image.load(str(_resolve_path(image_path)))
         return pygame.transform.scale(image, size)
     except FileNotFoundError:
         # 如果找不到圖片，返回一個空的 surface
         surface = pygame.Surface(size)
         surface.fill((255, 255, 255))  # 填充白色
         return surface
+
+def load_image(image_path: str, size: Tuple[int, int]) -> pygame.Surface:
+    """Load and scale an image from the assets directory, reusing cached surfaces."""
+    key = (image_path, tuple(size))
+    image = _image_cache.get(key)
+    if image is None and _preload_thread is not None:
+        # 背景預先載入可能正在處理這張圖，等它完成而不是重複解碼
+        _wait_for_preload()
+        image = _image_cache.get(key)
+    if image is None:
+        _cache_stats['misses'] += 1
+        image = _decode(image_path, key[1])
+        _image_cache[key] = image
+    else:
+        _cache_stats['hits'] += 1
+
+    if key not in _converted and pygame.display.get_surface() is not None:
+        image = _convert(image)
+        _image_cache[key] = image
+        _converted.add(key)
+    return image
+
+def sprite(kind) -> pygame.Surface:
+    """The cached surface for a compiled TowerType or EnemyType."""
+    return load_image(kind.image_path, kind.image_size)
+
+def image_size_for(image_key: str) -> Tuple[int, int]:
+    """Return the configured sprite size for a key in CONFIG['images']."""
+    size_config = CONFIG['tower_size'] if 'tower' in image_key else CONFIG['enemy_size']
+    return (size_config['width'], size_config['height'])
+
+def preload_images(background: bool = False) -> None:
+    """Put every image listed in CONFIG['images'] into the cache.
+
+    Sprites come from the asset pack when it is up to date with the PNGs and
+    are decoded otherwise. With `background` the work runs on a thread and
+    this returns at once; load_image waits for it instead of decoding twice.
+    Start a background preload only after pygame.init() and set_mode(), so
+    the thread does not create surfaces while SDL is still starting up.
+    """
+    global _preload_thread
+    if not background:
+        _preload()
+        return
+    _wait_for_preload()
+    _preload_thread = threading.Thread(target=_preload, name='image-preload', daemon=True)
+    _preload_thread.start()
+
+def _preload() -> None:
+    global _pack
+    if _pack is None:
+        _pack = open_pack(str(PACK_PATH))
+    for image_key, image_path in CONFIG['images'].items():
+        key = (image_path, image_size_for(image_key))
+        if key in _image_cache:
+            continue
+        if _pack is not None and _pack.is_fresh(key, _resolve_path(image_path)):
+            _image_cache[key] = _pack.surface(key)
+            _cache_stats['packed'] += 1
+        else:
+            _cache_stats['misses'] += 1
+            _image_cache[key] = _decode(image_path, key[1])
+
+def _wait_for_preload() -> None:
+    global _preload_thread
+    thread = _preload_thread
+    if thread is not None and thread is not threading.current_thread():
+        thread.join()
+        _preload_thread = None
+
+def build_pack(pack_path: str = str(PACK_PATH)) -> int:
+    """Decode and scale every image in CONFIG['images'] into a sprite pack; returns the entry count."""
+    sprites = {}
+    for image_key, image_path in CONFIG['images'].items():
+        size = image_size_for(image_key)
+        if (image_path, size) not in sprites:
+            sprites[(image_path, size)] = _decode(image_path, size)
+    return write_pack(pack_path, [(path, size, surface, _resolve_path(path))
+                                  for (path, size), surface in sprites.items()])
+
+def get_cache_stats() -> Dict[str, int]:
+    return {'hits': _cache_stats['hits'], 'misses': _cache_stats['misses'],
+            'packed': _cache_stats['packed'], 'size': len(_image_cache)}
+
+def clear_image_cache() -> None:
+    _wait_for_preload()
+    _image_cache.clear()
+    _converted.clear()
+    _cache_stats['hits'] = 0
+    _cache_stats['misses'] = 0
+    _cache_stats['packed'] = 0
@@ -0,0 +1,377 @@
+"""Many independent games stepped in lockstep, for training placement agents.
+
+    python -m src.vector_env --envs 1024 --steps 2000
+
+Every game lives in one row of padded NumPy arrays (towers on a per-game
+grid, enemies and projectiles in fixed slots with an alive mask), and each
+phase of the tick runs once for all games. The rules are those of
+ArrayGameLogic; each game keeps its own ``random.Random(seed)`` for spawning,
+so a game here plays out exactly like ``GameState(seed)`` under the numpy
+engine with the same placements.
+"""
+import argparse
+import random
+import time
+from typing import Dict, Iterable, Optional, Sequence, Tuple
+import numpy as np
+from .config_manager import current_config
+
+# 排序鍵 (遊戲, 行) * LANE_STRIDE + x，與 ArrayGameLogic 相同的做法
+LANE_STRIDE = float(1 << 20)
+NO_ACTION = 0
+
+Observation = Dict[str, np.ndarray]
+
+class VectorEnv:
+    """`num_envs` games advanced together by `step(actions)`.
+
+    An action is 0 to do nothing, or ``action(row, col, tower_type)`` to buy a
+    tower before the tick runs; unaffordable or occupied placements are
+    ignored. The reward is the number of enemies killed minus
+    ``life_penalty`` per enemy that escaped. A game that is over (or reached
+    ``max_ticks``) stays frozen with zero reward until ``reset`` is called
+    for it.
+
+    Observations are fresh arrays:
+
+    - ``towers``: (N, rows, cols) int8, 0 for an empty cell or 1 + tower type index
+    - ``tower_health``: (N, rows, cols) float32
+    - ``enemy_row``: (N, slots) int16, -1 for an empty slot
+    - ``enemy_x`` / ``enemy_health``: (N, slots) float32, 0 for an empty slot
+    - ``money``, ``lives``, ``score``: (N,) int64
+
+    Enemies and projectiles live in `enemy_slots` / `projectile_slots`
+    columns per game; both double whenever a game runs out, so small
+    starting sizes only cost a few copies early on.
+    """
+
+    def __init__(self, num_envs: int, max_ticks: Optional[int] = None, life_penalty: float = 1.0,
+                 enemy_slots: int = 16, projectile_slots: int = 32):
+        config = current_config()
+        grid = config.grid
+        self.num_envs = num_envs
+        self.max_ticks = max_ticks
+        self.life_penalty = life_penalty
+        self.rows, self.cols = grid.rows, grid.cols
+
+        # 類型屬性查表，陣列中只存類型索引
+        self.tower_types = list(config.tower_types)
+        towers = [config.tower_types[name] for name in self.tower_types]
+        self.tower_cost = np.array([t.cost for t in towers])
+        self.tower_health = np.array([t.health for t in towers], dtype=float)
+        self.tower_cooldown = np.array([t.attack_cooldown for t in towers], dtype=np.int64)
+        self.tower_damage = np.array([t.damage for t in towers], dtype=float)
+        self.enemy_types = list(config.enemy_types)
+        enemies = [config.enemy_types[name] for name in self.enemy_types]
+        self.enemy_health = np.array([e.health for e in enemies], dtype=float)
+        self.enemy_speed = np.array([e.speed for e in enemies], dtype=float)
+        self.enemy_attack = np.array([e.attack_power for e in enemies], dtype=float)
+        self.enemy_reward = np.array([e.reward for e in enemies])
+        # 防禦塔右緣的 x；射出的子彈從這裡開始
+        self.col_right = np.array([x + grid.size for x in grid.col_x], dtype=float)
+
+        n = num_envs
+        self.money = np.zeros(n, dtype=np.result_type(self.tower_cost, self.enemy_reward,
+                                                      config.initial_money))
+        self.score = np.zeros(n, dtype=np.int64)
+        self.lives = np.zeros(n, dtype=np.int64)
+        self.tick = np.zeros(n, dtype=np.int64)
+        self.spawn_timer = np.zeros(n, dtype=np.int64)
+        self.done = np.ones(n, dtype=bool)
+        self.rngs = [random.Random(0) for _ in range(n)]
+
+        self.t_type = np.full((n, self.rows, self.cols), -1, dtype=np.int64)
+        self.t_health = np.zeros((n, self.rows, self.cols))
+        self.t_cooldown = np.zeros((n, self.rows, self.cols), dtype=np.int64)
+
+        self.e_alive = np.zeros((n, enemy_slots), dtype=bool)
+        self.e_x = np.zeros((n, enemy_slots))
+        self.e_row = np.zeros((n, enemy_slots), dtype=np.int64)
+        self.e_type = np.zeros((n, enemy_slots), dtype=np.int64)
+        self.e_health = np.zeros((n, enemy_slots))
+        self.e_cooldown = np.zeros((n, enemy_slots), dtype=np.int64)
+        self.e_target = np.full((n, enemy_slots), -1, dtype=np.int64)
+        # 生成順序；同一位置的敵人依此決定誰先被擊中，與 ArrayGameLogic 的列表順序一致
+        self.e_order = np.zeros((n, enemy_slots), dtype=np.int64)
+        self.spawned = np.zeros(n, dtype=np.int64)
+
+        self.p_alive = np.zeros((n, projectile_slots), dtype=bool)
+        self.p_x = np.zeros((n, projectile_slots))
+        self.p_row = np.zeros((n, projectile_slots), dtype=np.int64)
+        self.p_damage = np.zeros((n, projectile_slots))
+
+    # ------------------------------------------------------------------
+    # 公開介面
+    # ------------------------------------------------------------------
+    def action(self, row: int, col: int, tower_type: str = 'normal') -> int:
+        """The action that buys a `tower_type` tower on (row, col)."""
+        return 1 + (self.tower_types.index(tower_type) * self.rows + row) * self.cols + col
+
+    @property
+    def num_actions(self) -> int:
+        return 1 + len(self.tower_types) * self.rows * self.cols
+
+    def reset(self, seeds: Sequence[int], envs: Optional[Iterable[int]] = None) -> Observation:
+        """Start new games with `seeds` in `envs` (all games by default)."""
+        envs = np.arange(self.num_envs) if envs is None else np.asarray(list(envs), dtype=np.int64)
+        if len(seeds) != len(envs):
+            raise ValueError(f'Expected {len(envs)} seeds, got {len(seeds)}')
+        config = current_config()
+        for env, seed in zip(envs.tolist(), seeds):
+            self.rngs[env] = random.Random(seed)
+        self.money[envs] = config.initial_money
+        self.score[envs] = 0
+        self.lives[envs] = config.initial_lives
+        self.tick[envs] = 0
+        self.spawn_timer[envs] = 0
+        self.spawned[envs] = 0
+        self.done[envs] = False
+        self.t_type[envs] = -1
+        self.t_health[envs] = 0
+        self.t_cooldown[envs] = 0
+        self.e_alive[envs] = False
+        self.e_target[envs] = -1
+        self.p_alive[envs] = False
+        return self.observe()
+
+    def step(self, actions: Sequence[int]) -> Tuple[Observation, np.ndarray, np.ndarray]:
+        """Apply one action per game and advance every running game by one tick.
+
+        Returns (observation, rewards, done).
+        """
+        active = ~self.done
+        score, lives = self.score.copy(), self.lives.copy()
+        self._place(np.asarray(actions, dtype=np.int64), active)
+        self._spawn(active)
+        self._step_enemies(active)
+        self._step_projectiles(active)
+        self._step_towers(active)
+        self.tick[active] += 1
+
+        rewards = (self.score - score) - self.life_penalty * (lives - self.lives)
+        self.done |= self.lives <= 0
+        if self.max_ticks is not None:
+            self.done |= self.tick >= self.max_ticks
+        return self.observe(), rewards, self.done.copy()
+
+    def observe(self) -> Observation:
+        alive = self.e_alive
+        return {
+            'towers': (self.t_type + 1).astype(np.int8),
+            'tower_health': self.t_health.astype(np.float32),
+            'enemy_row': np.where(alive, self.e_row, -1).astype(np.int16),
+            'enemy_x': np.where(alive, self.e_x, 0).astype(np.float32),
+            'enemy_health': np.where(alive, self.e_health, 0).astype(np.float32),
+            'money': self.money.copy(),
+            'lives': self.lives.copy(),
+            'score': self.score.copy(),
+        }
+
+    # ------------------------------------------------------------------
+    # 遊戲階段（只更新進行中的遊戲）
+    # ------------------------------------------------------------------
+    def _place(self, actions: np.ndarray, active: np.ndarray) -> None:
+        envs = np.nonzero(active & (actions > NO_ACTION) & (actions < self.num_actions))[0]
+        if not len(envs):
+            return
+        cell = actions[envs] - 1
+        tower_type, cell = np.divmod(cell, self.rows * self.cols)
+        row, col = np.divmod(cell, self.cols)
+        cost = self.tower_cost[tower_type]
+        ok = (self.money[envs] >= cost) & (self.t_type[envs, row, col] < 0)
+        envs, row, col, tower_type = envs[ok], row[ok], col[ok], tower_type[ok]
+        self.t_type[envs, row, col] = tower_type
+        self.t_health[envs, row, col] = self.tower_health[tower_type]
+        self.t_cooldown[envs, row, col] = 0
+        self.money[envs] -= cost[ok]
+
+    def _spawn(self, active: np.ndarray) -> None:
+        config = current_config()
+        self.spawn_timer[active] += 1
+        envs = np.nonzero(active & (self.spawn_timer >= config.spawn_interval))[0]
+        if not len(envs):
+            return
+        self.spawn_timer[envs] = 0
+        # 亂數依 GameLogic._spawn_enemy 的順序逐局抽取
+        last_row = config.grid.rows - 1
+        strong_score = config.strong_enemy_score
+        strong = self.enemy_types.index('strong')
+        normal = self.enemy_types.index('normal')
+        rows, types = [], []
+        for env, score in zip(envs.tolist(), self.score[envs].tolist()):
+            rng = self.rngs[env]
+            rows.append(rng.randint(0, last_row))
+            types.append(strong if score >= strong_score and rng.random() < 0.3 else normal)
+        types = np.array(types, dtype=np.int64)
+
+        slots = self._allocate('e', envs)
+        self.e_alive[envs, slots] = True
+        self.e_x[envs, slots] = float(config.width - config.grid.margin)
+        self.e_row[envs, slots] = rows
+        self.e_type[envs, slots] = types
+        self.e_health[envs, slots] = self.enemy_health[types]
+        self.e_cooldown[envs, slots] = 0
+        self.e_target[envs, slots] = -1
+        self.e_order[envs, slots] = self.spawned[envs]
+        self.spawned[envs] += 1
+
+    def _step_enemies(self, active: np.ndarray) -> None:
+        config = current_config()
+        grid = config.grid
+        live = self.e_alive & active[:, None]
+        has_target = live & (self.e_target >= 0)
+
+        # 已經鎖定防禦塔的敵人：冷卻中則倒數，否則攻擊
+        attacking = has_target & (self.e_cooldown <= 0)
+        self.e_cooldown[has_target & ~attacking] -= 1
+        if attacking.any():
+            envs, slots = np.nonzero(attacking)
+            rows, cols = self.e_row[envs, slots], self.e_target[envs, slots]
+            np.subtract.at(self.t_health, (envs, rows, cols), self.enemy_attack[self.e_type[envs, slots]])
+            self.e_cooldown[envs, slots] = config.enemy_attack_cooldown
+            destroyed = self.t_health[envs, rows, cols] <= 0
+            if destroyed.any():
+                self.t_type[envs[destroyed], rows[destroyed], cols[destroyed]] = -1
+                # 目標被摧毀的敵人下一幀重新前進
+                targeting = np.nonzero(has_target)
+                gone = self.t_type[targeting[0], self.e_row[targeting], self.e_target[targeting]] < 0
+                self.e_target[targeting[0][gone], targeting[1][gone]] = -1
+
+        # 沒有目標的敵人：左邊相鄰格子有防禦塔、且剛越過其右緣不到一步時被阻擋
+        free = live & ~has_target
+        speed = self.enemy_speed[self.e_type]
+        offset = self.e_x - grid.margin
+        col = np.floor(offset / grid.size).astype(np.int64)
+        near = free & (offset - col * grid.size < speed) & (col >= 1) & (col <= self.cols)
+        if near.any():
+            envs, slots = np.nonzero(near)
+            left = col[envs, slots] - 1
+            blocked = self.t_type[envs, self.e_row[envs, slots], left] >= 0
+            envs, slots = envs[blocked], slots[blocked]
+            self.e_target[envs, slots] = left[blocked]
+            free[envs, slots] = False
+
+        np.subtract(self.e_x, speed, out=self.e_x, where=free)
+        escaped = free & (self.e_x < 0)
+        if escaped.any():
+            self.e_alive &= ~escaped
+            self.lives -= escaped.sum(axis=1)
+            over = self.lives <= 0
+            self.lives[over] = 0
+
+    def _step_projectiles(self, active: np.ndarray) -> None:
+        config = current_config()
+        live = self.p_alive & active[:, None]
+        if not live.any():
+            return
+        np.add(self.p_x, config.projectile_speed, out=self.p_x, where=live)
+        gone = live & (self.p_x > config.width)
+
+        enemies = self.e_alive & active[:, None]
+        if enemies.any():
+            # 每顆子彈擊中同一局同一行中碰撞範圍內最左邊的敵人
+            reach = config.projectile_radius + config.enemy_radius
+            e_envs, e_slots = np.nonzero(enemies)
+            keys = (e_envs * self.rows + self.e_row[e_envs, e_slots]) * LANE_STRIDE + self.e_x[e_envs, e_slots]
+            order = np.lexsort((self.e_order[e_envs, e_slots], keys))
+            sorted_keys = keys[order]
+            p_envs, p_slots = np.nonzero(live)
+            p_keys = (p_envs * self.rows + self.p_row[p_envs, p_slots]) * LANE_STRIDE + self.p_x[p_envs, p_slots]
+            pos = np.searchsorted(sorted_keys, p_keys - reach, side='right')
+            in_range = pos < len(sorted_keys)
+            pos = np.minimum(pos, len(sorted_keys) - 1)
+            hit = in_range & (sorted_keys[pos] < p_keys + reach)
+
+            if hit.any():
+                victims = order[pos[hit]]
+                v_envs, v_slots = e_envs[victims], e_slots[victims]
+                np.subtract.at(self.e_health, (v_envs, v_slots), self.p_damage[p_envs[hit], p_slots[hit]])
+                dead = enemies & (self.e_health <= 0)
+                if dead.any():
+                    self.e_alive &= ~dead
+                    self.score += dead.sum(axis=1)
+                    self.money += np.where(dead, self.enemy_reward[self.e_type], 0).sum(axis=1)
+                gone[p_envs[hit], p_slots[hit]] = True
+
+        self.p_alive &= ~gone
+
+    def _step_towers(self, active: np.ndarray) -> None:
+        placed = (self.t_type >= 0) & active[:, None, None]
+        ready = placed & (self.t_cooldown <= 0)
+        self.t_cooldown[placed & ~ready] -= 1
+
+        # 每一行最右邊的敵人決定該行的防禦塔是否有目標
+        rightmost = np.full(self.num_envs * self.rows, -np.inf)
+        envs, slots = np.nonzero(self.e_alive & active[:, None])
+        if len(envs):
+            np.maximum.at(rightmost, envs * self.rows + self.e_row[envs, slots], self.e_x[envs, slots])
+        rightmost = rightmost.reshape(self.num_envs, self.rows, 1)
+        fire = ready & (rightmost >= self.col_right)
+        if not fire.any():
+            return
+
+        envs, rows, cols = np.nonzero(fire)
+        tower_type = self.t_type[envs, rows, cols]
+        self.t_cooldown[envs, rows, cols] = self.tower_cooldown[tower_type]
+        slots = self._allocate('p', envs)
+        self.p_alive[envs, slots] = True
+        self.p_x[envs, slots] = self.col_right[cols]
+        self.p_row[envs, slots] = rows
+        self.p_damage[envs, slots] = self.tower_damage[tower_type]
+
+    # ------------------------------------------------------------------
+    # 空位配置
+    # ------------------------------------------------------------------
+    def _allocate(self, prefix: str, envs: np.ndarray) -> np.ndarray:
+        """Free slot indexes for new entities of games `envs` (sorted); grows the arrays if needed."""
+        counts = np.bincount(envs, minlength=self.num_envs)
+        users = np.nonzero(counts)[0]
+        alive = getattr(self, f'{prefix}_alive')
+        free = ~alive[users]
+        while (free.sum(axis=1) < counts[users]).any():
+            self._grow(prefix)
+            alive = getattr(self, f'{prefix}_alive')
+            free = ~alive[users]
+        # 第 j 個新實體放進該局的第 j 個空位
+        free_rows, free_slots = np.nonzero(free)
+        free_start = np.searchsorted(free_rows, np.arange(len(users)))
+        user_of = np.searchsorted(users, envs)
+        starts = np.cumsum(counts[users]) - counts[users]
+        rank = np.arange(len(envs)) - starts[user_of]
+        return free_slots[free_start[user_of] + rank]
+
+    def _grow(self, prefix: str) -> None:
+        names = [name for name in vars(self) if name.startswith(f'{prefix}_')]
+        for name in names:
+            array = getattr(self, name)
+            fill = -1 if name == 'e_target' else 0
+            extra = np.full_like(array, fill)
+            setattr(self, name, np.concatenate((array, extra), axis=1))
+
+def benchmark(num_envs: int, steps: int, seed: int = 0) -> float:
+    """Env-steps per second with random placements, as in a training loop."""
+    env = VectorEnv(num_envs)
+    env.reset(list(range(seed, seed + num_envs)))
+    rng = np.random.default_rng(seed)
+    # 大約每 50 步嘗試放置一座防禦塔
+    actions = np.where(rng.random((steps, num_envs)) < 0.02,
+                       rng.integers(1, env.num_actions, (steps, num_envs)), NO_ACTION)
+    start = time.perf_counter()
+    for step in range(steps):
+        _, _, done = env.step(actions[step])
+        if done.any():
+            finished = np.nonzero(done)[0]
+            env.reset((finished + step * num_envs).tolist(), finished)
+    return num_envs * steps / (time.perf_counter() - start)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Measure VectorEnv throughput')
+    parser.add_argument('--envs', type=int, default=1024, help='games stepped together')
+    parser.add_argument('--steps', type=int, default=2000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    rate = benchmark(args.envs, args.steps, args.seed)
+    print(f'{args.envs} envs x {args.steps} steps: {rate:,.0f} env-steps/sec')
+
+if __name__ == '__main__':
+    main()
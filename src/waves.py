@@ -0,0 +1,160 @@
+"""Scripted enemy waves streamed from a JSON Lines file.
+
+Each line is one spawn group; groups must be listed in start order so the
+file can be read one line at a time while the game runs:
+
+    {"at": 0, "count": 20, "every": 30}
+    {"after": 600, "count": 10000, "every": 2, "batch": 8, "rows": "all", "types": {"normal": 3, "strong": 1}}
+    {"after": 200, "count": 64, "batch": 64, "rows": [0, 7], "type": "strong"}
+
+- ``at`` / ``after``: start tick, absolute or relative to the previous group's start
+- ``count``: enemies in the group; ``batch`` of them spawn together every ``every`` ticks
+- ``rows``: ``"random"`` (default), ``"all"`` (rows in turn), a row number or a list cycled through
+- ``type`` or ``types``: one enemy type, or weights for a random mix (default ``"normal"``)
+
+Only the groups that have started and not finished are held in memory, so
+waves of any size cost the same to load.
+"""
+import heapq
+import json
+import random
+from itertools import count
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
+from .config_manager import current_config
+
+# 一批生成：[(行, 敵人類型), ...]
+Batch = List[Tuple[int, str]]
+Rows = Union[str, Tuple[int, ...]]
+
+class WaveGroup(NamedTuple):
+    start: int
+    count: int
+    every: int = 1
+    batch: int = 1
+    rows: Rows = 'random'
+    types: Tuple[Tuple[str, float], ...] = (('normal', 1.0),)
+
+def _int(entry: Dict, key: str, default: int, minimum: int, where: str) -> int:
+    value = entry.get(key, default)
+    if isinstance(value, bool) or not isinstance(value, int) or value < minimum:
+        raise ValueError(f'{where}: {key} must be an integer of at least {minimum}, got {value!r}')
+    return value
+
+def parse_group(entry: Dict, previous_start: int = 0, where: str = 'Wave group') -> WaveGroup:
+    """Validate one decoded line; `previous_start` anchors a relative ``after``."""
+    if not isinstance(entry, dict):
+        raise ValueError(f'{where}: expected a JSON object')
+    config = current_config()
+    rows_count = config.grid.rows
+
+    if 'at' in entry:
+        start = _int(entry, 'at', 0, 0, where)
+    else:
+        start = previous_start + _int(entry, 'after', 0, 0, where)
+    if start < previous_start:
+        raise ValueError(f'{where}: groups must be in start order ({start} < {previous_start})')
+
+    rows = entry.get('rows', 'random')
+    if isinstance(rows, int) and not isinstance(rows, bool):
+        rows = (rows,)
+    elif isinstance(rows, list) and rows:
+        rows = tuple(rows)
+    elif rows not in ('random', 'all'):
+        raise ValueError(f'{where}: rows must be "random", "all", a row or a list of rows, got {rows!r}')
+    if isinstance(rows, tuple) and not all(isinstance(r, int) and 0 <= r < rows_count for r in rows):
+        raise ValueError(f'{where}: rows must be between 0 and {rows_count - 1}, got {list(rows)!r}')
+
+    types = entry.get('types', {entry.get('type', 'normal'): 1})
+    if not isinstance(types, dict) or not types:
+        raise ValueError(f'{where}: types must be an object of type weights')
+    for name, weight in types.items():
+        if name not in config.enemy_types:
+            raise ValueError(f'{where}: unknown enemy type {name!r}')
+        if isinstance(weight, bool) or not isinstance(weight, (int, float)) or weight <= 0:
+            raise ValueError(f'{where}: weight of {name!r} must be a positive number')
+
+    return WaveGroup(start, _int(entry, 'count', 1, 0, where), _int(entry, 'every', 1, 1, where),
+                     _int(entry, 'batch', 1, 1, where), rows,
+                     tuple((name, float(weight)) for name, weight in types.items()))
+
+def read_waves(path: str) -> Iterator[WaveGroup]:
+    """Yield the groups of a wave file one line at a time."""
+    previous_start = 0
+    with open(path, 'r') as f:
+        for number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            where = f'{path} line {number}'
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ValueError(f'{where}: {e}') from None
+            group = parse_group(entry, previous_start, where)
+            previous_start = group.start
+            yield group
+
+def group_batches(group: WaveGroup, rng: random.Random) -> Iterator[Tuple[int, Batch]]:
+    """Yield (tick, batch) for one group, drawing random rows and types from `rng`."""
+    rows_count = current_config().grid.rows
+    names = [name for name, _ in group.types]
+    weights = [weight for _, weight in group.types]
+    spawned = 0
+    tick = group.start
+    while spawned < group.count:
+        size = min(group.batch, group.count - spawned)
+        if group.rows == 'random':
+            rows = [rng.randrange(rows_count) for _ in range(size)]
+        else:
+            pattern = range(rows_count) if group.rows == 'all' else group.rows
+            rows = [pattern[(spawned + i) % len(pattern)] for i in range(size)]
+        kinds = names * size if len(names) == 1 else rng.choices(names, weights, k=size)
+        yield tick, list(zip(rows, kinds))
+        spawned += size
+        tick += group.every
+
+class WaveSpawner:
+    """Merges the batches of overlapping groups into one spawn list per tick.
+
+    Groups are pulled from `groups` only when their start tick is reached,
+    and batches that fall on the same tick keep the file order.
+    """
+
+    def __init__(self, groups: Iterable[WaveGroup], rng: random.Random):
+        self._groups = iter(groups)
+        self._rng = rng
+        self._next_group: Optional[WaveGroup] = next(self._groups, None)
+        # (幀, 群組順序, 該幀的批次, 群組的產生器)
+        self._active: List[Tuple[int, int, Batch, Iterator[Tuple[int, Batch]]]] = []
+        self._order = count()
+        self.spawned = 0
+
+    @property
+    def finished(self) -> bool:
+        return self._next_group is None and not self._active
+
+    def due(self, tick: int) -> Batch:
+        """Every enemy to spawn on `tick` (earlier ticks that were skipped spawn now)."""
+        while self._next_group is not None and self._next_group.start <= tick:
+            self._start(self._next_group)
+            self._next_group = next(self._groups, None)
+
+        spawns: Batch = []
+        active = self._active
+        while active and active[0][0] <= tick:
+            _, order, batch, batches = heapq.heappop(active)
+            spawns.extend(batch)
+            following = next(batches, None)
+            if following is not None:
+                heapq.heappush(active, (following[0], order, following[1], batches))
+        self.spawned += len(spawns)
+        return spawns
+
+    def _start(self, group: WaveGroup) -> None:
+        batches = group_batches(group, self._rng)
+        first = next(batches, None)
+        if first is not None:
+            heapq.heappush(self._active, (first[0], next(self._order), first[1], batches))
+
+def load_waves(path: str, rng: random.Random) -> WaveSpawner:
+    return WaveSpawner(read_waves(path), rng)
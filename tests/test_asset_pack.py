@@ -0,0 +1,56 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+import pygame
+from src.utils import image_loader
+from src.utils.asset_pack import open_pack, write_pack
+
+class TestAssetPack(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.pack_path = os.path.join(self.tmp.name, 'sprites.pack')
+        image_loader.clear_image_cache()
+        self.addCleanup(image_loader.clear_image_cache)
+        # 每個測試使用自己的圖片包，不動到 assets/
+        for name, value in (('PACK_PATH', Path(self.pack_path)), ('_pack', None)):
+            patcher = patch.object(image_loader, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_preload_uses_pack_with_same_pixels(self):
+        self.assertEqual(image_loader.build_pack(self.pack_path), 4)
+        image_loader.preload_images(background=True)
+        image = image_loader.load_image('assets/zombie.png', image_loader.image_size_for('enemy'))
+        stats = image_loader.get_cache_stats()
+        self.assertEqual((stats['packed'], stats['misses']), (4, 0))
+
+        decoded = image_loader._decode('assets/zombie.png', image.get_size())
+        self.assertEqual(image.get_flags() & pygame.SRCALPHA, decoded.get_flags() & pygame.SRCALPHA)
+        self.assertEqual(pygame.image.tobytes(image, 'RGBA'), pygame.image.tobytes(decoded, 'RGBA'))
+
+    def test_changed_source_is_stale(self):
+        source = Path(self.tmp.name) / 'tower.png'
+        surface = pygame.Surface((4, 3))
+        surface.fill((10, 20, 30))
+        pygame.image.save(surface, str(source))
+        write_pack(self.pack_path, [('tower.png', (4, 3), surface, source)])
+
+        pack = open_pack(self.pack_path)
+        self.assertTrue(pack.is_fresh(('tower.png', (4, 3)), source))
+        self.assertFalse(pack.is_fresh(('tower.png', (8, 6)), source))
+        self.assertEqual(pack.surface(('tower.png', (4, 3))).get_at((3, 2)), (10, 20, 30, 255))
+        os.utime(source, ns=(0, 0))
+        self.assertFalse(pack.is_fresh(('tower.png', (4, 3)), source))
+
+    def test_missing_or_invalid_pack(self):
+        self.assertIsNone(open_pack(self.pack_path))
+        Path(self.pack_path).write_bytes(b'not a pack')
+        self.assertIsNone(open_pack(self.pack_path))
+        image_loader.preload_images()
+        self.assertEqual(image_loader.get_cache_stats()['misses'], 4)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,39 @@
+import unittest
+from src.camera import Camera
+from src.config_manager import current_config
+
+class TestCamera(unittest.TestCase):
+    def setUp(self):
+        self.camera = Camera((800, 600), (2000, 1500))
+
+    def test_zoom_keeps_point_under_cursor(self):
+        self.camera.pan(100, 40)
+        before = self.camera.to_world(300, 200)
+        self.camera.zoom_at(1, 300, 200)
+        self.assertEqual(self.camera.zoom, 1.5)
+        self.assertEqual(self.camera.to_world(300, 200), before)
+        self.assertEqual(self.camera.to_screen(*before), (300, 200))
+
+    def test_pan_is_clamped_to_world(self):
+        version = self.camera.version
+        self.camera.pan(-50, -50)
+        self.assertEqual((self.camera.x, self.camera.y, self.camera.version), (0, 0, version))
+        self.camera.pan(5000, 5000)
+        self.assertEqual(self.camera.visible_rect(), (1200, 900, 2000, 1500))
+        self.camera.zoom_at(-3, 0, 0)
+        # 整個世界都看得到時固定在左上角
+        self.assertEqual((self.camera.x, self.camera.y), (0, 0))
+
+    def test_visible_cells(self):
+        grid = current_config().grid
+        self.camera.pan(grid.margin + grid.size * 2, grid.margin + grid.size)
+        rows, cols = self.camera.visible_cells(grid)
+        self.assertEqual((rows.start, cols.start), (1, 2))
+        self.assertLessEqual(rows.stop, grid.rows)
+        self.assertLessEqual(cols.stop, grid.cols)
+        # 向外多看一格
+        rows, cols = self.camera.visible_cells(grid, grid.size)
+        self.assertEqual((rows.start, cols.start), (0, 1))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+import contextlib
+import copy
+import io
+import json
+import os
+import tempfile
+import unittest
+from src.config_manager import CONFIG, ConfigWatcher, current_config, set_config
+
+class TestConfigManager(unittest.TestCase):
+    def setUp(self):
+        self.original = copy.deepcopy(CONFIG)
+        self.addCleanup(set_config, self.original)
+
+    def test_derived_grid_tables(self):
+        grid = current_config().grid
+        self.assertEqual(grid.lane_y[1], grid.margin + grid.size + grid.size // 2)
+        self.assertEqual(grid.cell_at(grid.col_x[2] + 1, grid.lane_y[3]), (3, 2))
+        self.assertIsNone(grid.cell_at(0, 0))
+
+    def test_invalid_config_is_rejected(self):
+        raw = copy.deepcopy(CONFIG)
+        raw['tower']['types']['normal']['damage'] = 'lots'
+        with self.assertRaisesRegex(ValueError, 'tower.types.normal.damage'):
+            set_config(raw)
+        self.assertEqual(current_config().tower_types['normal'].damage,
+                         self.original['tower']['types']['normal']['damage'])
+
+    def test_watcher_swaps_in_changed_file(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'config.json')
+            self.write(path, CONFIG, 1)
+            watcher = ConfigWatcher(path, interval=0)
+
+            raw = copy.deepcopy(CONFIG)
+            raw['enemy']['spawn_interval'] = 5
+            self.write(path, raw, 2)
+            self.assertTrue(watcher.poll())
+            self.assertEqual(current_config().spawn_interval, 5)
+            self.assertEqual(CONFIG['enemy']['spawn_interval'], 5)
+
+            raw['grid']['rows'] += 1
+            self.write(path, raw, 3)
+            # 錯誤只留在 watcher.error，由遊戲顯示，不直接輸出
+            with contextlib.redirect_stdout(io.StringIO()) as out:
+                self.assertFalse(watcher.poll())
+            self.assertEqual(out.getvalue(), '')
+            self.assertIn('restart', watcher.error)
+            self.assertEqual(current_config().grid.rows, self.original['grid']['rows'])
+
+            raw['grid']['rows'] -= 1
+            self.write(path, raw, 4)
+            self.assertTrue(watcher.poll())
+            self.assertIsNone(watcher.error)
+
+    def write(self, path, raw, mtime):
+        with open(path, 'w') as f:
+            json.dump(raw, f)
+        os.utime(path, ns=(mtime * 10**9, mtime * 10**9))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,35 @@
+import unittest
+from src.config_manager import CONFIG
+from src.game_state import GameState
+from src.game_logic import GameLogic
+
+class TestEntityPool(unittest.TestCase):
+    def setUp(self):
+        self.state = GameState(seed=1)
+        self.logic = GameLogic(self.state)
+
+    def test_released_enemy_is_reset_on_reuse(self):
+        enemy = self.state.spawn_enemy(0, 'strong')
+        enemy.health = 1
+        enemy.x = 10
+        self.state.remove_enemy(enemy)
+
+        reused = self.state.spawn_enemy(2, 'normal')
+        self.assertIs(reused, enemy)
+        self.assertEqual(reused.enemy_type, 'normal')
+        self.assertEqual(reused.health, CONFIG['enemy']['types']['normal']['health'])
+        self.assertEqual(reused.x, CONFIG['window']['width'] - CONFIG['grid']['margin'])
+        self.assertIsNone(reused.current_target)
+
+    def test_spent_projectiles_are_recycled(self):
+        self.state.fire_projectile(CONFIG['window']['width'], 100, 10)
+        self.logic._update_projectiles()
+        self.assertEqual(self.state.projectiles, [])
+        self.assertEqual(len(self.state.projectile_pool), 1)
+
+        self.state.fire_projectile(100, 100, 10)
+        self.assertEqual(self.state.projectile_pool.reused, 1)
+        self.assertEqual(len(self.state.projectile_pool), 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,11 +1,16 @@
+import multiprocessing
+import os
 import unittest
 from unittest.mock import patch, MagicMock
 import pygame
 from src.game_state import GameState
-from src.game_logic import GameLogic
+from src.game_logic import GameLogic, create_game_logic
 from src.entities.tower import Tower
 from src.entities.enemy import Enemy
-from src.config_manager import CONFIG
+from src.config_manager import CONFIG, current_config
+from src.waves import WaveGroup, WaveSpawner
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
 # 創建一個假的 surface 用於測試
 pygame.init()
@@ -33,7 +38,30 @@ class TestGameLogic(unittest.TestCase):
         
         # 檢查是否創建了子彈
         self.assertEqual(len(self.game_state.projectiles), 1)
-        
+
+    def test_tower_cooldown(self, mock_load_image):
+        # 冷卻 30 幀的防禦塔在第 0、31、62 幀開火
+        tower = Tower(CONFIG['grid']['margin'], CONFIG['grid']['margin'])
+        self.game_state.towers.append(tower)
+        self.game_state.enemies.append(Enemy(0))
+
+        for _ in range(70):
+            self.game_logic._tower_attack()
+            self.game_state.tick += 1
+        self.game_logic.sync_state()
+
+        self.assertEqual(len(self.game_state.projectiles), 3)
+        self.assertEqual(tower.attack_cooldown, 23)
+
+    def test_enemy_added_to_list_wakes_parked_tower(self, mock_load_image):
+        # 沒有目標的防禦塔停在所在的行；直接加入列表的敵人也要把它叫醒
+        self.game_state.place_tower(0, 0, 'normal')
+        self.game_logic.update()
+        self.game_state.enemies.append(Enemy(0))
+        self.game_logic.update()
+        self.game_logic.sync_state()
+        self.assertEqual(len(self.game_state.projectiles), 1)
+
     def test_enemy_damage(self, mock_load_image):
         # 創建一個防禦塔
         tower = Tower(CONFIG['grid']['margin'], CONFIG['grid']['margin'])
@@ -52,6 +80,42 @@ class TestGameLogic(unittest.TestCase):
         # 檢查防禦塔是否受到傷害
         self.assertLess(tower.health, initial_health)
         
+    def test_tower_death_releases_attackers(self, mock_load_image):
+        # 防禦塔被摧毀後，攻擊它的敵人都失去目標，格子可以重新放置
+        self.game_state.place_tower(0, 0, 'normal')
+        tower = self.game_state.towers[0]
+        tower.health = 1
+        enemies = [Enemy(0), Enemy(0)]
+        for enemy in enemies:
+            self.game_state.add_enemy(enemy)
+            self.game_state.set_target(enemy, tower)
+
+        self.game_logic._update_enemies()
+
+        self.assertEqual(self.game_state.towers, [])
+        self.assertEqual([e.current_target for e in self.game_state.enemies], [None, None])
+        self.assertIsNone(self.game_state.tower_at(0, 0))
+        self.assertTrue(self.game_state.place_tower(0, 0, 'normal'))
+
+    def test_direct_target_is_released_when_tower_dies(self, mock_load_image):
+        # 直接設定 current_target（不經 set_target）的敵人也要在防禦塔被摧毀後繼續前進
+        tower = Tower(CONFIG['grid']['margin'], CONFIG['grid']['margin'])
+        tower.health = 1
+        self.game_state.towers.append(tower)
+        enemy = Enemy(0)
+        enemy.x = tower.x + CONFIG['grid']['size']
+        enemy.current_target = tower
+        self.game_state.enemies.append(enemy)
+
+        self.game_logic._update_enemies()
+        self.assertNotIn(tower, self.game_state.towers)
+        self.assertIsNone(enemy.current_target)
+        self.assertEqual(tower.attackers, set())
+
+        x = enemy.x
+        self.game_logic._update_enemies()
+        self.assertLess(enemy.x, x)
+
     def test_game_over(self, mock_load_image):
         # 設置生命值為1
         self.game_state.lives = 1
@@ -68,5 +132,110 @@ class TestGameLogic(unittest.TestCase):
         self.assertTrue(self.game_state.game_over)
         self.assertEqual(self.game_state.lives, 0)
 
+class TestEventGameLogic(TestGameLogic):
+    # 事件驅動的碰撞排程必須與逐幀檢查得到相同結果
+    def setUp(self):
+        self.game_state = GameState()
+        self.game_logic = create_game_logic(self.game_state, 'event')
+
+    def test_matches_tick_engine(self):
+        from src.headless import parse_layout, run_headless
+        layout = parse_layout('0:0,1:0:strong,2:1@600,3:0,4:0,5:0@900,6:0@1200,7:1@1500')
+        for seed in range(3):
+            expected = run_headless(5000, seed, layout, 'object')
+            actual = run_headless(5000, seed, layout, 'event')
+            self.assertEqual(expected[:1] + expected[2:], actual[:1] + actual[2:])
+
+class TestArrayGameLogic(TestGameLogic):
+    # 以相同情境驗證 NumPy 引擎
+    def setUp(self):
+        self.game_state = GameState()
+        self.game_logic = create_game_logic(self.game_state, 'numpy')
+
+    def test_matches_tick_engine_under_load(self):
+        # 大量敵人時：同一幀多顆子彈打到同一個敵人、防禦塔被摧毀、x 相同的敵人
+        from src.headless import parse_layout, run_headless
+        layout = parse_layout('0:0,1:0:strong,2:1,3:0,4:0,5:0,6:0,7:1,0:1,1:1,2:0,3:1')
+        results = []
+        for engine in ('object', 'numpy'):
+            game_state = GameState(0)
+            game_state.lives = 100000
+            game_state.money = 5000
+            result = run_headless(2000, layout=layout, engine=engine, game_state=game_state,
+                                  waves=os.path.join(ROOT, 'waves', 'stress.jsonl'))
+            results.append((result._replace(elapsed=0),
+                            sorted((e.y, e.x, e.health) for e in game_state.enemies)))
+        self.assertEqual(results[0], results[1])
+
+class TestShardedGameLogic(unittest.TestCase):
+    # 分行在多個行程中模擬，計數器與整體狀態必須與單一行程相同
+    def test_matches_tick_engine(self):
+        from src.headless import parse_layout, run_headless
+        layout = parse_layout('0:0,1:0:strong,2:1@600,3:0,4:0,5:0@900,6:0@1200,7:1@1500')
+        for seed in range(2):
+            expected = run_headless(5000, seed, layout, 'object')
+            actual = run_headless(5000, seed, layout, 'sharded', shards=3)
+            self.assertEqual(expected[:1] + expected[2:], actual[:1] + actual[2:])
+        # run_headless 結束時已經關閉工作行程
+        self.assertEqual(multiprocessing.active_children(), [])
+
+    def test_sync_state(self):
+        def cells(state):
+            return (sorted((e.y, e.x, e.health, e.current_target is not None) for e in state.enemies),
+                    sorted((p.y, p.x) for p in state.projectiles),
+                    sorted((t.y, t.x, t.health, t.attack_cooldown) for t in state.towers))
+
+        states = [GameState(3), GameState(3)]
+        engines = [create_game_logic(states[0], 'object'),
+                   create_game_logic(states[1], 'sharded', shards=2, mirror_objects=False)]
+        self.addCleanup(engines[1].close)
+        for state, game_logic in zip(states, engines):
+            state.money = 1000
+            for row in range(0, 8, 2):
+                state.place_tower(row, 1, 'normal')
+            for _ in range(1500):
+                game_logic.update()
+            game_logic.sync_state()
+        self.assertEqual(cells(states[0]), cells(states[1]))
+        self.assertEqual((states[0].money, states[0].score, states[0].lives),
+                         (states[1].money, states[1].score, states[1].lives))
+
+class TestTowerEdits(unittest.TestCase):
+    # 直接修改防禦塔列表（長度不變）後，每個引擎都要排程新的防禦塔並忘掉被移除的
+    def play(self, engine, reschedule=False, **options):
+        grid = current_config().grid
+        state = GameState(5)
+        state.money = 1000
+        game_logic = create_game_logic(state, engine, **options)
+        if hasattr(game_logic, 'close'):
+            self.addCleanup(game_logic.close)
+        game_logic.waves = WaveSpawner([WaveGroup(0, 200, every=10, rows='all')], state.rng)
+        state.place_tower(0, 0, 'normal')
+        state.place_tower(1, 0, 'normal')
+        for _ in range(50):
+            game_logic.update()
+        # 替換一座防禦塔，另一座在同一幀內移除後再加入新的
+        state.towers[0] = Tower(grid.col_x[0], grid.row_y[2])
+        state.towers.remove(state.towers[1])
+        state.towers.append(Tower(grid.col_x[0], grid.row_y[3]))
+        if reschedule:
+            game_logic.reschedule()
+        for _ in range(300):
+            game_logic.update()
+        game_logic.sync_state()
+        return ((state.money, state.score, state.lives),
+                sorted((p.y, p.x) for p in state.projectiles),
+                sorted((t.y, t.x, t.attack_cooldown) for t in state.towers))
+
+    def test_edited_towers_are_scheduled(self):
+        # 以修改後手動 reschedule() 的結果為準
+        expected = self.play('object', reschedule=True)
+        lane_y = current_config().grid.lane_y
+        self.assertEqual({y for y, _ in expected[1]}, {lane_y[2], lane_y[3]})
+        for engine, options in (('object', {}), ('event', {}), ('numpy', {'mirror_objects': False}),
+                                ('sharded', {'shards': 2, 'mirror_objects': False})):
+            with self.subTest(engine=engine):
+                self.assertEqual(self.play(engine, **options), expected)
+
 if __name__ == '__main__':
     unittest.main()
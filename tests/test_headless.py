@@ -0,0 +1,62 @@
+import json
+import os
+import tempfile
+import unittest
+from src.game_state import GameState
+from src.headless import Placement, load_layout, parse_layout, run_headless
+from src.snapshot import take_snapshot
+
+class TestHeadless(unittest.TestCase):
+    def test_parse_layout(self):
+        self.assertEqual(parse_layout(' 0:1, 2:3:strong@600,,4:0@90 '),
+                         [Placement(0, 0, 1), Placement(600, 2, 3, 'strong'), Placement(90, 4, 0)])
+        self.assertEqual(parse_layout(''), [])
+        for spec in ('1', '1:2:3:4', '1:2:huge'):
+            with self.assertRaises(ValueError):
+                parse_layout(spec)
+
+    def test_load_layout_from_json(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'layout.json')
+            with open(path, 'w') as f:
+                json.dump([{'row': 1, 'col': 2}, {'row': 3, 'col': 0, 'type': 'strong', 'tick': 50}], f)
+            self.assertEqual(load_layout(path), [Placement(0, 1, 2), Placement(50, 3, 0, 'strong')])
+        # 不是檔案時當作行內格式解析
+        self.assertEqual(load_layout('5:5@7'), [Placement(7, 5, 5)])
+
+    def test_json_layout_rejects_unknown_type(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'layout.json')
+            with open(path, 'w') as f:
+                json.dump([{'row': 1, 'col': 2}, {'row': 3, 'col': 4, 'type': 'huge'}], f)
+            with self.assertRaisesRegex(ValueError, 'row 3, col 4'):
+                load_layout(path)
+
+    def test_placements_wait_for_their_tick(self):
+        layout = parse_layout('2:1@5,0:0')
+        for ticks, expected in ((1, [(0, 0)]), (5, [(0, 0)]), (6, [(0, 0), (2, 1)])):
+            game_state = GameState(1)
+            run_headless(ticks, layout=layout, game_state=game_state)
+            self.assertEqual([game_state._cell(t) for t in game_state.towers], expected)
+
+    def test_placements_wait_for_money(self):
+        # 錢不夠時後面的防禦塔依序等待，不會先放較便宜的
+        game_state = GameState(1)
+        run_headless(1, layout=parse_layout('0:0:strong,1:0:strong,2:0'), game_state=game_state)
+        self.assertEqual([game_state._cell(t) for t in game_state.towers], [(0, 0)])
+        self.assertEqual(game_state.money, 0)
+
+    def test_same_seed_repeats(self):
+        layout = parse_layout('0:0,1:0:strong,2:1@600,3:0@900')
+        runs = []
+        for _ in range(2):
+            game_state = GameState(11)
+            result = run_headless(3000, layout=layout, game_state=game_state, sample_every=100)
+            runs.append((result._replace(elapsed=0), take_snapshot(game_state)))
+        self.assertEqual(runs[0], runs[1])
+        self.assertEqual(len(runs[0][0].money_curve), runs[0][0].ticks // 100)
+        # 只給種子時建立的新局也相同
+        self.assertEqual(run_headless(3000, 11, layout, sample_every=100)._replace(elapsed=0), runs[0][0])
+
+if __name__ == '__main__':
+    unittest.main()
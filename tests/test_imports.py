@@ -0,0 +1,18 @@
+import os
+import subprocess
+import sys
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+class TestHeadlessImports(unittest.TestCase):
+    def test_simulation_core_does_not_import_pygame(self):
+        # 無頭模擬與工作行程不應該付出載入 pygame 的成本
+        code = ('import sys, src.headless, src.sweep, src.event_logic, src.replay; '
+                'print("pygame" in sys.modules)')
+        result = subprocess.run([sys.executable, '-c', code], cwd=ROOT,
+                                capture_output=True, text=True, check=True)
+        self.assertEqual(result.stdout.strip(), 'False')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import unittest
+from types import SimpleNamespace
+from src.lane_index import LaneIndex
+from src.config_manager import CONFIG
+from src.game_state import GameState
+
+def make_entity(row, x):
+    y = CONFIG['grid']['margin'] + row * CONFIG['grid']['size'] + CONFIG['grid']['size'] // 2
+    return SimpleNamespace(x=x, y=y)
+
+class TestLaneIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = LaneIndex(CONFIG['grid']['rows'])
+
+    def test_rows_are_bucketed_and_sorted(self):
+        a, b, c = make_entity(0, 300), make_entity(0, 100), make_entity(2, 200)
+        self.index.rebuild([a, b, c])
+
+        self.assertEqual(self.index.in_row(0), [b, a])
+        self.assertEqual(self.index.in_row(2), [c])
+        self.assertEqual(len(self.index), 3)
+
+    def test_range_queries(self):
+        entities = [make_entity(1, x) for x in (50, 150, 250, 350)]
+        for entity in entities:
+            self.index.add(entity)
+
+        self.assertEqual(list(self.index.between(1, 100, 300)), entities[1:3])
+        self.assertIs(self.index.first_between(1, 150, 400), entities[2])
+        self.assertIsNone(self.index.first_between(0, 0, 1000))
+        self.assertIs(self.index.last(1), entities[3])
+
+    def test_remove_after_move(self):
+        a, b = make_entity(0, 100), make_entity(0, 200)
+        self.index.add(a)
+        self.index.add(b)
+
+        # 移動後尚未重新排序也能正確移除
+        b.x = 50
+        self.index.remove(b)
+        self.index.resort()
+
+        self.assertEqual(self.index.in_row(0), [a])
+        self.assertEqual(len(self.index), 1)
+
+class TestGameStateIndexes(unittest.TestCase):
+    def setUp(self):
+        self.state = GameState(seed=1)
+
+    def test_same_length_edit_is_detected(self):
+        # 直接替換列表元素（長度不變）後，索引也要重建
+        self.state.spawn_enemy(0, 'normal')
+        new = self.state.enemy_pool.acquire(3, 'normal')
+        self.state.enemies[0] = new
+        self.state.sync_lanes()
+        self.assertEqual(self.state.enemy_lanes.in_row(0), [])
+        self.assertEqual(self.state.enemy_lanes.in_row(3), [new])
+
+        self.state.place_tower(1, 1, 'normal')
+        self.state.towers[0].y += CONFIG['grid']['size']
+        self.state.towers[:] = list(self.state.towers)
+        self.state.sync_lanes()
+        self.assertIsNone(self.state.tower_at(1, 1))
+        self.assertIs(self.state.tower_at(2, 1), self.state.towers[0])
+
+    def test_removed_enemies_keep_order(self):
+        enemies = [self.state.spawn_enemy(row % 2, 'normal') for row in range(5)]
+        self.state.remove_enemy(enemies[1])
+        self.state.remove_enemy(enemies[3])
+        self.assertEqual(len(self.state.enemy_lanes), 3)
+        self.assertEqual(self.state.enemies, [enemies[0], enemies[2], enemies[4]])
+        self.assertEqual(len(self.state.enemy_pool), 2)
+
+    def test_sort_with_keywords(self):
+        # 關鍵字參數要原樣傳給 list 的方法
+        for row in (2, 0, 1):
+            self.state.spawn_enemy(row, 'normal')
+        enemies = self.state.enemies
+        version = enemies.version
+        enemies.sort(key=lambda enemy: enemy.y, reverse=True)
+        self.assertGreater(enemies.version, version)
+        self.assertEqual([self.state.enemy_lanes.row_of(e) for e in enemies], [2, 1, 0])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,34 @@
+import unittest
+from src.game_state import GameState
+from src.game_logic import GameLogic
+from src.profiler import RingBuffer, TickProfiler
+
+class TestTickProfiler(unittest.TestCase):
+    def test_ring_buffer_keeps_latest_samples(self):
+        buffer = RingBuffer(3)
+        for value in range(5):
+            buffer.append(value)
+        self.assertEqual(buffer.values(), [2, 3, 4])
+
+    def test_percentiles(self):
+        profiler = TickProfiler(capacity=100)
+        for value in range(1, 101):
+            profiler.series['render'].append(value)
+        self.assertEqual(profiler.percentile('render', 50), 50)
+        self.assertEqual(profiler.percentile('render', 99), 99)
+        self.assertIsNone(profiler.percentile('_tower_attack', 50))
+
+    def test_only_records_when_enabled(self):
+        logic = GameLogic(GameState(seed=1))
+        logic.profiler = TickProfiler()
+        logic.update()
+        self.assertEqual(len(logic.profiler.series['_update_enemies']), 0)
+
+        logic.profiler.toggle()
+        logic.update()
+        logic.update()
+        self.assertEqual(len(logic.profiler.series['_update_enemies']), 2)
+        self.assertEqual(len(logic.profiler.series['enemies']), 2)
+
+if __name__ == '__main__':
+    unittest.main()
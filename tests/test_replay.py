@@ -0,0 +1,75 @@
+import copy
+import unittest
+from src.config_manager import CONFIG, set_config
+from src.game_state import GameState
+from src.game_logic import GameLogic
+from src.event_handler import EventHandler
+from src.replay import ACTION_CONFIG, ACTION_PLACE, ReplayRecorder, config_crc, parse_replay, play_replay
+
+class TestReplay(unittest.TestCase):
+    def play_session(self, seed, reloads=None):
+        # 模擬玩家在不同幀放置防禦塔與切換類型；reloads 是在某幀熱重載的配置
+        game_state = GameState(seed)
+        game_logic = GameLogic(game_state)
+        recorder = ReplayRecorder(game_state)
+        event_handler = EventHandler(game_state, recorder)
+        inputs = {0: [(0, 0)], 120: [(3, 0)], 400: ['strong', (5, 1)], 900: ['normal', (7, 0), (1, 0)]}
+        self.placed = []
+
+        for _ in range(3000):
+            if reloads and game_state.tick in reloads:
+                set_config(reloads[game_state.tick])
+                recorder.record_config(game_state.tick)
+            for action in inputs.get(game_state.tick, []):
+                if isinstance(action, str):
+                    event_handler.select_tower_type(action)
+                elif event_handler.place_tower(*action):
+                    self.placed.append((game_state.tick,) + action)
+            game_logic.update()
+        return game_state, recorder.to_bytes(game_state.tick)
+
+    def test_round_trip(self):
+        game_state, data = self.play_session(42)
+        replay = parse_replay(data)
+
+        self.assertEqual(replay.seed, 42)
+        self.assertEqual(replay.end_tick, game_state.tick)
+        self.assertEqual([(a.tick, a.row, a.col) for a in replay.actions if a.action == ACTION_PLACE],
+                         self.placed)
+        self.assertGreaterEqual(len(self.placed), 3)
+
+    def test_playback_reaches_same_state(self):
+        game_state, data = self.play_session(7)
+        replayed = play_replay(parse_replay(data))
+
+        self.assertEqual(replayed.tick, game_state.tick)
+        self.assertEqual((replayed.score, replayed.money, replayed.lives),
+                         (game_state.score, game_state.money, game_state.lives))
+        self.assertEqual([(t.x, t.y, t.health) for t in replayed.towers],
+                         [(t.x, t.y, t.health) for t in game_state.towers])
+        self.assertEqual([(e.x, e.y, e.health) for e in replayed.enemies],
+                         [(e.x, e.y, e.health) for e in game_state.enemies])
+
+    def test_hot_reload_is_replayed(self):
+        original = copy.deepcopy(CONFIG)
+        self.addCleanup(set_config, original)
+        weaker = copy.deepcopy(original)
+        weaker['enemy']['spawn_interval'] = 45
+        weaker['enemy']['types']['normal']['health'] = 40
+        crc = config_crc()
+
+        game_state, data = self.play_session(5, {700: weaker, 1800: original})
+        set_config(original)
+        replay = parse_replay(data)
+        self.assertEqual(replay.config_crc, crc)
+        self.assertEqual([(a.tick, a.config) for a in replay.actions if a.action == ACTION_CONFIG],
+                         [(700, weaker), (1800, original)])
+
+        replayed = play_replay(replay)
+        self.assertGreater(replayed.tick, 1800)
+        self.assertEqual((replayed.score, replayed.money, replayed.lives),
+                         (game_state.score, game_state.money, game_state.lives))
+        self.assertEqual(CONFIG, original)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import unittest
+from src.game_state import GameState
+from src.game_logic import GameLogic
+from src.snapshot import fork, restore_snapshot, take_snapshot
+
+class TestSnapshot(unittest.TestCase):
+    def play(self, game_state, ticks):
+        game_logic = GameLogic(game_state)
+        for _ in range(ticks):
+            game_logic.update()
+        game_logic.sync_state()
+        return game_state
+
+    def summary(self, game_state):
+        return (game_state.tick, game_state.money, game_state.score, game_state.lives,
+                [(t.x, t.y, t.health, t.attack_cooldown) for t in game_state.towers],
+                [(e.x, e.y, e.enemy_type, e.health) for e in game_state.enemies],
+                [(p.x, p.y) for p in game_state.projectiles])
+
+    def setUp(self):
+        self.game_state = GameState(11)
+        for row in range(5):
+            self.game_state.place_tower(row, 0, 'normal')
+        self.play(self.game_state, 1500)
+
+    def test_round_trip(self):
+        data = take_snapshot(self.game_state)
+        restored = restore_snapshot(data)
+
+        self.assertEqual(self.summary(restored), self.summary(self.game_state))
+        self.assertEqual(take_snapshot(restored), data)
+        targets = [e.current_target for e in restored.enemies if e.current_target is not None]
+        self.assertTrue(all(target in restored.towers for target in targets))
+
+    def test_fork_continues_identically(self):
+        branch = fork(self.game_state)
+        branch.place_tower(6, 2, 'strong')  # 只改變分支，不影響原本的局面
+        twin = fork(self.game_state)
+
+        self.play(self.game_state, 2000)
+        self.play(twin, 2000)
+        self.play(branch, 2000)
+
+        self.assertEqual(self.summary(twin), self.summary(self.game_state))
+        self.assertNotEqual(self.summary(branch), self.summary(self.game_state))
+
+    def test_rejects_other_data(self):
+        with self.assertRaises(ValueError):
+            restore_snapshot(b'TDRP' + bytes(64))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+import copy
+import csv
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+from src import sweep
+from src.config_manager import CONFIG, current_config, set_config
+from src.headless import HeadlessResult
+
+class TestSweep(unittest.TestCase):
+    def setUp(self):
+        self.original = copy.deepcopy(CONFIG)
+        self.addCleanup(set_config, self.original)
+
+    def test_parameter_grid(self):
+        self.assertEqual(sweep.parse_param('enemy.spawn_interval=40:80:20'),
+                         ('enemy.spawn_interval', [40, 60, 80]))
+        self.assertEqual(sweep.parse_param('enemy.types.strong.speed=0.5:1:0.25'),
+                         ('enemy.types.strong.speed', [0.5, 0.75, 1.0]))
+        self.assertEqual(sweep.parse_param('window.title=a,2,[1]'), ('window.title', ['a', 2, [1]]))
+        for spec in ('enemy.spawn_interval', 'enemy.spawn_interval=', 'x=1:2:0'):
+            with self.assertRaises(ValueError):
+                sweep.parse_param(spec)
+
+        params = [('a', [1, 2]), ('b', ['x', 'y', 'z'])]
+        runs = list(sweep.expand_runs(params, [7, 8]))
+        self.assertEqual(len(runs), 12)
+        self.assertEqual(runs[0], (0, 7, {'a': 1, 'b': 'x'}))
+        self.assertEqual(runs[-1], (5, 8, {'a': 2, 'b': 'z'}))
+        self.assertEqual(sorted({variant for variant, _, _ in runs}), list(range(6)))
+
+    def test_overrides_do_not_leak_between_runs(self):
+        seen = []
+
+        def fake_run(*args):
+            config = current_config()
+            seen.append((config.spawn_interval, config.tower_types['normal'].damage))
+            return HeadlessResult(1, 0.0, 0, 0, 0, False)
+
+        sweep._init_worker({'ticks': 1, 'layout': [], 'engine': 'object', 'sample_every': 0})
+        self.addCleanup(sweep._pristine_config.clear)
+        self.addCleanup(sweep._worker_options.clear)
+        defaults = (current_config().spawn_interval, current_config().tower_types['normal'].damage)
+        with patch.object(sweep, 'run_headless', fake_run):
+            rows = sweep._run_chunk([(0, 1, {'enemy.spawn_interval': 5}),
+                                     (1, 1, {'tower.types.normal.damage': 99}),
+                                     (2, 1, {})])
+        # 每局都從原始設定開始，前一局的覆寫不會留下來
+        self.assertEqual(seen, [(5, defaults[1]), (defaults[0], 99), defaults])
+        self.assertEqual([row['variant'] for row in rows], [0, 1, 2])
+
+    def test_unknown_key_is_rejected(self):
+        with self.assertRaises(KeyError):
+            sweep.apply_overrides(copy.deepcopy(CONFIG), {'enemy.no_such_key': 1})
+
+    def test_resume_skips_completed_runs(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            out = Path(tmp) / 'sweep.csv'
+            params = [('enemy.spawn_interval', [30, 60])]
+            self.assertEqual(sweep.run_sweep(params, [0, 1], out, 50, processes=1), 4)
+            # 加入新的種子後重新執行，只跑還沒完成的對局
+            self.assertEqual(sweep.run_sweep(params, [0, 1, 2], out, 50, processes=1), 2)
+            self.assertEqual(sweep.run_sweep(params, [0, 1, 2], out, 50, processes=1), 0)
+
+            with open(out, newline='') as f:
+                rows = list(csv.DictReader(f))
+            self.assertEqual(sorted((row['seed'], row['enemy.spawn_interval']) for row in rows),
+                             sorted((str(s), str(v)) for s in range(3) for v in (30, 60)))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+import os
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+from src.config_manager import current_config
+from src.game_state import GameState
+from src.headless import parse_layout, run_headless
+from src.telemetry import SHOT, Telemetry, read_events
+
+class TestTelemetry(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.tmp.name, name)
+
+    def test_formats_record_the_same_game(self):
+        layout = parse_layout('0:0,1:0:strong,2:1@600,3:0@900')
+        logs = {}
+        for engine, fmt in (('object', 'jsonl'), ('numpy', 'binary')):
+            with Telemetry(self.path(f'{engine}.{fmt}'), fmt, policy='block') as telemetry:
+                result = run_headless(3000, 7, layout, engine, telemetry=telemetry)
+            logs[engine] = sorted(map(repr, read_events(self.path(f'{engine}.{fmt}'))))
+            events = [e['event'] for e in read_events(self.path(f'{engine}.{fmt}'))]
+            self.assertEqual(events.count('economy'), result.ticks)
+            self.assertEqual(events.count('kill'), result.score)
+            self.assertEqual(events.count('escape'), current_config().initial_lives - result.lives)
+        self.assertEqual(logs['object'], logs['numpy'])
+
+    def test_drop_policy_counts_dropped_ticks(self):
+        # 先不啟動寫入執行緒，模擬寫入跟不上；佇列只容得下兩幀
+        with patch.object(threading.Thread, 'start'):
+            telemetry = Telemetry(self.path('drop.jsonl'), capacity=2)
+        state = GameState(1)
+        for tick in range(5):
+            state.tick = tick
+            telemetry.emit(SHOT, 0, 1, 15)
+            telemetry.end_tick(state)
+        telemetry._thread.start()
+        telemetry.close()
+        self.assertEqual(telemetry.stats(), {'written_ticks': 2, 'written_events': 4,
+                                             'dropped_ticks': 3, 'dropped_events': 6, 'stalls': 0})
+        self.assertEqual([e['tick'] for e in read_events(self.path('drop.jsonl'))], [0, 0, 1, 1])
+
+    def test_rotation_keeps_readable_backups(self):
+        path = self.path('events.tdt')
+        with Telemetry(path, 'binary', max_bytes=2000, backups=2, policy='block') as telemetry:
+            state = GameState(1)
+            for tick in range(300):
+                state.tick = tick
+                telemetry.end_tick(state)
+        self.assertEqual(sorted(os.listdir(self.tmp.name)), ['events.tdt', 'events.tdt.1', 'events.tdt.2'])
+        ticks = [e['tick'] for name in ('events.tdt.2', 'events.tdt.1', 'events.tdt')
+                 for e in read_events(self.path(name))]
+        # 最舊的檔案已被刪除，剩下的記錄依序相接
+        self.assertEqual(ticks, list(range(300 - len(ticks), 300)))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+import unittest
+from src.timestep import MAX_SPEED, FixedTimestep
+
+class FakeClock:
+    """Time that only moves when the test (or each reading) advances it."""
+
+    def __init__(self, step: float = 0.0):
+        self.now = 100.0
+        self.step = step
+
+    def __call__(self) -> float:
+        now = self.now
+        self.now += self.step
+        return now
+
+class TestFixedTimestep(unittest.TestCase):
+    def setUp(self):
+        # 4 幀/秒，每幀 0.25 秒，浮點運算沒有誤差
+        self.clock = FakeClock()
+        self.timestep = FixedTimestep(4, max_ticks_per_frame=3, clock=self.clock)
+        self.ticks = 0
+
+    def update(self):
+        self.ticks += 1
+
+    def frame(self, elapsed):
+        self.clock.now += elapsed
+        return self.timestep.run(self.update)
+
+    def test_ticks_follow_real_time(self):
+        self.assertEqual(self.timestep.run(self.update), 0)
+        self.assertEqual([self.frame(0.5) for _ in range(3)], [2, 2, 2])
+        # 不足一幀的時間留到下一次
+        self.assertEqual([self.frame(0.375) for _ in range(4)], [1, 2, 1, 2])
+        self.assertEqual(self.ticks, 12)
+        self.assertEqual(self.timestep.dropped_ticks, 0)
+
+    def test_catch_up_is_clamped(self):
+        self.timestep.run(self.update)
+        self.assertEqual(self.frame(10.0), 3)
+        self.assertEqual(self.timestep.dropped_ticks, 37)
+        # 丟棄的時間不會在之後補回來
+        self.assertEqual(self.frame(0.25), 1)
+
+    def test_speed(self):
+        self.timestep.run(self.update)
+        self.timestep.set_speed(2)
+        self.assertEqual(self.frame(0.5), 4)
+        # 上限隨速度放大
+        self.assertEqual(self.frame(10.0), 6)
+        with self.assertRaises(ValueError):
+            self.timestep.set_speed(3)
+
+        labels = []
+        for _ in range(len(FixedTimestep.SPEEDS)):
+            self.timestep.cycle_speed()
+            labels.append(self.timestep.speed_label)
+        self.assertEqual(labels, ['4x', 'Max', '1x', '2x'])
+
+    def test_set_speed_drops_partial_tick(self):
+        self.timestep.run(self.update)
+        self.frame(0.125)
+        self.timestep.set_speed(1)
+        self.assertEqual(self.timestep.accumulator, 0.0)
+        self.assertEqual(self.frame(0.125), 0)
+
+    def test_max_speed_uses_frame_budget(self):
+        clock = FakeClock(step=0.1)
+        timestep = FixedTimestep(4, frame_budget=0.25, clock=clock)
+        timestep.set_speed(MAX_SPEED)
+        # 每次讀取時鐘前進 0.1 秒：0.1、0.2 時仍在預算內，0.3 時停止
+        self.assertEqual(timestep.run(self.update), 3)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+import random
+import unittest
+from src.timing_wheel import TimingWheel
+from src.game_state import GameState
+from src.game_logic import GameLogic
+
+class TestTimingWheel(unittest.TestCase):
+    def test_matches_brute_force(self):
+        # 用很小的輪子，讓跨層下放與溢出列表都會被用到
+        rng = random.Random(3)
+        wheel = TimingWheel(bits=2, levels=2)
+        expected = {}
+        for tick in range(400):
+            for _ in range(rng.randrange(4)):
+                item = rng.randrange(30)
+                if rng.random() < 0.2:
+                    wheel.cancel(item)
+                    expected.pop(item, None)
+                else:
+                    due = tick + rng.choice([0, 1, 3, 15, 16, 17, 40, 100])
+                    wheel.schedule(item, due)
+                    expected[item] = due
+            fired = wheel.advance(tick)
+            due_now = sorted(item for item, due in expected.items() if due == tick)
+            self.assertEqual(sorted(fired), due_now, f'tick {tick}')
+            for item in due_now:
+                del expected[item]
+            self.assertEqual(len(wheel), len(expected))
+
+    def test_past_ticks_fire_next(self):
+        wheel = TimingWheel(tick=10)
+        wheel.schedule('a', 4)
+        self.assertEqual(wheel.advance(12), ['a'])
+        self.assertEqual(wheel.advance(12), [])
+
+class TestTowerCooldown(unittest.TestCase):
+    def test_cooldown_is_current_between_ticks(self):
+        # 防禦塔只在冷卻到期時被處理，但 attack_cooldown 每幀都要讀到目前的值
+        state = GameState(seed=1)
+        game_logic = GameLogic(state)
+        state.place_tower(0, 0, 'normal')
+        tower = state.towers[0]
+        state.spawn_enemy(0, 'normal')
+
+        cooldowns = []
+        for _ in range(5):
+            game_logic._tower_attack()
+            state.tick += 1
+            cooldowns.append(tower.attack_cooldown)
+        self.assertEqual(cooldowns, [tower.attack_cooldown_max - i for i in range(5)])
+
+        # 閒置（沒有目標）的防禦塔停止倒數
+        state.remove_enemy(state.enemies[0])
+        for _ in range(tower.attack_cooldown_max + 5):
+            game_logic._tower_attack()
+            state.tick += 1
+        self.assertEqual(tower.attack_cooldown, 0)
+
+if __name__ == '__main__':
+    unittest.main()
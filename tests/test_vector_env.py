@@ -0,0 +1,69 @@
+import random
+import unittest
+import numpy as np
+from src.vector_env import VectorEnv
+from src.game_state import GameState
+from src.game_logic import create_game_logic
+from src.config_manager import current_config
+
+class TestVectorEnv(unittest.TestCase):
+    def test_matches_numpy_engine(self):
+        seeds = [1, 2, 3, 4]
+        # 故意用很小的空位數，順便測試擴充
+        env = VectorEnv(len(seeds), enemy_slots=2, projectile_slots=2)
+        env.reset(seeds)
+        states = [GameState(seed) for seed in seeds]
+        logics = [create_game_logic(state, 'numpy', mirror_objects=False) for state in states]
+        grid = current_config().grid
+        rng = random.Random(0)
+        for _ in range(3000):
+            actions = np.zeros(len(seeds), dtype=np.int64)
+            for i, state in enumerate(states):
+                if rng.random() < 0.1:
+                    row, col = rng.randrange(grid.rows), rng.randrange(4)
+                    tower_type = rng.choice(['normal', 'strong'])
+                    actions[i] = env.action(row, col, tower_type)
+                    if not state.game_over:
+                        state.place_tower(row, col, tower_type)
+            obs, _, done = env.step(actions)
+            for logic in logics:
+                logic.update()
+            self.assertEqual([(s.score, s.lives, s.money, s.game_over) for s in states],
+                             list(zip(obs['score'].tolist(), obs['lives'].tolist(),
+                                      obs['money'].tolist(), done.tolist())))
+        for i, (state, logic) in enumerate(zip(states, logics)):
+            logic.sync_state()
+            self.assertEqual(sorted((e.x, e.health) for e in state.enemies),
+                             sorted(zip(env.e_x[i][env.e_alive[i]].tolist(),
+                                        env.e_health[i][env.e_alive[i]].tolist())))
+
+    def test_actions_and_reset(self):
+        config = current_config()
+        env = VectorEnv(3, max_ticks=5)
+        obs = env.reset([0, 1, 2])
+        self.assertEqual(obs['towers'].shape, (3, config.grid.rows, config.grid.cols))
+        # 前兩局分別買普通與強力植物；第三局的動作超出範圍，不做任何事
+        normal, strong = env.action(2, 3, 'normal'), env.action(2, 3, 'strong')
+        obs, rewards, done = env.step([normal, strong, env.num_actions])
+        self.assertEqual(obs['towers'][:, 2, 3].tolist(), [1, 2, 0])
+        cost = config.tower_types['normal'].cost
+        self.assertEqual(obs['money'].tolist(), [config.initial_money - cost,
+                                                 config.initial_money - config.tower_types['strong'].cost,
+                                                 config.initial_money])
+        obs, _, _ = env.step([normal, 0, 0])  # 格子已被佔用
+        self.assertEqual(obs['money'][0], config.initial_money - cost)
+        self.assertEqual(rewards.tolist(), [0, 0, 0])
+
+        for _ in range(3):
+            _, _, done = env.step([0, 0, 0])
+        self.assertTrue(done.all())
+        ticks = env.tick.copy()
+        env.step([0, 0, 0])
+        self.assertEqual(env.tick.tolist(), ticks.tolist())  # 結束的遊戲保持不動
+        obs = env.reset([7], [1])
+        self.assertEqual(env.done.tolist(), [True, False, True])
+        self.assertEqual(obs['towers'][1].sum(), 0)
+        self.assertEqual(obs['money'][1], config.initial_money)
+
+if __name__ == '__main__':
+    unittest.main()
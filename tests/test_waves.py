@@ -0,0 +1,49 @@
+import random
+import unittest
+from src.game_state import GameState
+from src.game_logic import GameLogic
+from src.waves import WaveSpawner, parse_group
+
+class TestWaves(unittest.TestCase):
+    def test_parse_group(self):
+        group = parse_group({'after': 50, 'count': 10, 'batch': 4, 'rows': [1, 2], 'type': 'strong'}, 100)
+        self.assertEqual((group.start, group.count, group.batch, group.rows), (150, 10, 4, (1, 2)))
+        self.assertEqual(group.types, (('strong', 1.0),))
+        with self.assertRaises(ValueError):
+            parse_group({'at': 10}, 100)  # 必須依開始時間排列
+        with self.assertRaises(ValueError):
+            parse_group({'types': {'boss': 1}})
+
+    def test_spawner_merges_groups_lazily(self):
+        pulled = []
+
+        def groups():
+            for entry in ({'at': 0, 'count': 3, 'every': 2, 'rows': 'all'},
+                          {'at': 2, 'count': 4, 'batch': 4, 'rows': 5},
+                          {'at': 1000, 'count': 1}):
+                group = parse_group(entry)
+                pulled.append(group)
+                yield group
+
+        spawner = WaveSpawner(groups(), random.Random(0))
+        schedule = {tick: spawner.due(tick) for tick in range(6)}
+
+        self.assertEqual(schedule[0], [(0, 'normal')])
+        self.assertEqual(schedule[2], [(1, 'normal')] + [(5, 'normal')] * 4)
+        self.assertEqual(schedule[4], [(2, 'normal')])
+        self.assertEqual(spawner.spawned, 7)
+        # 第三個群組尚未開始，只被讀到而沒有展開
+        self.assertEqual(len(pulled), 3)
+        self.assertFalse(spawner.finished)
+
+    def test_game_logic_uses_waves(self):
+        game_state = GameState(3)
+        game_logic = GameLogic(game_state)
+        game_logic.waves = WaveSpawner([parse_group({'count': 20, 'batch': 10, 'every': 5})], game_state.rng)
+        for _ in range(10):
+            game_logic.update()
+        self.assertEqual(len(game_state.enemies), 20)
+        self.assertTrue(game_logic.waves.finished)
+
+if __name__ == '__main__':
+    unittest.main()